@@ -0,0 +1,154 @@
+"""
+Benchmark for device-scan latency under concurrent reporting load.
+Drives the ASGI app in-process and measures /device/attendance/mark
+latency alone, then while report queries (/admin/attendance with large
+pages and /admin/attendance/summary) run in parallel on the same loop.
+
+Usage (from the backend directory):
+    python benchmarks/bench_concurrency.py [employees] [days] [report_workers]
+"""
+import asyncio
+import base64
+import os
+import sys
+import tempfile
+import time
+from datetime import date, time as dt_time, timedelta
+
+import numpy as np
+
+# Point the app at a throwaway database before any app module is imported
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_concurrency.db"
+os.environ["SCAN_DEBOUNCE_SECONDS"] = "0"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from sqlalchemy import insert
+
+from auth.jwt_handler import create_access_token
+from database import AsyncSessionLocal, SessionLocal, init_db
+from main import app
+from models import Attendance, Employee, FingerprintTemplate
+from services.template_gallery import template_gallery
+from services.write_queue import attendance_write_queue
+from utils.config import settings
+from utils.encryption import encryption_service
+
+TEMPLATE_BYTES = 256
+SCANS = 200
+
+
+def seed(employee_count: int, days: int, rng: np.random.Generator) -> list[str]:
+    """Create enrolled employees with `days` of history; return templates."""
+    templates = [
+        base64.b64encode(raw.tobytes()).decode()
+        for raw in rng.integers(0, 256, size=(employee_count, TEMPLATE_BYTES), dtype=np.uint8)
+    ]
+    db = SessionLocal()
+    db.execute(insert(Employee), [
+        {
+            "employee_no": f"EMP{i:06d}",
+            "name": f"Employee {i}",
+            "department": f"Dept {i % 12}",
+            "shift": "G"
+        }
+        for i in range(employee_count)
+    ])
+    db.execute(insert(FingerprintTemplate), [
+        {
+            "employee_no": f"EMP{i:06d}",
+            "finger_index": 0,
+            "template": encryption_service.encrypt_template(template),
+            "template_hash": encryption_service.fingerprint_digest(template)
+        }
+        for i, template in enumerate(templates)
+    ])
+    first_day = date.today() - timedelta(days=days)
+    for day in range(days):
+        db.execute(insert(Attendance), [
+            {
+                "employee_no": f"EMP{i:06d}",
+                "attendance_date": first_day + timedelta(days=day),
+                "time_in": dt_time(8, int(rng.integers(0, 60))),
+                "time_out": dt_time(17, int(rng.integers(0, 60))),
+                "total_work_minutes": 540,
+                "overtime": True,
+                "overtime_minutes": 60,
+                "device_id": "GATE-1"
+            }
+            for i in range(employee_count)
+        ])
+    db.commit()
+    db.close()
+    return templates
+
+
+async def scan_latencies(client: httpx.AsyncClient, templates: list[str]) -> np.ndarray:
+    """Send SCANS device scans one after another; return latencies in ms."""
+    headers = {"X-API-Key": settings.DEVICE_API_KEY}
+    latencies = []
+    for template in templates[:SCANS]:
+        start = time.perf_counter()
+        response = await client.post(
+            "/device/attendance/mark",
+            json={"fingerprint_template": template, "device_id": "GATE-1"},
+            headers=headers
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.text
+    return np.array(latencies)
+
+
+async def report_worker(client: httpx.AsyncClient, stop: asyncio.Event, counter: list) -> None:
+    """Issue heavy report queries until stopped."""
+    token = create_access_token({"sub": "bench", "type": "admin", "role": "primary_admin"})
+    headers = {"Authorization": f"Bearer {token}"}
+    while not stop.is_set():
+        await client.get("/admin/attendance", params={"limit": 1000}, headers=headers)
+        await client.get("/admin/attendance/summary", headers=headers)
+        counter[0] += 1
+
+
+def describe(label: str, latencies: np.ndarray) -> None:
+    print(
+        f"{label:<28} | p50 {np.percentile(latencies, 50):7.2f} ms | "
+        f"p95 {np.percentile(latencies, 95):7.2f} ms | max {latencies.max():7.2f} ms"
+    )
+
+
+async def main(employee_count: int, days: int, report_workers: int) -> None:
+    rng = np.random.default_rng(11)
+    init_db()
+    templates = seed(employee_count, days, rng)
+    async with AsyncSessionLocal() as db:
+        await template_gallery.load(db)
+    attendance_write_queue.start()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{employee_count} employees, {employee_count * days:,} attendance rows, "
+              f"{SCANS} scans\n")
+        describe("scans alone", await scan_latencies(client, templates))
+
+        stop = asyncio.Event()
+        counter = [0]
+        workers = [
+            asyncio.create_task(report_worker(client, stop, counter))
+            for _ in range(report_workers)
+        ]
+        await asyncio.sleep(0.2)  # Let the reports get going
+        loaded = await scan_latencies(client, templates[SCANS:])
+        stop.set()
+        await asyncio.gather(*workers)
+        describe(f"scans + {report_workers} report workers", loaded)
+        print(f"\nreport rounds completed during the run: {counter[0]}")
+
+    await attendance_write_queue.drain()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 30,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    ))
@@ -0,0 +1,149 @@
+"""
+Benchmark for the dashboard daily summary.
+Compares three ways of computing the same counts:
+
+- python count:   load every attendance row for the date as ORM objects
+                  and count in Python (the original implementation)
+- sql aggregate:  one SUM(CASE ...) statement over the day's attendance
+- summary table:  AttendanceService.get_daily_summary, which sums the
+                  per-department rows of daily_attendance_summary
+
+Usage (from the backend directory):
+    python benchmarks/bench_daily_summary.py [employees] [repeats]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date, time as dt_time
+
+import numpy as np
+
+# Point the app at a throwaway database before any app module is imported
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_daily_summary.db"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import case, func, insert, select
+
+from database import AsyncSessionLocal, SessionLocal, init_db
+from models import Attendance, Employee
+from services.attendance_service import attendance_service
+from services.daily_summary import daily_summary_service, on_time_condition
+from utils.shifts import SHIFT_HOURS, get_on_time_threshold
+
+TARGET_DATE = date(2026, 3, 2)
+
+
+def seed(employee_count: int, rng: np.random.Generator) -> None:
+    """Create employees on mixed shifts; ~90% of them attend TARGET_DATE."""
+    shifts = list(SHIFT_HOURS)
+    db = SessionLocal()
+    db.execute(insert(Employee), [
+        {
+            "employee_no": f"EMP{i:06d}",
+            "name": f"Employee {i}",
+            "department": f"Dept {i % 12}",
+            "shift": shifts[i % len(shifts)]
+        }
+        for i in range(employee_count)
+    ])
+    db.execute(insert(Attendance), [
+        {
+            "employee_no": f"EMP{i:06d}",
+            "attendance_date": TARGET_DATE,
+            "time_in": dt_time(int(rng.integers(5, 23)), int(rng.integers(0, 60))),
+            "time_out": None,
+            "total_work_minutes": 540,
+            "overtime": bool(rng.random() < 0.3),
+            "overtime_minutes": 60
+        }
+        for i in range(employee_count) if rng.random() < 0.9
+    ])
+    for stmt in daily_summary_service.rebuild_statements(TARGET_DATE, TARGET_DATE):
+        db.execute(stmt)
+    db.commit()
+    db.close()
+
+
+async def legacy_summary(db, target_date: date) -> dict:
+    """The previous get_daily_summary: materialize rows, count in Python."""
+    total_employees = await db.scalar(select(func.count(Employee.id)))
+    rows = (await db.execute(
+        select(Attendance, Employee.shift).outerjoin(
+            Employee, Attendance.employee_no == Employee.employee_no
+        ).where(Attendance.attendance_date == target_date)
+    )).all()
+    present = len(rows)
+    on_time = sum(
+        1 for attendance, shift in rows
+        if attendance.time_in and attendance.time_in <= get_on_time_threshold(shift)
+    )
+    return {
+        "date": target_date,
+        "total_employees": total_employees,
+        "present": present,
+        "absent": total_employees - present,
+        "on_time": on_time,
+        "late": present - on_time,
+        "overtime_count": sum(1 for attendance, _ in rows if attendance.overtime)
+    }
+
+
+async def aggregate_summary(db, target_date: date) -> dict:
+    """One aggregate statement over the day's attendance rows."""
+    summary = (await db.execute(
+        select(
+            select(func.count(Employee.id)).scalar_subquery().label("total_employees"),
+            func.count(Attendance.id).label("present"),
+            func.sum(case((on_time_condition(Attendance.time_in, Employee.shift), 1), else_=0)).label("on_time"),
+            func.sum(case((Attendance.overtime, 1), else_=0)).label("overtime_count")
+        ).select_from(Attendance).outerjoin(
+            Employee, Attendance.employee_no == Employee.employee_no
+        ).where(Attendance.attendance_date == target_date)
+    )).one()
+    return {
+        "date": target_date,
+        "total_employees": summary.total_employees,
+        "present": summary.present,
+        "absent": summary.total_employees - summary.present,
+        "on_time": summary.on_time,
+        "late": summary.present - summary.on_time,
+        "overtime_count": summary.overtime_count
+    }
+
+
+async def measure(label: str, summary_fn, repeats: int) -> dict:
+    """Run a summary function `repeats` times on fresh sessions."""
+    latencies = []
+    for _ in range(repeats):
+        async with AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            result = await summary_fn(db, TARGET_DATE)
+            latencies.append((time.perf_counter() - start) * 1000)
+    latencies = np.array(latencies)
+    print(
+        f"{label:<14} | p50 {np.percentile(latencies, 50):8.2f} ms | "
+        f"p95 {np.percentile(latencies, 95):8.2f} ms"
+    )
+    return result
+
+
+async def main(employee_count: int, repeats: int) -> None:
+    init_db()
+    seed(employee_count, np.random.default_rng(5))
+    print(f"{employee_count} employees, {repeats} summaries each\n")
+
+    legacy = await measure("python count", legacy_summary, repeats)
+    aggregated = await measure("sql aggregate", aggregate_summary, repeats)
+    table = await measure("summary table", attendance_service.get_daily_summary, repeats)
+
+    assert legacy == aggregated == table, (legacy, aggregated, table)
+    print(f"\nsummaries match: {table}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    ))
@@ -0,0 +1,138 @@
+"""
+Benchmark for employee and attendance listings.
+Compares reading each employee's encrypted fingerprint template alongside
+the row (what inline storage cost) and hydrating full entities, with the
+EXISTS-computed has_fingerprint and column projection reads the services
+now do.
+
+Usage (from the backend directory):
+    python benchmarks/bench_employee_reads.py [employees] [repeats]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date, time as dt_time
+
+import numpy as np
+
+# Point the app at a throwaway database before any app module is imported
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_employee_reads.db"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select
+
+from database import AsyncSessionLocal, SessionLocal, init_db
+from models import Attendance, Employee, FingerprintTemplate
+from services.attendance_service import attendance_service
+from services.employee_service import employee_service
+from utils.encryption import encryption_service
+
+PAGE_SIZE = 500
+TEMPLATE_BYTES = 1024
+
+
+def seed(employee_count: int, rng: np.random.Generator) -> None:
+    """Employees with encrypted templates, each attending on one day."""
+    template = encryption_service.encrypt_template(rng.bytes(TEMPLATE_BYTES).hex())
+    db = SessionLocal()
+    db.execute(insert(Employee), [
+        {
+            "employee_no": f"EMP{i:06d}",
+            "name": f"Employee {i}",
+            "department": f"Dept {i % 12}",
+            "designation": "Operator"
+        }
+        for i in range(employee_count)
+    ])
+    db.execute(insert(FingerprintTemplate), [
+        {
+            "employee_no": f"EMP{i:06d}",
+            "finger_index": 0,
+            "template": template,
+            "template_hash": f"{i:064x}"
+        }
+        for i in range(employee_count)
+    ])
+    db.execute(insert(Attendance), [
+        {
+            "employee_no": f"EMP{i:06d}",
+            "attendance_date": date(2026, 3, 2),
+            "time_in": dt_time(8, i % 60),
+            "time_out": dt_time(17, 0)
+        }
+        for i in range(employee_count)
+    ])
+    db.commit()
+    db.close()
+
+
+async def legacy_employees(db):
+    """Employee rows read with their template; has_fingerprint derived from it."""
+    rows = (await db.execute(
+        select(Employee, FingerprintTemplate.template).outerjoin(
+            FingerprintTemplate, FingerprintTemplate.employee_no == Employee.employee_no
+        ).order_by(Employee.id).limit(PAGE_SIZE)
+    )).all()
+    return [template is not None for _, template in rows]
+
+
+async def current_employees(db):
+    employees, _, _ = await employee_service.get_all_employees(db, limit=PAGE_SIZE, include_total=False)
+    return [employee.has_fingerprint for employee in employees]
+
+
+async def legacy_attendance(db):
+    """Attendance joined to full Employee entities, formatted in Python."""
+    rows = (await db.execute(
+        select(Attendance, Employee, FingerprintTemplate.template)
+        .join(Employee, Attendance.employee_no == Employee.employee_no)
+        .outerjoin(FingerprintTemplate, FingerprintTemplate.employee_no == Employee.employee_no)
+        .order_by(Attendance.attendance_date.desc(), Attendance.time_in, Attendance.id)
+        .limit(PAGE_SIZE)
+    )).all()
+    return [(attendance.id, employee.name) for attendance, employee, _ in rows]
+
+
+async def current_attendance(db):
+    records, _, _ = await attendance_service.get_all_attendance(db, limit=PAGE_SIZE, include_total=False)
+    return [(record["id"], record["employee_name"]) for record in records]
+
+
+async def measure(label: str, read_fn, repeats: int):
+    latencies = []
+    for _ in range(repeats):
+        async with AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            result = await read_fn(db)
+            latencies.append((time.perf_counter() - start) * 1000)
+    latencies = np.array(latencies)
+    print(
+        f"{label:<20} | p50 {np.percentile(latencies, 50):8.2f} ms | "
+        f"p95 {np.percentile(latencies, 95):8.2f} ms"
+    )
+    return result
+
+
+async def main(employee_count: int, repeats: int) -> None:
+    init_db()
+    seed(employee_count, np.random.default_rng(7))
+    async with AsyncSessionLocal() as db:
+        template_size = await db.scalar(select(func.length(FingerprintTemplate.template)).limit(1))
+    print(
+        f"{employee_count} employees, {PAGE_SIZE}-row pages, {repeats} reads each; "
+        f"template column skipped per page: {template_size * PAGE_SIZE / 1024:.0f} KiB\n"
+    )
+
+    assert await measure("employees + template", legacy_employees, repeats) == \
+        await measure("employees, exists", current_employees, repeats)
+    assert await measure("attendance, entities", legacy_attendance, repeats) == \
+        await measure("attendance, columns", current_attendance, repeats)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    ))
@@ -0,0 +1,95 @@
+"""
+Benchmark for the Employees page search box.
+Compares the old leading-wildcard ILIKE scan with the FTS5-backed ranked
+search of EmployeeService.get_all_employees, one query per keystroke.
+
+Usage (from the backend directory):
+    python benchmarks/bench_employee_search.py [employees] [repeats]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Point the app at a throwaway database before any app module is imported
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_employee_search.db"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select
+
+from database import AsyncSessionLocal, SessionLocal, init_db
+from models import Employee
+from services.employee_service import employee_service
+
+FIRST_NAMES = ["Ali", "Ahmed", "Sara", "Fatima", "Usman", "Ayesha", "Bilal", "Hina", "Kamran", "Zainab"]
+LAST_NAMES = ["Khan", "Shah", "Malik", "Qureshi", "Butt", "Chaudhry", "Raza", "Iqbal", "Sheikh", "Mirza"]
+DESIGNATIONS = ["Operator", "Supervisor", "Manager", "Inspector", "Clerk", "Technician"]
+
+# What a user types, one request per keystroke
+KEYSTROKES = ["q", "qu", "qur", "qure", "qures", "quresh", "qureshi"]
+
+
+def seed(employee_count: int, rng: np.random.Generator) -> None:
+    db = SessionLocal()
+    db.execute(insert(Employee), [
+        {
+            "employee_no": f"EMP-{i:06d}",
+            "name": f"{rng.choice(FIRST_NAMES)}{i % 97} {rng.choice(LAST_NAMES)}",
+            "department": f"Dept {i % 12}",
+            "designation": str(rng.choice(DESIGNATIONS))
+        }
+        for i in range(employee_count)
+    ])
+    db.commit()
+    db.close()
+
+
+async def like_search(db, search: str):
+    """The previous implementation: leading-wildcard ILIKE, ordered by id."""
+    pattern = f"%{search}%"
+    query = select(Employee).where(Employee.name.ilike(pattern) | Employee.employee_no.ilike(pattern))
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    return (await db.scalars(query.order_by(Employee.id).limit(100))).all(), total
+
+
+async def fts_search(db, search: str):
+    employees, total, _ = await employee_service.get_all_employees(db, limit=100, search=search)
+    return employees, total
+
+
+async def measure(label: str, search_fn, repeats: int) -> None:
+    latencies = []
+    async with AsyncSessionLocal() as db:
+        for _ in range(repeats):
+            for keystroke in KEYSTROKES:
+                start = time.perf_counter()
+                await search_fn(db, keystroke)
+                latencies.append((time.perf_counter() - start) * 1000)
+    latencies = np.array(latencies)
+    print(
+        f"{label:<12} | p50 {np.percentile(latencies, 50):8.2f} ms | "
+        f"p95 {np.percentile(latencies, 95):8.2f} ms"
+    )
+
+
+async def main(employee_count: int, repeats: int) -> None:
+    init_db()
+    seed(employee_count, np.random.default_rng(11))
+    print(f"{employee_count} employees, {repeats} x {len(KEYSTROKES)} keystrokes\n")
+
+    await measure("ilike scan", like_search, repeats)
+    await measure("fts5 ranked", fts_search, repeats)
+
+    async with AsyncSessionLocal() as db:
+        employees, total = await fts_search(db, "qureshi")
+        print(f"\n'qureshi': {total} matches, top: {[e.name for e in employees[:3]]}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    ))
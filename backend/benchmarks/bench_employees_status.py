@@ -0,0 +1,139 @@
+"""
+Benchmark for the manual attendance employees-status endpoint.
+Compares the old 1+N query loop with the single LEFT OUTER JOIN
+projection, then measures GET /manual-attendance/employees-status end to
+end with the snapshot cold (invalidated before every call), warm, and
+under a burst of concurrent polls right after an invalidation.
+
+Usage (from the backend directory):
+    python benchmarks/bench_employees_status.py [employees] [repeats]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date, time as dt_time
+
+import numpy as np
+
+# Point the app at a throwaway database before any app module is imported
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_employees_status.db"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from sqlalchemy import insert, select
+
+from auth.jwt_handler import create_access_token
+from database import AsyncSessionLocal, SessionLocal, init_db
+from main import app
+from models import Attendance, Employee
+from services.attendance_service import attendance_service
+from services.status_snapshot import employee_status_snapshot
+
+
+def seed(employee_count: int, rng: np.random.Generator) -> None:
+    """Create employees; ~90% have timed in today, half of those timed out."""
+    db = SessionLocal()
+    db.execute(insert(Employee), [
+        {"employee_no": f"EMP{i:06d}", "name": f"Employee {i}", "department": f"Dept {i % 12}"}
+        for i in range(employee_count)
+    ])
+    db.execute(insert(Attendance), [
+        {
+            "employee_no": f"EMP{i:06d}",
+            "attendance_date": date.today(),
+            "time_in": dt_time(8, int(rng.integers(0, 60))),
+            "time_out": dt_time(17, 0) if rng.random() < 0.5 else None
+        }
+        for i in range(employee_count) if rng.random() < 0.9
+    ])
+    db.commit()
+    db.close()
+
+
+async def legacy_status(db, target_date: date) -> int:
+    """The previous implementation: one attendance query per employee."""
+    employees = (await db.scalars(select(Employee))).all()
+    for employee in employees:
+        await db.scalar(
+            select(Attendance).where(
+                Attendance.employee_no == employee.employee_no,
+                Attendance.attendance_date == target_date
+            )
+        )
+    return len(employees)
+
+
+async def joined_status(db, target_date: date) -> int:
+    return len(await attendance_service.get_employees_status(db, target_date))
+
+
+def describe(label: str, latencies: list) -> None:
+    latencies = np.array(latencies)
+    print(
+        f"{label:<22} | p50 {np.percentile(latencies, 50):8.2f} ms | "
+        f"p95 {np.percentile(latencies, 95):8.2f} ms"
+    )
+
+
+async def time_query(label: str, fn, repeats: int) -> None:
+    latencies = []
+    for _ in range(repeats):
+        async with AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            await fn(db, date.today())
+            latencies.append((time.perf_counter() - start) * 1000)
+    describe(label, latencies)
+
+
+async def time_endpoint(label: str, client: httpx.AsyncClient, headers: dict,
+                        repeats: int, cold: bool, params: dict = None) -> None:
+    latencies = []
+    for _ in range(repeats):
+        if cold:
+            employee_status_snapshot.invalidate()
+        start = time.perf_counter()
+        response = await client.get("/manual-attendance/employees-status", params=params, headers=headers)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.text
+    describe(label, latencies)
+
+
+async def time_burst(client: httpx.AsyncClient, headers: dict, concurrency: int) -> None:
+    """Concurrent polls right after a write: one reload should serve them all."""
+    employee_status_snapshot.invalidate()
+    start = time.perf_counter()
+    responses = await asyncio.gather(*(
+        client.get("/manual-attendance/employees-status", headers=headers)
+        for _ in range(concurrency)
+    ))
+    elapsed = (time.perf_counter() - start) * 1000
+    assert all(response.status_code == 200 for response in responses)
+    print(f"{'burst of ' + str(concurrency):<22} | all done in {elapsed:8.2f} ms")
+
+
+async def main(employee_count: int, repeats: int) -> None:
+    init_db()
+    seed(employee_count, np.random.default_rng(3))
+    print(f"{employee_count} employees, {repeats} requests each\n")
+
+    await time_query("1+N queries", legacy_status, max(1, repeats // 10))
+    await time_query("LEFT JOIN projection", joined_status, repeats)
+
+    token = create_access_token({"sub": "bench", "type": "user", "role": "user"})
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await time_endpoint("endpoint, cold", client, headers, repeats, cold=True)
+        await time_endpoint("endpoint, snapshot", client, headers, repeats, cold=False)
+        await time_endpoint("endpoint, 1 dept page", client, headers, repeats, cold=False,
+                            params={"department": "Dept 3", "limit": 100})
+        await time_burst(client, headers, repeats)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    ))
@@ -0,0 +1,96 @@
+"""
+Benchmark for the LSH candidate pre-filtering index.
+Reports recall (agreement with brute force) against probe latency for a
+grid of bucket parameters, to help tune LSH_TABLES / LSH_HASH_BITS /
+LSH_MULTIPROBE.
+
+Usage (from the backend directory):
+    python benchmarks/bench_lsh.py [gallery_size]
+"""
+import base64
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.lsh_index import LSHIndex
+from utils.matcher import VectorizedMatcher
+
+PROBES = 300
+TEMPLATE_BYTES = 256
+NOISE_FRACTION = 0.05  # Share of template bytes changed between scans
+
+# (tables, hash_bits, multiprobe)
+PARAMETER_GRID = [
+    (4, 12, 0),
+    (8, 12, 0),
+    (8, 12, 2),
+    (8, 14, 2),
+    (12, 14, 2),
+    (16, 16, 4),
+]
+
+
+def build(gallery_size: int, raw_templates: np.ndarray, index=None) -> VectorizedMatcher:
+    """Enroll every template into a matcher with an optional index."""
+    matcher = VectorizedMatcher(
+        feature_length=TEMPLATE_BYTES,
+        initial_capacity=gallery_size,
+        index=index,
+        full_scan_on_empty=False
+    )
+    for i, raw in enumerate(raw_templates):
+        matcher.add(f"EMP{i:06d}", base64.b64encode(raw.tobytes()).decode())
+    return matcher
+
+
+def measure(matcher: VectorizedMatcher, probes: list[str]) -> tuple[list, np.ndarray]:
+    """Identify every probe, returning results and latencies in ms."""
+    results, latencies = [], []
+    for probe in probes:
+        start = time.perf_counter()
+        results.append(matcher.identify(probe))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, np.array(latencies)
+
+
+def main(gallery_size: int) -> None:
+    rng = np.random.default_rng(42)
+    raw_templates = rng.integers(0, 256, size=(gallery_size, TEMPLATE_BYTES), dtype=np.uint8)
+
+    probes = []
+    for target in rng.integers(0, gallery_size, size=PROBES):
+        probe = raw_templates[target].copy()
+        positions = rng.choice(TEMPLATE_BYTES, int(TEMPLATE_BYTES * NOISE_FRACTION), replace=False)
+        probe[positions] = rng.integers(0, 256, size=len(positions), dtype=np.uint8)
+        probes.append(base64.b64encode(probe.tobytes()).decode())
+
+    brute = build(gallery_size, raw_templates)
+    expected, latencies = measure(brute, probes)
+    print(f"LSH benchmark: {gallery_size} templates, {PROBES} noisy probes\n")
+    print(f"{'brute force':<20} | recall 100.0% | p50 {np.percentile(latencies, 50):7.3f} ms")
+
+    for tables, bits, multiprobe in PARAMETER_GRID:
+        index = LSHIndex(TEMPLATE_BYTES, num_tables=tables, hash_bits=bits, multiprobe=multiprobe)
+        matcher = build(gallery_size, raw_templates, index)
+        results, latencies = measure(matcher, probes)
+        recall = np.mean([
+            (got[0] if got else None) == (want[0] if want else None)
+            for got, want in zip(results, expected)
+        ])
+        candidates = np.mean([
+            len(index.candidates(matcher.encode(probe))) for probe in probes[:50]
+        ])
+        print(
+            f"T={tables:<2} bits={bits:<2} probe={multiprobe} | recall {recall:6.1%} | "
+            f"p50 {np.percentile(latencies, 50):7.3f} ms | "
+            f"p95 {np.percentile(latencies, 95):7.3f} ms | "
+            f"~{candidates:.0f} candidates"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
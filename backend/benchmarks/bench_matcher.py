@@ -0,0 +1,77 @@
+"""
+Benchmark for the vectorized fingerprint matcher.
+Measures 1:N probe latency at 1k, 10k and 100k enrolled templates, through
+the awaitable identify_async used by the request handlers.
+
+Usage (from the backend directory):
+    python benchmarks/bench_matcher.py [vectorized|parallel]
+"""
+import asyncio
+import base64
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.matcher import MATCHER_ENGINES
+
+GALLERY_SIZES = [1_000, 10_000, 100_000]
+PROBES = 200
+TEMPLATE_BYTES = 256
+NOISE_FRACTION = 0.05  # Share of template bytes changed between scans
+
+
+def make_templates(count: int, rng: np.random.Generator) -> np.ndarray:
+    """Generate random raw templates."""
+    return rng.integers(0, 256, size=(count, TEMPLATE_BYTES), dtype=np.uint8)
+
+
+def noisy_probe(raw: np.ndarray, rng: np.random.Generator) -> str:
+    """Simulate a second scan of the same finger."""
+    probe = raw.copy()
+    positions = rng.choice(TEMPLATE_BYTES, int(TEMPLATE_BYTES * NOISE_FRACTION), replace=False)
+    probe[positions] = rng.integers(0, 256, size=len(positions), dtype=np.uint8)
+    return base64.b64encode(probe.tobytes()).decode()
+
+
+async def run(mode: str, gallery_size: int) -> None:
+    rng = np.random.default_rng(gallery_size)
+    raw_templates = make_templates(gallery_size, rng)
+    matcher = MATCHER_ENGINES[mode](feature_length=TEMPLATE_BYTES, initial_capacity=gallery_size)
+    matcher.start()
+
+    start = time.perf_counter()
+    for i, raw in enumerate(raw_templates):
+        matcher.add(f"EMP{i:06d}", base64.b64encode(raw.tobytes()).decode())
+    enroll_seconds = time.perf_counter() - start
+
+    targets = rng.integers(0, gallery_size, size=PROBES)
+    probes = [noisy_probe(raw_templates[t], rng) for t in targets]
+
+    latencies = []
+    correct = 0
+    for target, probe in zip(targets, probes):
+        start = time.perf_counter()
+        match = await matcher.identify_async(probe)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if match and match[0] == f"EMP{target:06d}":
+            correct += 1
+
+    latencies = np.array(latencies)
+    print(
+        f"{gallery_size:>8} templates | enroll {enroll_seconds:6.2f}s | "
+        f"p50 {np.percentile(latencies, 50):7.3f} ms | "
+        f"p95 {np.percentile(latencies, 95):7.3f} ms | "
+        f"accuracy {correct / PROBES:.1%}"
+    )
+    matcher.close()
+
+
+if __name__ == "__main__":
+    mode = sys.argv[1] if len(sys.argv) > 1 else "vectorized"
+    print(f"{mode} matcher benchmark ({PROBES} noisy probes per gallery)\n")
+    for size in GALLERY_SIZES:
+        asyncio.run(run(mode, size))
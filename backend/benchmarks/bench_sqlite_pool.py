@@ -0,0 +1,151 @@
+"""
+Benchmark for SQLite connection pooling and PRAGMA tuning.
+Runs one device-writer thread (insert + commit per scan) beside several
+report-reader threads and reports writes/sec and reads/sec for:
+
+- static:   the old single shared connection (StaticPool), every access
+            serialized, default rollback journal / synchronous=FULL
+- pooled:   a connection pool with default PRAGMAs
+- tuned:    a connection pool with the configured PRAGMAs (WAL, ...)
+
+Usage (from the backend directory):
+    python benchmarks/bench_sqlite_pool.py [seconds] [readers]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+from datetime import date, time as dt_time, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base, create_db_engine
+from models import Attendance, Employee
+from utils.config import settings
+
+EMPLOYEES = 1000
+DAYS = 30
+
+
+def seed(engine) -> None:
+    """Create the schema with DAYS of attendance for EMPLOYEES."""
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.execute(insert(Employee), [
+            {"employee_no": f"EMP{i:06d}", "name": f"Employee {i}", "department": f"Dept {i % 12}"}
+            for i in range(EMPLOYEES)
+        ])
+        first_day = date(2026, 1, 1)
+        for day in range(DAYS):
+            db.execute(insert(Attendance), [
+                {
+                    "employee_no": f"EMP{i:06d}",
+                    "attendance_date": first_day + timedelta(days=day),
+                    "time_in": dt_time(8, i % 60),
+                    "time_out": dt_time(17, i % 60),
+                    "total_work_minutes": 540
+                }
+                for i in range(EMPLOYEES)
+            ])
+        db.commit()
+
+
+def run(label: str, engine, serialize: bool, seconds: float, readers: int) -> None:
+    """Run the mixed workload against an engine and print throughput."""
+    seed(engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    lock = threading.Lock() if serialize else nullcontext()
+    stop = threading.Event()
+    counts = {"writes": 0, "reads": 0, "errors": 0}
+
+    def writer():
+        day = date(2026, 6, 1)
+        i = 0
+        while not stop.is_set():
+            try:
+                with lock, Session() as db:
+                    db.execute(insert(Attendance).values(
+                        employee_no=f"EMP{i % EMPLOYEES:06d}",
+                        attendance_date=day + timedelta(days=i // EMPLOYEES),
+                        time_in=dt_time(8, 0)
+                    ))
+                    db.commit()
+                counts["writes"] += 1
+            except Exception:
+                counts["errors"] += 1
+            i += 1
+
+    def reader():
+        while not stop.is_set():
+            try:
+                with lock, Session() as db:
+                    query = select(Attendance, Employee).join(
+                        Employee, Attendance.employee_no == Employee.employee_no
+                    ).where(Attendance.attendance_date >= date(2026, 1, 10))
+                    db.scalar(select(func.count()).select_from(query.subquery()))
+                    db.execute(query.order_by(Attendance.attendance_date.desc()).limit(50)).all()
+                counts["reads"] += 1
+            except Exception:
+                counts["errors"] += 1
+
+    threads = [threading.Thread(target=writer)] + [
+        threading.Thread(target=reader) for _ in range(readers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    print(
+        f"{label:<8} | {counts['writes'] / seconds:8.0f} writes/s | "
+        f"{counts['reads'] / seconds:7.0f} reads/s | {counts['errors']} errors"
+    )
+
+
+def main(seconds: float, readers: int) -> None:
+    workdir = tempfile.mkdtemp()
+    print(f"1 writer + {readers} readers, {EMPLOYEES * DAYS:,} seeded rows, {seconds:.0f}s each\n")
+
+    run(
+        "static",
+        create_engine(
+            f"sqlite:///{workdir}/static.db",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        ),
+        serialize=True, seconds=seconds, readers=readers
+    )
+
+    tuned_pragmas = (settings.SQLITE_JOURNAL_MODE, settings.SQLITE_SYNCHRONOUS,
+                     settings.SQLITE_CACHE_SIZE, settings.SQLITE_MMAP_SIZE,
+                     settings.SQLITE_TEMP_STORE)
+    # SQLite defaults, keeping only the busy timeout so readers wait instead of failing
+    settings.SQLITE_JOURNAL_MODE = "DELETE"
+    settings.SQLITE_SYNCHRONOUS = "FULL"
+    settings.SQLITE_CACHE_SIZE = -2000
+    settings.SQLITE_MMAP_SIZE = 0
+    settings.SQLITE_TEMP_STORE = "DEFAULT"
+    run("pooled", create_db_engine(f"sqlite:///{workdir}/pooled.db"),
+        serialize=False, seconds=seconds, readers=readers)
+
+    (settings.SQLITE_JOURNAL_MODE, settings.SQLITE_SYNCHRONOUS, settings.SQLITE_CACHE_SIZE,
+     settings.SQLITE_MMAP_SIZE, settings.SQLITE_TEMP_STORE) = tuned_pragmas
+    run("tuned", create_db_engine(f"sqlite:///{workdir}/tuned.db"),
+        serialize=False, seconds=seconds, readers=readers)
+
+
+if __name__ == "__main__":
+    main(
+        float(sys.argv[1]) if len(sys.argv) > 1 else 5,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    )
@@ -0,0 +1,94 @@
+"""
+Benchmark for bulk offline-sync of buffered device scans.
+Measures events/sec through AttendanceService.sync_offline_scans against a
+throwaway SQLite database.
+
+Usage (from the backend directory):
+    python benchmarks/bench_sync.py [employees] [events]
+"""
+import asyncio
+import base64
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Point the app at a throwaway database before any app module is imported
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_sync.db"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import AsyncSessionLocal, SessionLocal, init_db
+from models import Employee, FingerprintTemplate
+from services.attendance_service import attendance_service
+from services.template_gallery import template_gallery
+from utils.encryption import encryption_service
+
+TEMPLATE_BYTES = 256
+
+
+async def seed(employee_count: int, rng: np.random.Generator) -> list[str]:
+    """Create enrolled employees and return their templates."""
+    templates = [
+        base64.b64encode(raw.tobytes()).decode()
+        for raw in rng.integers(0, 256, size=(employee_count, TEMPLATE_BYTES), dtype=np.uint8)
+    ]
+    db = SessionLocal()
+    db.add_all([
+        Employee(
+            employee_no=f"EMP{i:06d}",
+            name=f"Employee {i}",
+            shift="G"
+        )
+        for i in range(employee_count)
+    ])
+    db.add_all([
+        FingerprintTemplate(
+            employee_no=f"EMP{i:06d}",
+            template=encryption_service.encrypt_template(template),
+            template_hash=encryption_service.fingerprint_digest(template)
+        )
+        for i, template in enumerate(templates)
+    ])
+    db.commit()
+    db.close()
+    async with AsyncSessionLocal() as db:
+        await template_gallery.load(db)
+    return templates
+
+
+async def main(employee_count: int, event_count: int) -> None:
+    rng = np.random.default_rng(7)
+    init_db()
+    templates = await seed(employee_count, rng)
+
+    # Two scans per employee per day (in and out), shuffled as devices upload them
+    start_day = datetime(2026, 1, 5, 8, 0)
+    events = []
+    while len(events) < event_count:
+        day = start_day + timedelta(days=len(events) // (2 * employee_count))
+        for who in rng.permutation(employee_count):
+            events.append((templates[who], "GATE-1", day + timedelta(minutes=int(rng.integers(0, 60)))))
+            events.append((templates[who], "GATE-1", day + timedelta(hours=9, minutes=int(rng.integers(0, 60)))))
+    events = [events[i] for i in rng.permutation(event_count)]
+
+    async with AsyncSessionLocal() as db:
+        start = time.perf_counter()
+        results = await attendance_service.sync_offline_scans(db, events)
+        elapsed = time.perf_counter() - start
+
+    actions = {}
+    for _, action in results:
+        actions[action] = actions.get(action, 0) + 1
+    print(f"{event_count} events, {employee_count} employees: {elapsed:.3f}s "
+          f"({event_count / elapsed:,.0f} events/sec)")
+    print(f"actions: {actions}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    ))
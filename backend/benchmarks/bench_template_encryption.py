@@ -0,0 +1,71 @@
+"""
+Benchmark for fingerprint template encryption.
+Compares the previous Fernet tokens (AES-CBC + HMAC, base64 text) with the
+AES-GCM template BLOBs written by EncryptionService.encrypt_template:
+encrypt/decrypt throughput, bytes per stored template, and the size of a
+SQLite table holding them.
+
+Usage (from the backend directory):
+    python benchmarks/bench_template_encryption.py [templates] [template_bytes]
+"""
+import base64
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.encryption import encryption_service
+
+
+def fernet_encrypt(template: str) -> bytes:
+    """The previous encrypt_template: a Fernet token over the template text."""
+    return encryption_service._fernet.encrypt(template.encode('utf-8'))
+
+
+def throughput(fn, items: list) -> tuple[float, list]:
+    """Run fn over items; return (items per second, results)."""
+    start = time.perf_counter()
+    results = [fn(item) for item in items]
+    return len(items) / (time.perf_counter() - start), results
+
+
+def table_size(blobs: list[bytes]) -> int:
+    """Bytes used by a SQLite file holding the blobs, one row each."""
+    path = os.path.join(tempfile.mkdtemp(), "bench_template_encryption.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE fingerprint_templates (id INTEGER PRIMARY KEY, template BLOB NOT NULL)")
+    conn.executemany("INSERT INTO fingerprint_templates (template) VALUES (?)", ((blob,) for blob in blobs))
+    conn.commit()
+    conn.execute("VACUUM")
+    page_count, = conn.execute("PRAGMA page_count").fetchone()
+    page_size, = conn.execute("PRAGMA page_size").fetchone()
+    conn.close()
+    return page_count * page_size
+
+
+def main(count: int, template_bytes: int) -> None:
+    templates = [base64.b64encode(os.urandom(template_bytes)).decode('ascii') for _ in range(count)]
+    print(
+        f"{count} templates, {template_bytes} raw bytes "
+        f"({len(templates[0])} chars base64)\n"
+    )
+    print(f"{'format':<12} | {'encrypt/s':>10} | {'decrypt/s':>10} | {'bytes/row':>9} | {'table size':>10}")
+
+    for label, encrypt in (("fernet", fernet_encrypt), ("aes-gcm", encryption_service.encrypt_template)):
+        encrypt_rate, blobs = throughput(encrypt, templates)
+        decrypt_rate, decrypted = throughput(encryption_service.decrypt_template, blobs)
+        assert decrypted == templates
+        print(
+            f"{label:<12} | {encrypt_rate:10.0f} | {decrypt_rate:10.0f} | "
+            f"{sum(map(len, blobs)) / count:9.0f} | {table_size(blobs) / 1024:7.0f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 512
+    )
@@ -1,39 +1,206 @@
 """
 Database configuration and session management.
-Uses SQLAlchemy with SQLite database.
+Uses SQLAlchemy with SQLite (default) or PostgreSQL.
+
+Request handlers use the async engine (aiosqlite / asyncpg) so queries never
+block the event loop. GET endpoints use a separate read-only engine (see
+get_read_url) so reports never hold connections or locks needed by device
+writes. The sync engine is kept for table creation, migrations and
+maintenance scripts.
 """
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
 
 from utils.config import settings
 
-# Create SQLAlchemy engine
-# Using StaticPool for SQLite to handle concurrent connections
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False},  # Required for SQLite
-    poolclass=StaticPool,
-    echo=False  # Set to True for SQL query logging
+# Drivers used for each backend by the sync and async engines
+SYNC_DRIVERS = {"sqlite": "pysqlite", "postgresql": "psycopg2"}
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+# Drivers that only work with one kind of engine
+ASYNC_ONLY_DRIVERS = {"aiosqlite", "asyncpg"}
+SYNC_ONLY_DRIVERS = {"pysqlite", "psycopg2", "pg8000"}
+
+
+def get_sync_url(url: str):
+    """
+    Derive the sync driver URL from a DATABASE_URL.
+    e.g. postgresql+asyncpg:// -> postgresql+psycopg2://
+    """
+    parsed = make_url(url)
+    if parsed.get_driver_name() in ASYNC_ONLY_DRIVERS:
+        backend = parsed.get_backend_name()
+        return parsed.set(drivername=f"{backend}+{SYNC_DRIVERS[backend]}")
+    return parsed
+
+
+def get_async_url(url: str):
+    """
+    Derive the async driver URL from a DATABASE_URL.
+    e.g. sqlite:// -> sqlite+aiosqlite://, postgresql:// -> postgresql+asyncpg://
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend in ASYNC_DRIVERS and (
+        "+" not in parsed.drivername or parsed.get_driver_name() in SYNC_ONLY_DRIVERS
+    ):
+        return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    return parsed
+
+
+def is_sqlite_memory(url) -> bool:
+    """True for in-memory SQLite URLs, which must share one connection."""
+    parsed = make_url(url)
+    return parsed.database in (None, "", ":memory:") or parsed.query.get("mode") == "memory"
+
+
+def get_read_url(url: str):
+    """
+    URL of the read-only engine for a DATABASE_URL.
+
+    DATABASE_READ_URL (e.g. a streaming replica) wins when set. Otherwise a
+    file-backed SQLite database is reopened as a read-only URI
+    (file:...?mode=ro), and anything else returns None (share the primary).
+    """
+    if settings.DATABASE_READ_URL:
+        return make_url(settings.DATABASE_READ_URL)
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and not is_sqlite_memory(url):
+        return parsed.set(
+            database=f"file:{os.path.abspath(parsed.database)}",
+            query={**parsed.query, "mode": "ro", "uri": "true"}
+        )
+    return None
+
+
+def sqlite_pragmas() -> list[tuple[str, object]]:
+    """PRAGMAs applied to every new SQLite connection, from Settings."""
+    return [
+        ("journal_mode", settings.SQLITE_JOURNAL_MODE),
+        ("synchronous", settings.SQLITE_SYNCHRONOUS),
+        ("busy_timeout", settings.SQLITE_BUSY_TIMEOUT_MS),
+        ("cache_size", settings.SQLITE_CACHE_SIZE),
+        ("mmap_size", settings.SQLITE_MMAP_SIZE),
+        ("temp_store", settings.SQLITE_TEMP_STORE),
+    ]
+
+
+# PRAGMAs that change the database file and fail on read-only connections
+SQLITE_WRITER_PRAGMAS = {"journal_mode", "synchronous"}
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Connection event hook: tune each SQLite connection as it is opened."""
+    cursor = dbapi_connection.cursor()
+    for name, value in sqlite_pragmas():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def _apply_sqlite_read_pragmas(dbapi_connection, connection_record):
+    """Connection event hook for read-only SQLite connections."""
+    cursor = dbapi_connection.cursor()
+    for name, value in sqlite_pragmas():
+        if name not in SQLITE_WRITER_PRAGMAS:
+            cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def create_db_engine(url: str, is_async: bool = False, read_only: bool = False):
+    """
+    Create a sync or async engine for a DATABASE_URL.
+
+    File-backed SQLite gets a connection pool (one connection per
+    concurrent session) plus the configured PRAGMAs; in-memory SQLite
+    keeps a single shared connection. Server databases (PostgreSQL) get a
+    queue pool sized from Settings with pre-ping, so connections dropped
+    by the server or a proxy are replaced instead of failing a request.
+
+    Args:
+        url: Database URL (sync driver form)
+        is_async: Build an AsyncEngine on the matching async driver
+        read_only: Skip PRAGMAs that need write access (SQLite mode=ro)
+
+    Returns:
+        Engine or AsyncEngine
+    """
+    options = {"echo": False}  # Set echo to True for SQL query logging
+    sqlite = make_url(url).get_backend_name() == "sqlite"
+
+    if sqlite:
+        options["connect_args"] = {"check_same_thread": False}  # Required for SQLite
+
+    if sqlite and is_sqlite_memory(url):
+        options["poolclass"] = StaticPool
+    else:
+        options["poolclass"] = AsyncAdaptedQueuePool if is_async else QueuePool
+        options["pool_size"] = settings.DB_POOL_SIZE
+        options["max_overflow"] = settings.DB_MAX_OVERFLOW
+        if not sqlite:
+            options["pool_timeout"] = settings.DB_POOL_TIMEOUT
+            options["pool_recycle"] = settings.DB_POOL_RECYCLE
+            options["pool_pre_ping"] = True
+
+    if is_async:
+        db_engine = create_async_engine(get_async_url(url), **options)
+        sync_engine = db_engine.sync_engine
+    else:
+        db_engine = sync_engine = create_engine(get_sync_url(url), **options)
+
+    if sqlite and not is_sqlite_memory(url):
+        event.listen(
+            sync_engine, "connect",
+            _apply_sqlite_read_pragmas if read_only else _apply_sqlite_pragmas
+        )
+
+    return db_engine
+
+
+# Create SQLAlchemy engines
+engine = create_db_engine(settings.DATABASE_URL)
+
+# Async engine for request handling
+async_engine = create_db_engine(settings.DATABASE_URL, is_async=True)
+
+# Read-only async engine for GET endpoints (falls back to the primary)
+_read_url = get_read_url(settings.DATABASE_URL)
+async_read_engine = (
+    create_db_engine(_read_url, is_async=True, read_only=True) if _read_url else async_engine
 )
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create session factories
+# expire_on_commit=False: RETURNING already loads fresh row state, so
+# objects stay readable after commit without another SELECT (and async
+# sessions cannot lazy-load expired attributes anyway)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
 
 # Base class for ORM models
 Base = declarative_base()
 
 
-def get_db():
+async def get_db():
     """
-    Dependency that provides a database session.
+    Dependency that provides an async database session.
     Ensures proper cleanup after each request.
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_read_db():
+    """
+    Dependency that provides a session on the read-only engine.
+    Used by GET endpoints; device and mutation endpoints use get_db.
+    """
+    async with AsyncReadSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 def init_db():
@@ -41,5 +208,16 @@ def init_db():
     Initialize database tables.
     Called on application startup.
     """
-    from models import employee, attendance, user  # Import models to register them
+    from models import employee, attendance, daily_summary, fingerprint_template, user  # Import models to register them
+    from services.employee_search import ensure_employee_search_index
+    from migrate_database import ensure_attendance_unique_index
     Base.metadata.create_all(bind=engine)
+    
+    # Device scans upsert on uq_attendance_employee_date, which create_all
+    # does not add to an attendance table that predates it
+    with engine.connect() as conn:
+        ensure_attendance_unique_index(conn)
+    
+    # The search index is not a mapped table; add it to databases that predate it
+    with engine.begin() as conn:
+        ensure_employee_search_index(conn)
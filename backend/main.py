@@ -16,7 +16,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 
-from database import init_db
+from database import init_db, AsyncSessionLocal, async_engine, async_read_engine
+from services.key_rotation import template_reencryption_job
+from services.template_gallery import template_gallery
+from services.write_queue import attendance_write_queue
+from utils.config import settings
 from routers import (
     auth_router,
     admin_users_router,
@@ -41,7 +45,7 @@ STATIC_DIR = os.path.join(BASE_DIR, "static")
 async def lifespan(app: FastAPI):
     """
     Application lifespan handler.
-    Initializes database on startup.
+    Initializes database, fingerprint gallery and write queue on startup.
     """
     # Startup: Initialize database tables
     print("🚀 Starting Fingerprint Attendance System...")
@@ -53,10 +57,34 @@ async def lifespan(app: FastAPI):
     init_db()
     print("✅ Database initialized successfully")
     
+    # Start the matcher's worker pool (parallel mode), then decrypt enrolled
+    # fingerprint templates once into the in-memory gallery
+    template_gallery.matcher.start()
+    async with AsyncSessionLocal() as db:
+        loaded = await template_gallery.load(db)
+    print(f"✅ Fingerprint gallery loaded ({loaded} templates)")
+    if template_gallery.stale:
+        # Re-encrypted in throttled batches while the app serves traffic
+        template_reencryption_job.start()
+        print(f"✅ Re-encrypting {template_gallery.stale} templates sealed with an old key or format")
+    
+    if settings.WRITE_QUEUE_ENABLED:
+        attendance_write_queue.start()
+        print("✅ Attendance write queue started")
+    
     yield
     
     # Shutdown
     print("👋 Shutting down...")
+    # Commit scans still waiting in the write queue before exiting
+    await attendance_write_queue.drain()
+    # Let a running key rotation commit its current batch; it resumes on restart
+    template_reencryption_job.stop()
+    await template_reencryption_job.wait()
+    template_gallery.matcher.close()
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
 
 
 # Create FastAPI application
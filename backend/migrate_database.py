@@ -1,55 +1,190 @@
 """
 Database migration script to add new employee fields.
-Run this to update existing database with new columns.
+Run this to update existing database with new columns and indexes.
+Works against DATABASE_URL, so SQLite and PostgreSQL are both supported.
 """
-import sqlite3
-import os
+from sqlalchemy import delete, func, inspect, select, text, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from database import engine
+from models import Attendance, DailySummary, Employee
+from models.attendance import ATTENDANCE_DATE_BRIN
+from migrate_fingerprint_templates import migrate_fingerprint_templates
+from rebuild_daily_summary import rebuild_daily_summary
+from services.employee_search import ensure_employee_search_index
+from utils.shifts import calculate_overtime
+
+
+def _table_index(table, name):
+    """Return the Index declared on a model table under a given name."""
+    return next(index for index in table.indexes if index.name == name)
 
-# Get database path
-DB_PATH = os.path.join(os.path.dirname(__file__), 'attendance.db')
 
 def migrate_database():
     """Add new columns to employees table."""
-    
-    print(f"Migrating database: {DB_PATH}")
-    
-    if not os.path.exists(DB_PATH):
+
+    print(f"Migrating database: {engine.url.render_as_string(hide_password=True)}")
+
+    inspector = inspect(engine)
+    if not inspector.has_table("employees"):
         print("Database doesn't exist yet. Will be created with new schema on first run.")
         return
-    
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # List of new columns to add
+
+    # List of new columns to add (types come from the model, per dialect)
     new_columns = [
-        ("date_of_birth", "DATETIME"),
-        ("reference_1", "VARCHAR(200)"),
-        ("reference_2", "VARCHAR(200)"),
-        ("reference_address_1", "TEXT"),
-        ("reference_address_2", "TEXT"),
-        ("shift", "VARCHAR(1)"),
+        "date_of_birth",
+        "reference_1",
+        "reference_2",
+        "reference_address_1",
+        "reference_address_2",
+        "shift",
     ]
-    
+
     # Get existing columns
-    cursor.execute("PRAGMA table_info(employees)")
-    existing_columns = {row[1] for row in cursor.fetchall()}
-    
-    # Add new columns if they don't exist
-    for column_name, column_type in new_columns:
-        if column_name not in existing_columns:
-            try:
-                sql = f"ALTER TABLE employees ADD COLUMN {column_name} {column_type}"
-                print(f"Adding column: {column_name}")
-                cursor.execute(sql)
-                conn.commit()
-                print(f"✓ Added {column_name}")
-            except sqlite3.Error as e:
-                print(f"✗ Error adding {column_name}: {e}")
-        else:
-            print(f"○ Column {column_name} already exists")
-    
-    conn.close()
+    existing_columns = {column["name"] for column in inspector.get_columns("employees")}
+
+    with engine.connect() as conn:
+        # Add new columns if they don't exist
+        for column_name in new_columns:
+            if column_name not in existing_columns:
+                column_type = Employee.__table__.c[column_name].type.compile(dialect=conn.dialect)
+                try:
+                    print(f"Adding column: {column_name}")
+                    conn.execute(text(f"ALTER TABLE employees ADD COLUMN {column_name} {column_type}"))
+                    conn.commit()
+                    print(f"✓ Added {column_name}")
+                except SQLAlchemyError as e:
+                    conn.rollback()
+                    print(f"✗ Error adding {column_name}: {e}")
+            else:
+                print(f"○ Column {column_name} already exists")
+
+        # Templates move from the employees row to fingerprint_templates
+        migrate_fingerprint_templates(conn)
+        print("✓ Ensured table fingerprint_templates")
+
+        ensure_attendance_unique_index(conn)
+
+        if conn.dialect.name == "postgresql" and inspect(conn).has_table("attendance"):
+            conn.execute(ATTENDANCE_DATE_BRIN)
+            conn.commit()
+            print("✓ Ensured BRIN index ix_attendance_attendance_date_brin")
+
+        migrate_daily_summary(conn)
+
+        ensure_employee_search_index(conn)
+        conn.commit()
+        print("✓ Ensured employee search index")
+
     print("\nMigration complete!")
 
+
+def ensure_attendance_unique_index(conn) -> None:
+    """
+    Make sure uq_attendance_employee_date exists; device scans upsert on it.
+    Databases that predate it get their duplicate days merged first, and
+    the daily summary is rebuilt for the merged dates. Also run by init_db
+    on startup, since create_all does not add indexes to existing tables.
+    """
+    if not inspect(conn).has_table("attendance"):
+        print("○ No attendance table yet")
+        return
+    if any(index["name"] == "uq_attendance_employee_date" for index in inspect(conn).get_indexes("attendance")):
+        return
+
+    duplicates = dedupe_attendance(conn)
+    if duplicates and inspect(conn).has_table(DailySummary.__tablename__):
+        merged_dates = [attendance_date for _, attendance_date in duplicates]
+        rebuild_daily_summary(conn, min(merged_dates), max(merged_dates))
+        conn.commit()
+
+
+def dedupe_attendance(conn) -> list:
+    """
+    Merge duplicate attendance rows per (employee_no, attendance_date) and
+    add the unique index that prevents new duplicates.
+
+    The lowest id is kept with the earliest time_in and latest time_out of
+    the group; work minutes and overtime are recalculated.
+
+    Returns:
+        (employee_no, attendance_date) of every merged day
+    """
+    if not inspect(conn).has_table("attendance"):
+        print("○ No attendance table yet")
+        return []
+
+    duplicates = conn.execute(
+        select(Attendance.employee_no, Attendance.attendance_date)
+        .group_by(Attendance.employee_no, Attendance.attendance_date)
+        .having(func.count() > 1)
+    ).all()
+
+    for employee_no, attendance_date in duplicates:
+        rows = conn.execute(
+            select(
+                Attendance.id,
+                Attendance.time_in,
+                Attendance.time_out,
+                Attendance.device_id,
+                Employee.shift
+            )
+            .outerjoin(Employee, Employee.employee_no == Attendance.employee_no)
+            .where(
+                Attendance.employee_no == employee_no,
+                Attendance.attendance_date == attendance_date
+            )
+            .order_by(Attendance.id)
+        ).all()
+
+        keep_id = rows[0].id
+        shift = rows[0].shift
+        times_in = [row.time_in for row in rows if row.time_in]
+        times_out = [row.time_out for row in rows if row.time_out]
+        time_in = min(times_in) if times_in else None
+        time_out = max(times_out) if times_out else None
+        device_id = rows[-1].device_id
+
+        total_minutes = Attendance(time_in=time_in, time_out=time_out).calculate_work_minutes()
+        is_overtime, overtime_minutes = calculate_overtime(total_minutes, shift)
+
+        conn.execute(
+            update(Attendance).where(Attendance.id == keep_id).values(
+                time_in=time_in,
+                time_out=time_out,
+                device_id=device_id,
+                total_work_minutes=total_minutes,
+                overtime=is_overtime,
+                overtime_minutes=overtime_minutes
+            )
+        )
+        conn.execute(
+            delete(Attendance).where(
+                Attendance.employee_no == employee_no,
+                Attendance.attendance_date == attendance_date,
+                Attendance.id != keep_id
+            )
+        )
+
+    conn.commit()
+    print(f"✓ Merged {len(duplicates)} duplicate attendance day(s)")
+
+    _table_index(Attendance.__table__, "uq_attendance_employee_date").create(conn, checkfirst=True)
+    conn.commit()
+    print("✓ Ensured unique index uq_attendance_employee_date")
+    return duplicates
+
+
+def migrate_daily_summary(conn):
+    """Create daily_attendance_summary and fill it if it is still empty."""
+    DailySummary.__table__.create(conn, checkfirst=True)
+    conn.commit()
+    print("✓ Ensured table daily_attendance_summary")
+
+    if inspect(conn).has_table("attendance") and conn.scalar(select(func.count(DailySummary.id))) == 0:
+        rebuild_daily_summary(conn)
+        conn.commit()
+
+
 if __name__ == "__main__":
     migrate_database()
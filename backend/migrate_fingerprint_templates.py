@@ -0,0 +1,108 @@
+"""
+Migration script for fingerprint templates.
+Moves templates stored inline on employees (fingerprint_template and
+fingerprint_hash, from before the fingerprint_templates table) into
+fingerprint_templates as finger 0, in batches. Each batch commits with the
+inline copies cleared, so an interrupted run resumes where it stopped.
+
+Usage:
+    python migrate_fingerprint_templates.py [batch_size]
+"""
+import sys
+
+from sqlalchemy import Integer, String, Text, column, inspect, select, table, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from database import engine, init_db
+from models import FingerprintTemplate
+from utils.encryption import encryption_service
+
+# Number of employees moved per transaction
+BATCH_SIZE = 500
+
+
+def migrate_fingerprint_templates(conn, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Move inline employee templates into fingerprint_templates.
+    Commits after every batch. Employees that already have a finger 0 in
+    the new table keep it; templates that cannot be decrypted stay inline.
+
+    Returns:
+        Number of templates moved
+    """
+    FingerprintTemplate.__table__.create(conn, checkfirst=True)
+    conn.commit()
+
+    legacy_columns = {c["name"] for c in inspect(conn).get_columns("employees")}
+    if "fingerprint_template" not in legacy_columns:
+        return 0
+
+    # The legacy columns are no longer mapped on Employee
+    employees = table(
+        "employees",
+        column("id", Integer),
+        column("employee_no", String),
+        column("fingerprint_template", Text),
+        *([column("fingerprint_hash", String)] if "fingerprint_hash" in legacy_columns else [])
+    )
+    cleared = {name: None for name in ("fingerprint_template", "fingerprint_hash") if name in employees.c}
+    dialect_insert = postgresql.insert if conn.dialect.name == "postgresql" else sqlite.insert
+
+    last_id = 0
+    moved = 0
+    failed = 0
+
+    while True:
+        rows = conn.execute(
+            select(employees.c.id, employees.c.employee_no, employees.c.fingerprint_template)
+            .where(employees.c.id > last_id, employees.c.fingerprint_template.isnot(None))
+            .order_by(employees.c.id)
+            .limit(batch_size)
+        ).all()
+
+        if not rows:
+            break
+
+        values = []
+        moved_ids = []
+        for employee_id, employee_no, encrypted in rows:
+            last_id = employee_id
+            try:
+                template = encryption_service.decrypt(encrypted)
+            except Exception as e:
+                failed += 1
+                print(f"✗ Could not decrypt template for {employee_no}: {e!r}")
+                continue
+
+            values.append({
+                "employee_no": employee_no,
+                "finger_index": 0,
+                "template": encryption_service.encrypt_template(template),
+                "template_hash": encryption_service.fingerprint_digest(template)
+            })
+            moved_ids.append(employee_id)
+
+        if values:
+            conn.execute(
+                dialect_insert(FingerprintTemplate).values(values).on_conflict_do_nothing(
+                    index_elements=[FingerprintTemplate.employee_no, FingerprintTemplate.finger_index]
+                )
+            )
+            conn.execute(update(employees).where(employees.c.id.in_(moved_ids)).values(**cleared))
+
+        conn.commit()
+        if values:
+            moved += len(values)
+            print(f"✓ Moved {moved} fingerprint templates so far")
+
+    if moved or failed:
+        print(f"✓ Fingerprint template migration complete: {moved} moved, {failed} failed")
+        if conn.dialect.name == "sqlite" and moved:
+            print("○ Run VACUUM to reclaim the space the inline templates used")
+    return moved
+
+
+if __name__ == "__main__":
+    init_db()  # Creates fingerprint_templates on databases that predate it
+    with engine.connect() as conn:
+        migrate_fingerprint_templates(conn, int(sys.argv[1]) if len(sys.argv) > 1 else BATCH_SIZE)
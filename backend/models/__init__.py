@@ -1,6 +1,8 @@
 """Database models."""
 from models.employee import Employee
 from models.attendance import Attendance
+from models.daily_summary import DailySummary
+from models.fingerprint_template import FingerprintTemplate
 from models.user import User
 
-__all__ = ["Employee", "Attendance", "User"]
+__all__ = ["Employee", "Attendance", "DailySummary", "FingerprintTemplate", "User"]
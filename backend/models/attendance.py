@@ -1,7 +1,7 @@
 """
 Attendance model - Records employee attendance.
 """
-from sqlalchemy import Column, Integer, String, Date, Time, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, Time, Boolean, DateTime, ForeignKey, Index, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -12,8 +12,12 @@ class Attendance(Base):
     """
     Attendance records table.
     Links to employee via employee_no foreign key.
+    One row per employee per day, enforced by a unique index.
     """
     __tablename__ = "attendance"
+    __table_args__ = (
+        Index("uq_attendance_employee_date", "employee_no", "attendance_date", unique=True),
+    )
     
     # Primary key
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
@@ -90,3 +94,13 @@ class Attendance(Base):
         
         self.overtime = is_overtime
         self.overtime_minutes = overtime_mins
+
+
+# PostgreSQL only: attendance rows are appended roughly in date order, so a
+# BRIN index answers date-range report scans at a fraction of a B-tree's size
+ATTENDANCE_DATE_BRIN = DDL(
+    "CREATE INDEX IF NOT EXISTS ix_attendance_attendance_date_brin "
+    "ON attendance USING brin (attendance_date)"
+).execute_if(dialect="postgresql")
+
+event.listen(Attendance.__table__, "after_create", ATTENDANCE_DATE_BRIN)
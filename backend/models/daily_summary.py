@@ -0,0 +1,35 @@
+"""
+Daily summary model - Attendance counts per date and department.
+"""
+from sqlalchemy import Column, Integer, String, Date, Index
+
+from database import Base
+
+
+class DailySummary(Base):
+    """
+    Daily attendance summary table.
+    One row per (attendance_date, department), kept in step with the
+    attendance table by applying count deltas in the same transaction as
+    each attendance write. Rebuild from raw attendance with
+    rebuild_daily_summary.py.
+    """
+    __tablename__ = "daily_attendance_summary"
+    __table_args__ = (
+        Index("uq_daily_summary_date_department", "attendance_date", "department", unique=True),
+    )
+
+    # Primary key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Summary key ("" for employees without a department, so the key is unique)
+    attendance_date = Column(Date, nullable=False)
+    department = Column(String(100), nullable=False, default="")
+
+    # Counts (late = present - on_time)
+    present = Column(Integer, nullable=False, default=0)
+    on_time = Column(Integer, nullable=False, default=0)
+    overtime_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DailySummary(date='{self.attendance_date}', department='{self.department}', present={self.present})>"
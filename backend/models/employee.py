@@ -1,17 +1,19 @@
 """
 Employee model - Master table for employee data.
 """
-from sqlalchemy import Column, Integer, String, DateTime, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Text, DDL, event, exists
+from sqlalchemy.orm import column_property, relationship
 from sqlalchemy.sql import func
 
 from database import Base
+from models.fingerprint_template import FingerprintTemplate
 
 
 class Employee(Base):
     """
     Employee master table.
-    Stores all employee information including encrypted fingerprint template.
+    Stores all employee information; enrolled fingers live in
+    fingerprint_templates.
     """
     __tablename__ = "employees"
     
@@ -43,8 +45,11 @@ class Employee(Base):
     date_of_joining = Column(DateTime, nullable=True)
     shift = Column(String(1), nullable=True)  # D=12h, A/B/C/G=8h
     
-    # Fingerprint template (encrypted)
-    fingerprint_template = Column(Text, nullable=True)
+    # Enrollment flag computed in SQL (indexed EXISTS on fingerprint_templates)
+    has_fingerprint = column_property(
+        exists().where(FingerprintTemplate.employee_no == employee_no)
+        .correlate_except(FingerprintTemplate)
+    )
     
     # Timestamps
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
@@ -55,3 +60,51 @@ class Employee(Base):
     
     def __repr__(self):
         return f"<Employee(id={self.id}, employee_no='{self.employee_no}', name='{self.name}')>"
+
+
+# Columns covered by the employee search index (see services/employee_search.py)
+EMPLOYEE_SEARCH_COLUMNS = ("name", "employee_no", "department", "designation")
+
+_columns = ", ".join(EMPLOYEE_SEARCH_COLUMNS)
+_new_values = ", ".join(f"new.{column}" for column in EMPLOYEE_SEARCH_COLUMNS)
+_old_values = ", ".join(f"old.{column}" for column in EMPLOYEE_SEARCH_COLUMNS)
+
+# SQLite: external-content FTS5 table over the employees rows (rowid = id),
+# kept in sync by triggers so every write path updates it. The trigram
+# tokenizer answers substring queries, like ILIKE '%term%' on PostgreSQL.
+EMPLOYEE_SEARCH_SQLITE_DDL = [
+    DDL(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS employees_fts USING fts5("
+        f"{_columns}, content='employees', content_rowid='id', "
+        f"tokenize='trigram')"
+    ),
+    DDL(
+        f"CREATE TRIGGER IF NOT EXISTS employees_fts_ai AFTER INSERT ON employees BEGIN "
+        f"INSERT INTO employees_fts(rowid, {_columns}) VALUES (new.id, {_new_values}); END"
+    ),
+    DDL(
+        f"CREATE TRIGGER IF NOT EXISTS employees_fts_ad AFTER DELETE ON employees BEGIN "
+        f"INSERT INTO employees_fts(employees_fts, rowid, {_columns}) "
+        f"VALUES ('delete', old.id, {_old_values}); END"
+    ),
+    DDL(
+        f"CREATE TRIGGER IF NOT EXISTS employees_fts_au AFTER UPDATE OF id, {_columns} ON employees BEGIN "
+        f"INSERT INTO employees_fts(employees_fts, rowid, {_columns}) "
+        f"VALUES ('delete', old.id, {_old_values}); "
+        f"INSERT INTO employees_fts(rowid, {_columns}) VALUES (new.id, {_new_values}); END"
+    ),
+]
+
+# PostgreSQL: trigram GIN indexes so ILIKE '%term%' is answered from an index
+EMPLOYEE_SEARCH_POSTGRESQL_DDL = [DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm")] + [
+    DDL(
+        f"CREATE INDEX IF NOT EXISTS ix_employees_{column}_trgm "
+        f"ON employees USING gin ({column} gin_trgm_ops)"
+    )
+    for column in EMPLOYEE_SEARCH_COLUMNS
+]
+
+for _ddl in EMPLOYEE_SEARCH_SQLITE_DDL:
+    event.listen(Employee.__table__, "after_create", _ddl.execute_if(dialect="sqlite"))
+for _ddl in EMPLOYEE_SEARCH_POSTGRESQL_DDL:
+    event.listen(Employee.__table__, "after_create", _ddl.execute_if(dialect="postgresql"))
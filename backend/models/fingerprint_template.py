@@ -0,0 +1,46 @@
+"""
+Fingerprint template model - Enrolled fingers per employee.
+"""
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, ForeignKey, Index
+from sqlalchemy.sql import func
+
+from database import Base
+
+
+class FingerprintTemplate(Base):
+    """
+    Fingerprint templates table.
+    One row per enrolled finger, kept apart from the wide employees row so
+    employee pages stay small and matching scans only this compact table.
+    """
+    __tablename__ = "fingerprint_templates"
+    __table_args__ = (
+        Index("uq_fingerprint_templates_employee_finger", "employee_no", "finger_index", unique=True),
+    )
+
+    # Primary key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Owner and finger (ISO/IEC 19794 position: 1-10, 0 = unspecified)
+    employee_no = Column(
+        String(50),
+        ForeignKey("employees.employee_no", ondelete="CASCADE", onupdate="CASCADE"),
+        nullable=False
+    )
+    finger_index = Column(Integer, nullable=False, default=0)
+
+    # Capture quality reported by the device (0-100), if any
+    quality = Column(Integer, nullable=True)
+
+    # Encrypted template (see EncryptionService.encrypt_template)
+    template = Column(LargeBinary, nullable=False)
+
+    # Keyed blind index of the template (HMAC digest) for indexed lookups
+    template_hash = Column(String(64), nullable=False, index=True)
+
+    # Timestamps
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<FingerprintTemplate(employee_no='{self.employee_no}', finger_index={self.finger_index})>"
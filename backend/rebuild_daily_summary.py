@@ -0,0 +1,57 @@
+"""
+Rebuild script for the daily attendance summary table.
+Recomputes daily_attendance_summary from raw attendance for a date range,
+e.g. after bulk imports, direct database edits or on-time threshold changes.
+
+Usage:
+    python rebuild_daily_summary.py                         # every attendance date
+    python rebuild_daily_summary.py 2026-01-01 2026-01-31   # inclusive range
+"""
+import sys
+from datetime import date
+
+from sqlalchemy import func, select
+
+from database import engine, init_db
+from models import Attendance, DailySummary
+from services.daily_summary import daily_summary_service
+
+
+def rebuild_daily_summary(conn, start_date: date = None, end_date: date = None) -> int:
+    """
+    Recompute summary rows for a date range (defaults to all attendance dates).
+    The caller commits.
+
+    Returns:
+        Number of summary rows written
+    """
+    if start_date is None or end_date is None:
+        first_date, last_date = conn.execute(
+            select(func.min(Attendance.attendance_date), func.max(Attendance.attendance_date))
+        ).one()
+        if first_date is None:
+            print("○ No attendance records to summarize")
+            return 0
+        start_date = start_date or first_date
+        end_date = end_date or last_date
+
+    for stmt in daily_summary_service.rebuild_statements(start_date, end_date):
+        conn.execute(stmt)
+
+    rows = conn.scalar(
+        select(func.count(DailySummary.id)).where(
+            DailySummary.attendance_date.between(start_date, end_date)
+        )
+    )
+    print(f"✓ Rebuilt {rows} summary rows for {start_date} to {end_date}")
+    return rows
+
+
+if __name__ == "__main__":
+    init_db()  # Creates the table on databases that predate it
+    with engine.begin() as conn:
+        rebuild_daily_summary(
+            conn,
+            date.fromisoformat(sys.argv[1]) if len(sys.argv) > 1 else None,
+            date.fromisoformat(sys.argv[2]) if len(sys.argv) > 2 else None
+        )
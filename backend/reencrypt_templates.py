@@ -0,0 +1,53 @@
+"""
+Re-encryption script for fingerprint templates after a key rotation.
+Runs the same batched job as POST /admin/employees/fingerprint-keys/reencryption,
+from the command line. It is safe to run while the server is up, and an
+interrupted run can be resumed with the last id it printed.
+
+Rotating the key:
+    1. Set ENCRYPTION_KEY to the new key and ENCRYPTION_KEY_ID to a new id,
+       and add the old key to ENCRYPTION_PREVIOUS_KEYS ("1:old-key")
+    2. Restart the server; it starts the job in the background when it finds
+       templates under the old key (or run this script / use the endpoint)
+    3. Once it reports 0 failed, remove the old key from ENCRYPTION_PREVIOUS_KEYS
+
+Usage:
+    python reencrypt_templates.py [batch_size] [pause_ms] [start_after]
+"""
+import asyncio
+import sys
+
+from database import async_engine, init_db
+from services.key_rotation import template_reencryption_job
+from utils.encryption import encryption_service
+
+
+def report(progress: dict) -> None:
+    print(
+        f"✓ {progress['scanned']}/{progress['total']} scanned ({progress['percent']}%), "
+        f"{progress['resealed']} re-encrypted, last id {progress['last_id']}"
+    )
+
+
+async def main(start_after: int) -> None:
+    print(f"○ Re-encrypting fingerprint templates with key id {encryption_service.key_id}")
+    try:
+        progress = await template_reencryption_job.run(start_after, report=report)
+    finally:
+        await async_engine.dispose()
+
+    print(
+        f"✓ Re-encryption complete: {progress['resealed']} re-encrypted, "
+        f"{progress['failed']} failed, {progress['rows_per_second']} rows/s"
+    )
+    if progress["failed"]:
+        print("✗ Some templates could not be decrypted with any key in the ring; keep the previous keys configured")
+
+
+if __name__ == "__main__":
+    init_db()
+    template_reencryption_job.throttle(
+        int(sys.argv[1]) if len(sys.argv) > 1 else None,
+        int(sys.argv[2]) if len(sys.argv) > 2 else None
+    )
+    asyncio.run(main(int(sys.argv[3]) if len(sys.argv) > 3 else 0))
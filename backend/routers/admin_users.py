@@ -3,11 +3,12 @@ Admin user management routes.
 Allows primary admin to create users, promote to secondary admin, and delete users.
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from auth.dependencies import get_current_admin
 from auth.jwt_handler import hash_password
-from database import get_db
+from database import get_db, get_read_db
 from models.user import User
 from schemas.user import UserCreate, UserResponse, UserListResponse
 from utils.config import settings
@@ -31,10 +32,10 @@ def require_primary_admin(admin_payload: dict = Depends(get_current_admin)) -> d
 @router.get("/", response_model=UserListResponse)
 async def list_users(
     admin_payload: dict = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """List all users (excluding the env-based primary admin)."""
-    users = db.query(User).all()
+    users = (await db.scalars(select(User))).all()
     return UserListResponse(total=len(users), users=users)
 
 
@@ -42,7 +43,7 @@ async def list_users(
 async def create_user(
     user_in: UserCreate,
     admin_payload: dict = Depends(require_primary_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Create a new regular user. Primary admin only."""
     # Prevent duplicating primary admin username
@@ -52,7 +53,7 @@ async def create_user(
             detail="Cannot use the primary admin username",
         )
 
-    existing = db.query(User).filter(User.username == user_in.username).first()
+    existing = await db.scalar(select(User).where(User.username == user_in.username))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -66,8 +67,8 @@ async def create_user(
         is_active=True,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
@@ -75,10 +76,10 @@ async def create_user(
 async def promote_to_secondary_admin(
     user_id: int,
     admin_payload: dict = Depends(require_primary_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Promote a user to secondary admin. Primary admin only."""
-    user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
+    user = await db.scalar(select(User).where(User.id == user_id, User.is_active == True))
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
@@ -89,8 +90,8 @@ async def promote_to_secondary_admin(
         )
 
     user.role = "secondary_admin"
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
@@ -98,10 +99,10 @@ async def promote_to_secondary_admin(
 async def demote_to_user(
     user_id: int,
     admin_payload: dict = Depends(require_primary_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Demote a secondary admin to regular user. Primary admin only."""
-    user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
+    user = await db.scalar(select(User).where(User.id == user_id, User.is_active == True))
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
@@ -118,8 +119,8 @@ async def demote_to_user(
         )
 
     user.role = "user"
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
@@ -127,10 +128,10 @@ async def demote_to_user(
 async def delete_user(
     user_id: int,
     admin_payload: dict = Depends(require_primary_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Delete a user account. Primary admin only. Cannot remove primary admin."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
@@ -140,8 +141,8 @@ async def delete_user(
             detail="Cannot remove the primary admin",
         )
 
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
     return None
 
 
@@ -149,10 +150,10 @@ async def delete_user(
 async def approve_user(
     user_id: int,
     admin_payload: dict = Depends(require_primary_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Approve a pending user (activate account). Primary admin only."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
@@ -163,6 +164,6 @@ async def approve_user(
         )
 
     user.is_active = True
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
@@ -1,23 +1,42 @@
 """
 Attendance router - Admin endpoints and device endpoint for attendance.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+import asyncio
+import csv
+import io
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import Optional
-from datetime import date, time
+from datetime import date, datetime, time
 
-from database import get_db
+from database import AsyncReadSessionLocal, get_db, get_read_db
 from auth.dependencies import get_current_admin, verify_device_api_key, require_roles
 from services.attendance_service import attendance_service
+from services.daily_summary import daily_summary_service
+from services.device_affinity import device_affinity
+from services.employee_service import employee_service
+from services.scan_guard import scan_guard
+from services.status_snapshot import employee_status_snapshot
+from services.write_queue import attendance_write_queue
 from schemas.attendance import (
     AttendanceMark,
     AttendanceMarkResponse,
+    AttendanceSync,
+    AttendanceSyncResponse,
+    AttendanceSyncResult,
     AttendanceListResponse,
     AttendanceWithEmployee,
     DailyAttendanceSummary,
-    ManualAttendanceMark
+    ManualAttendanceMark,
+    MonthlyAttendanceReport
 )
 from pydantic import BaseModel, Field
+from utils.config import settings
 
 
 # Admin router for attendance management
@@ -32,7 +51,8 @@ device_router = APIRouter(prefix="/device/attendance", tags=["Device Attendance"
 @device_router.post("/mark", response_model=AttendanceMarkResponse)
 async def mark_attendance(
     mark_data: AttendanceMark,
-    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, max_length=200),
+    db: AsyncSession = Depends(get_db),
     api_key_valid: bool = Depends(verify_device_api_key)
 ):
     """
@@ -44,9 +64,12 @@ async def mark_attendance(
     - First scan of the day → records time_in
     - Second scan of the day → records time_out
     - Subsequent scans → ignored (already marked)
+    - Retries with the same Idempotency-Key header → original response
+    - Repeat scans within SCAN_DEBOUNCE_SECONDS → ignored ("duplicate")
     
     Args:
         mark_data: Fingerprint template and device ID
+        idempotency_key: Optional key identifying this request across retries
         
     Returns:
         Attendance marking result with employee info
@@ -54,18 +77,69 @@ async def mark_attendance(
     Raises:
         HTTPException 404: If fingerprint not recognized
     """
-    attendance, action, employee = attendance_service.mark_attendance(
-        db,
-        fingerprint_template=mark_data.fingerprint_template,
-        device_id=mark_data.device_id
+    if not idempotency_key:
+        return await _record_device_scan(mark_data, db)
+    
+    replayed = scan_guard.replay(mark_data.device_id, idempotency_key)
+    if replayed is not None:
+        return replayed
+    # A retry racing the original request waits for the original's outcome
+    in_flight = scan_guard.begin(mark_data.device_id, idempotency_key)
+    if in_flight is not None:
+        return await asyncio.shield(in_flight)
+    
+    try:
+        response = await _record_device_scan(mark_data, db)
+    except BaseException as e:
+        scan_guard.fail(mark_data.device_id, idempotency_key, e)
+        raise
+    scan_guard.remember(mark_data.device_id, idempotency_key, response)
+    return response
+
+
+async def _record_device_scan(mark_data: AttendanceMark, db: AsyncSession) -> AttendanceMarkResponse:
+    """Identify, debounce and record one device scan."""
+    # Debounce on the in-memory match before touching the database
+    employee_no = await employee_service.match_fingerprint(
+        mark_data.fingerprint_template, mark_data.device_id
+    )
+    if employee_no is not None:
+        recent = scan_guard.recent_scan(employee_no)
+        if recent is not None:
+            elapsed, previous = recent
+            return previous.model_copy(update={
+                "action": "duplicate",
+                "message": f"Scan ignored, {previous.employee_name} was recorded {int(elapsed)}s ago."
+            })
+    
+    employee = await attendance_service.identify_employee(
+        db, mark_data.fingerprint_template, mark_data.device_id,
+        matched_employee_no=employee_no,
+        skip_memory_match=True
     )
     
-    if action == "not_found":
+    if not employee:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Fingerprint not recognized. Employee not found."
         )
     
+    if attendance_write_queue.running:
+        # End the request transaction first: the batch writes on its own
+        # session and must not wait on a lock held by this one. The
+        # employee is detached so the rollback does not expire it.
+        db.expunge(employee)
+        await db.rollback()
+        # Group commit: resolves once the batch holding this scan is committed
+        attendance, action = await attendance_write_queue.submit(
+            employee, mark_data.device_id, datetime.now()
+        )
+    else:
+        attendance, action = await attendance_service.record_scan(
+            db, employee, mark_data.device_id, datetime.now()
+        )
+        await db.commit()
+    
     # Determine the time to return
     if action == "time_in":
         recorded_time = attendance.time_in
@@ -77,7 +151,7 @@ async def mark_attendance(
         recorded_time = attendance.time_out
         message = f"Attendance already marked for today, {employee.name}."
     
-    return AttendanceMarkResponse(
+    response = AttendanceMarkResponse(
         success=True,
         message=message,
         employee_no=employee.employee_no,
@@ -85,6 +159,107 @@ async def mark_attendance(
         action=action,
         time=recorded_time
     )
+    
+    scan_guard.record_scan(employee.employee_no, response)
+    return response
+
+
+@device_router.post("/sync", response_model=AttendanceSyncResponse)
+async def sync_offline_attendance(
+    sync_data: AttendanceSync,
+    db: AsyncSession = Depends(get_db),
+    api_key_valid: bool = Depends(verify_device_api_key)
+):
+    """
+    Upload scans a device buffered while offline.
+    
+    Requires valid API key in X-API-Key header.
+    
+    Scans are identified in bulk and applied per employee in capture order
+    (captured_at, not arrival time), all in a single transaction.
+    
+    Args:
+        sync_data: Buffered scan events
+        
+    Returns:
+        Per-event results in the same order as the request
+    """
+    results = await attendance_service.sync_offline_scans(
+        db,
+        [
+            (event.fingerprint_template, event.device_id, event.captured_at)
+            for event in sync_data.events
+        ]
+    )
+    
+    return AttendanceSyncResponse(
+        processed=len(results),
+        matched=sum(1 for employee_no, _ in results if employee_no),
+        results=[
+            AttendanceSyncResult(employee_no=employee_no, action=action)
+            for employee_no, action in results
+        ]
+    )
+
+
+@admin_router.get("/device-affinity/stats")
+async def get_device_affinity_stats(
+    admin: dict = Depends(get_current_admin)
+):
+    """
+    Get per-device recent-match cache metrics.
+    
+    Requires admin authentication.
+    
+    Returns:
+        Cache size, hits, misses and hit rate for each device
+    """
+    return device_affinity.stats()
+
+
+@admin_router.get("/write-queue/stats")
+async def get_write_queue_stats(
+    admin: dict = Depends(get_current_admin)
+):
+    """
+    Get device write queue batching metrics.
+    
+    Requires admin authentication.
+    
+    Returns:
+        Pending scans, committed batches and average batch size
+    """
+    return attendance_write_queue.stats()
+
+
+@admin_router.get("/scan-guard/stats")
+async def get_scan_guard_stats(
+    admin: dict = Depends(get_current_admin)
+):
+    """
+    Get idempotency replay and scan debounce metrics.
+    
+    Requires admin authentication.
+    
+    Returns:
+        Cache sizes, replayed requests and debounced scans
+    """
+    return scan_guard.stats()
+
+
+@admin_router.get("/employee-status/stats")
+async def get_employee_status_snapshot_stats(
+    admin: dict = Depends(get_current_admin)
+):
+    """
+    Get employees-status snapshot metrics.
+    
+    Requires admin authentication.
+    
+    Returns:
+        Cached rows and snapshot hits/misses
+    """
+    return employee_status_snapshot.stats()
 
 
 # ==================== Admin Manual Attendance ====================
@@ -92,7 +267,7 @@ async def mark_attendance(
 @admin_router.post("/mark", response_model=AttendanceMarkResponse)
 async def mark_attendance_manually(
     mark_data: ManualAttendanceMark,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: dict = Depends(require_roles({"primary_admin"}))
 ):
     """
@@ -107,59 +282,26 @@ async def mark_attendance_manually(
         Attendance marking result with employee info
     """
     from services.employee_service import employee_service
-    from models.attendance import Attendance
     
     # Get employee
-    employee = employee_service.get_employee_by_employee_no(db, mark_data.employee_no)
+    employee = await employee_service.get_employee_by_employee_no(db, mark_data.employee_no)
     if not employee:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Employee with number '{mark_data.employee_no}' not found"
         )
     
-    # Check if attendance already exists for this date
-    existing = db.query(Attendance).filter(
-        Attendance.employee_no == mark_data.employee_no,
-        Attendance.attendance_date == mark_data.attendance_date
-    ).first()
-    
-    if existing:
-        # Update existing record
-        if mark_data.time_in:
-            existing.time_in = mark_data.time_in
-        if mark_data.time_out:
-            existing.time_out = mark_data.time_out
-        
-        # Recalculate work minutes and overtime
-        existing.total_work_minutes = existing.calculate_work_minutes()
-        existing.update_overtime()
-        
-        db.commit()
-        db.refresh(existing)
-        
-        recorded_time = mark_data.time_out or mark_data.time_in
-        action = "updated"
-        
-    else:
-        # Create new attendance record
-        attendance = Attendance(
-            employee_no=mark_data.employee_no,
-            attendance_date=mark_data.attendance_date,
-            time_in=mark_data.time_in,
-            time_out=mark_data.time_out,
-            device_id="manual_admin"
-        )
-        
-        # Calculate work minutes and overtime
-        attendance.total_work_minutes = attendance.calculate_work_minutes()
-        attendance.update_overtime()
-        
-        db.add(attendance)
-        db.commit()
-        db.refresh(attendance)
-        
-        recorded_time = mark_data.time_out or mark_data.time_in
-        action = "created"
+    # Create or update the record for this date in one upsert
+    attendance, action = await attendance_service.mark_manual(
+        db,
+        employee,
+        attendance_date=mark_data.attendance_date,
+        time_in=mark_data.time_in,
+        time_out=mark_data.time_out
+    )
+    await db.commit()
+    
+    recorded_time = mark_data.time_out or mark_data.time_in
     
     return AttendanceMarkResponse(
         success=True,
@@ -175,7 +317,7 @@ async def mark_attendance_manually(
 async def update_attendance(
     attendance_id: int,
     mark_data: ManualAttendanceMark,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: dict = Depends(require_roles({"primary_admin"}))
 ):
     """
@@ -190,14 +332,18 @@ async def update_attendance(
     """
     from models.attendance import Attendance
     
-    # Get attendance record
-    attendance = db.query(Attendance).filter(Attendance.id == attendance_id).first()
+    # Get attendance record (with its employee, needed for the shift)
+    attendance = await db.scalar(
+        select(Attendance).options(joinedload(Attendance.employee)).where(Attendance.id == attendance_id)
+    )
     if not attendance:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Attendance record not found"
         )
     
+    before = (attendance.time_in, attendance.overtime)
+    
     # Update fields
     if mark_data.time_in:
         attendance.time_in = mark_data.time_in
@@ -208,8 +354,11 @@ async def update_attendance(
     attendance.total_work_minutes = attendance.calculate_work_minutes()
     attendance.update_overtime()
     
-    db.commit()
-    db.refresh(attendance)
+    await daily_summary_service.record(
+        db, attendance.attendance_date, attendance.employee,
+        before=before, after=(attendance.time_in, attendance.overtime)
+    )
+    await db.commit()
     
     return AttendanceMarkResponse(
         success=True,
@@ -224,7 +373,7 @@ async def update_attendance(
 @admin_router.delete("/{attendance_id}")
 async def delete_attendance(
     attendance_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: dict = Depends(require_roles({"primary_admin"}))
 ):
     """
@@ -238,15 +387,21 @@ async def delete_attendance(
     """
     from models.attendance import Attendance
     
-    attendance = db.query(Attendance).filter(Attendance.id == attendance_id).first()
+    attendance = await db.scalar(
+        select(Attendance).options(joinedload(Attendance.employee)).where(Attendance.id == attendance_id)
+    )
     if not attendance:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Attendance record not found"
         )
     
-    db.delete(attendance)
-    db.commit()
+    await daily_summary_service.record(
+        db, attendance.attendance_date, attendance.employee,
+        before=(attendance.time_in, attendance.overtime)
+    )
+    await db.delete(attendance)
+    await db.commit()
     
     return {"success": True, "message": "Attendance record deleted successfully"}
 
@@ -261,7 +416,9 @@ async def get_attendance(
     employee_no: Optional[str] = Query(None, description="Filter by employee number"),
     skip: int = Query(0, ge=0, description="Pagination offset"),
     limit: int = Query(100, ge=1, le=1000, description="Max records to return"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (replaces skip)"),
+    include_total: bool = Query(True, description="Count all matching records"),
+    db: AsyncSession = Depends(get_read_db),
         admin: dict = Depends(require_roles({"primary_admin", "secondary_admin", "user"}))
 ):
     """
@@ -276,19 +433,25 @@ async def get_attendance(
         employee_no: Filter by specific employee
         skip: Pagination offset
         limit: Max records per page
+        cursor: Keyset cursor; pages after it regardless of depth
+        include_total: Set false to skip the count query
         
     Returns:
-        Paginated attendance records with employee info
+        Paginated attendance records with employee info and next_cursor
+        for the following page
     """
     if employee_no:
         # Get attendance for specific employee
-        records, total = attendance_service.get_attendance_by_employee(
-            db, employee_no, start_date, end_date, skip, limit
-        )
+        try:
+            records, total, next_cursor = await attendance_service.get_attendance_by_employee(
+                db, employee_no, start_date, end_date, skip, limit, cursor, include_total
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         
         # We need employee info, so fetch it
         from services.employee_service import employee_service
-        employee = employee_service.get_employee_by_employee_no(db, employee_no)
+        employee = await employee_service.get_employee_by_employee_no(db, employee_no)
         
         if not employee:
             raise HTTPException(
@@ -314,25 +477,111 @@ async def get_attendance(
                 device_id=record.device_id
             ))
         
-        return AttendanceListResponse(total=total, records=formatted)
+        return AttendanceListResponse(total=total, records=formatted, next_cursor=next_cursor)
     
     else:
         # Get all attendance with filters
-        records, total = attendance_service.get_all_attendance(
-            db, start_date, end_date, department, skip, limit
-        )
+        try:
+            records, total, next_cursor = await attendance_service.get_all_attendance(
+                db, start_date, end_date, department, skip, limit, cursor, include_total
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         
         # Convert to response schema
         formatted = [AttendanceWithEmployee(**record) for record in records]
         
-        return AttendanceListResponse(total=total, records=formatted)
+        return AttendanceListResponse(total=total, records=formatted, next_cursor=next_cursor)
+
+
+# Columns of the attendance export, in order
+EXPORT_COLUMNS = [
+    "attendance_date", "employee_no", "employee_name", "department", "designation",
+    "time_in", "time_out", "total_work_minutes", "overtime", "overtime_minutes", "device_id"
+]
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def _export_value(value):
+    """Render dates and times as ISO strings for CSV/JSON output."""
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    return value
+
+
+async def _export_chunks(export_format: str, filters: dict):
+    """
+    Yield an attendance export one batch at a time.
+    
+    Opens its own read session: the request's dependencies are closed
+    before a streamed body is sent.
+    """
+    if export_format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(EXPORT_COLUMNS)
+        yield buffer.getvalue()  # Header goes out before the query runs
+    
+    async with AsyncReadSessionLocal() as db:
+        async for batch in attendance_service.stream_attendance(
+            db, batch_size=settings.EXPORT_BATCH_SIZE, **filters
+        ):
+            buffer = io.StringIO()
+            if export_format == "csv":
+                csv.writer(buffer).writerows(
+                    [_export_value(row[column]) for column in EXPORT_COLUMNS] for row in batch
+                )
+            else:
+                for row in batch:
+                    buffer.write(json.dumps({column: _export_value(row[column]) for column in EXPORT_COLUMNS}))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+
+
+@admin_router.get("/export")
+async def export_attendance(
+    start_date: Optional[date] = Query(None, description="Start date filter (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="End date filter (YYYY-MM-DD)"),
+    department: Optional[str] = Query(None, description="Filter by department"),
+    employee_no: Optional[str] = Query(None, description="Filter by employee number"),
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$", description="csv or ndjson"),
+        admin: dict = Depends(require_roles({"primary_admin", "secondary_admin", "user"}))
+):
+    """
+    Export attendance records over any date range as CSV or NDJSON.
+    
+    Requires admin authentication. The file is streamed while rows are
+    read, so there is no row cap and memory use stays constant.
+    
+    Args:
+        start_date: Filter records from this date
+        end_date: Filter records until this date
+        department: Filter by employee department
+        employee_no: Filter by specific employee
+        export_format: "csv" (default) or "ndjson"
+        
+    Returns:
+        Streaming file download
+    """
+    filters = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "department": department,
+        "employee_no": employee_no
+    }
+    filename = f"attendance-{start_date or 'all'}-{end_date or 'all'}.{export_format}"
+    
+    return StreamingResponse(
+        _export_chunks(export_format, filters),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 
 @admin_router.get("/today", response_model=AttendanceListResponse)
 async def get_today_attendance(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
         admin: dict = Depends(require_roles({"primary_admin", "secondary_admin", "user"}))
 ):
     """
@@ -344,7 +593,7 @@ async def get_today_attendance(
         Today's attendance records with employee info
     """
     today = date.today()
-    records, total = attendance_service.get_attendance_by_date(db, today, skip, limit)
+    records, total = await attendance_service.get_attendance_by_date(db, today, skip, limit)
     
     formatted = [AttendanceWithEmployee(**record) for record in records]
     
@@ -354,7 +603,7 @@ async def get_today_attendance(
 @admin_router.get("/summary", response_model=DailyAttendanceSummary)
 async def get_attendance_summary(
     target_date: date = Query(None, description="Date for summary (defaults to today)"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
         admin: dict = Depends(require_roles({"primary_admin", "secondary_admin", "user"}))
 ):
     """
@@ -371,17 +620,44 @@ async def get_attendance_summary(
     if target_date is None:
         target_date = date.today()
     
-    summary = attendance_service.get_daily_summary(db, target_date)
+    summary = await attendance_service.get_daily_summary(db, target_date)
     
     return DailyAttendanceSummary(**summary)
 
 
+@admin_router.get("/report/monthly", response_model=MonthlyAttendanceReport)
+async def get_monthly_report(
+    year: int = Query(..., ge=2000, le=9999, description="Report year"),
+    month: int = Query(..., ge=1, le=12, description="Report month (1-12)"),
+    department: Optional[str] = Query(None, description="Filter by department"),
+    db: AsyncSession = Depends(get_read_db),
+        admin: dict = Depends(require_roles({"primary_admin", "secondary_admin", "user"}))
+):
+    """
+    Get per-day attendance counts for a month.
+    
+    Requires admin authentication.
+    
+    Args:
+        year: Report year
+        month: Report month (1-12)
+        department: Optional department filter
+        
+    Returns:
+        One entry per day with present/absent, on-time/late and overtime
+        counts, broken down by department
+    """
+    report = await attendance_service.get_monthly_report(db, year, month, department)
+    
+    return MonthlyAttendanceReport(**report)
+
+
 @admin_router.get("/by-date/{target_date}", response_model=AttendanceListResponse)
 async def get_attendance_by_date(
     target_date: date,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
         admin: dict = Depends(require_roles({"primary_admin", "secondary_admin", "user"}))
 ):
     """
@@ -395,7 +671,7 @@ async def get_attendance_by_date(
     Returns:
         Attendance records for the specified date
     """
-    records, total = attendance_service.get_attendance_by_date(db, target_date, skip, limit)
+    records, total = await attendance_service.get_attendance_by_date(db, target_date, skip, limit)
     
     formatted = [AttendanceWithEmployee(**record) for record in records]
     
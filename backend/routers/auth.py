@@ -3,7 +3,8 @@ Authentication router - Login and registration.
 Supports primary admin (env-configured), secondary admins, and users stored in DB.
 """
 from fastapi import APIRouter, HTTPException, status, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from schemas.auth import LoginRequest, LoginResponse
 from schemas.user import UserCreate, UserResponse
@@ -21,7 +22,7 @@ router = APIRouter(prefix="/admin", tags=["Authentication"])
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register_user(user_in: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user_in: UserCreate, db: AsyncSession = Depends(get_db)):
     """
     Public registration endpoint.
     Creates an inactive user; primary admin must approve before login.
@@ -32,7 +33,7 @@ async def register_user(user_in: UserCreate, db: Session = Depends(get_db)):
             detail="Cannot use the primary admin username",
         )
 
-    existing = db.query(User).filter(User.username == user_in.username).first()
+    existing = await db.scalar(select(User).where(User.username == user_in.username))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -46,13 +47,13 @@ async def register_user(user_in: UserCreate, db: Session = Depends(get_db)):
         is_active=False,  # requires primary admin approval
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
 @router.post("/login", response_model=LoginResponse)
-async def admin_login(login_data: LoginRequest, db: Session = Depends(get_db)):
+async def admin_login(login_data: LoginRequest, db: AsyncSession = Depends(get_db)):
     """
     Admin login endpoint.
     
@@ -79,7 +80,7 @@ async def admin_login(login_data: LoginRequest, db: Session = Depends(get_db)):
         token_type = "admin"
     else:
         # DB-backed accounts (users or secondary admins)
-        user = db.query(User).filter(User.username == login_data.username).first()
+        user = await db.scalar(select(User).where(User.username == login_data.username))
 
         if not user or not verify_password(login_data.password, user.password_hash):
             raise HTTPException(
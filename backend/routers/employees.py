@@ -2,13 +2,15 @@
 Employee router - Admin endpoints for employee management.
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 import json
 
-from database import get_db
+from database import get_db, get_read_db
 from auth.dependencies import get_current_admin, require_roles
 from services.employee_service import employee_service
+from services.key_rotation import template_reencryption_job
+from services.template_gallery import template_gallery
 from schemas.employee import (
     EmployeeCreate,
     EmployeeUpdate,
@@ -36,7 +38,7 @@ async def debug_raw_request(request: Request):
 @router.post("", response_model=EmployeeResponse, status_code=status.HTTP_201_CREATED)
 async def create_employee(
     employee_data: EmployeeCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: dict = Depends(require_roles({"primary_admin", "secondary_admin", "user"}))
 ):
     """
@@ -55,13 +57,9 @@ async def create_employee(
     """
     print(f"DEBUG - Employee data received: {employee_data}")
     try:
-        employee = employee_service.create_employee(db, employee_data)
+        employee = await employee_service.create_employee(db, employee_data)
         
-        # Add has_fingerprint flag
-        response_data = EmployeeResponse.model_validate(employee)
-        response_data.has_fingerprint = bool(employee.fingerprint_template)
-        
-        return response_data
+        return EmployeeResponse.model_validate(employee)
         
     except ValueError as e:
         raise HTTPException(
@@ -76,7 +74,9 @@ async def list_employees(
     limit: int = Query(100, ge=1, le=500, description="Max records to return"),
     department: Optional[str] = Query(None, description="Filter by department"),
     search: Optional[str] = Query(None, description="Search by name or employee_no"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (replaces skip)"),
+    include_total: bool = Query(True, description="Count all matching employees"),
+    db: AsyncSession = Depends(get_read_db),
     admin: dict = Depends(require_roles({"primary_admin", "secondary_admin", "user"}))
 ):
     """
@@ -89,31 +89,34 @@ async def list_employees(
         limit: Max records per page
         department: Optional department filter
         search: Optional search term
+        cursor: Keyset cursor; pages after it regardless of depth
+        include_total: Set false to skip the count query
         
     Returns:
-        Paginated list of employees
+        Paginated list of employees with next_cursor for the following page
     """
-    employees, total = employee_service.get_all_employees(
-        db, skip=skip, limit=limit, department=department, search=search
-    )
-    
-    # Convert to response schema with has_fingerprint flag
-    employee_responses = []
-    for emp in employees:
-        resp = EmployeeResponse.model_validate(emp)
-        resp.has_fingerprint = bool(emp.fingerprint_template)
-        employee_responses.append(resp)
+    try:
+        employees, total, next_cursor = await employee_service.get_all_employees(
+            db, skip=skip, limit=limit, department=department, search=search,
+            cursor=cursor, include_total=include_total
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
     return EmployeeListResponse(
         total=total,
-        employees=employee_responses
+        employees=[EmployeeResponse.model_validate(emp) for emp in employees],
+        next_cursor=next_cursor
     )
 
 
 @router.get("/{employee_id}", response_model=EmployeeResponse)
 async def get_employee(
     employee_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     admin: dict = Depends(require_roles({"primary_admin", "secondary_admin", "user"}))
 ):
     """
@@ -130,7 +133,7 @@ async def get_employee(
     Raises:
         HTTPException 404: If employee not found
     """
-    employee = employee_service.get_employee_by_id(db, employee_id)
+    employee = await employee_service.get_employee_by_id(db, employee_id)
     
     if not employee:
         raise HTTPException(
@@ -138,17 +141,14 @@ async def get_employee(
             detail=f"Employee with id {employee_id} not found"
         )
     
-    response = EmployeeResponse.model_validate(employee)
-    response.has_fingerprint = bool(employee.fingerprint_template)
-    
-    return response
+    return EmployeeResponse.model_validate(employee)
 
 
 @router.put("/{employee_id}", response_model=EmployeeResponse)
 async def update_employee(
     employee_id: int,
     update_data: EmployeeUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: dict = Depends(get_current_admin)
 ):
     """
@@ -169,7 +169,7 @@ async def update_employee(
         HTTPException 400: If update fails (e.g., duplicate employee_no)
     """
     try:
-        employee = employee_service.update_employee(db, employee_id, update_data)
+        employee = await employee_service.update_employee(db, employee_id, update_data)
         
         if not employee:
             raise HTTPException(
@@ -177,10 +177,7 @@ async def update_employee(
                 detail=f"Employee with id {employee_id} not found"
             )
         
-        response = EmployeeResponse.model_validate(employee)
-        response.has_fingerprint = bool(employee.fingerprint_template)
-        
-        return response
+        return EmployeeResponse.model_validate(employee)
         
     except ValueError as e:
         raise HTTPException(
@@ -192,7 +189,7 @@ async def update_employee(
 @router.delete("/{employee_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_employee(
     employee_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: dict = Depends(get_current_admin)
 ):
     """
@@ -207,7 +204,7 @@ async def delete_employee(
     Raises:
         HTTPException 404: If employee not found
     """
-    deleted = employee_service.delete_employee(db, employee_id)
+    deleted = await employee_service.delete_employee(db, employee_id)
     
     if not deleted:
         raise HTTPException(
@@ -221,7 +218,7 @@ async def delete_employee(
 @router.post("/enroll-fingerprint", response_model=EmployeeResponse)
 async def enroll_fingerprint(
     enroll_data: FingerprintEnroll,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: dict = Depends(get_current_admin)
 ):
     """
@@ -239,7 +236,7 @@ async def enroll_fingerprint(
     Raises:
         HTTPException 404: If employee not found
     """
-    employee = employee_service.enroll_fingerprint(db, enroll_data)
+    employee = await employee_service.enroll_fingerprint(db, enroll_data)
     
     if not employee:
         raise HTTPException(
@@ -247,7 +244,94 @@ async def enroll_fingerprint(
             detail=f"Employee with employee_no '{enroll_data.employee_no}' not found"
         )
     
-    response = EmployeeResponse.model_validate(employee)
-    response.has_fingerprint = True
+    return EmployeeResponse.model_validate(employee)
+
+
+@router.get("/fingerprint-gallery/stats")
+async def fingerprint_gallery_stats(
+    admin: dict = Depends(get_current_admin)
+):
+    """
+    Get in-memory fingerprint gallery statistics.
+    
+    Requires admin authentication.
+    
+    Returns:
+        Gallery size, hit/miss counters and hit rate
+    """
+    return template_gallery.stats()
+
+
+@router.get("/fingerprint-keys/reencryption")
+async def fingerprint_reencryption_progress(
+    admin: dict = Depends(get_current_admin)
+):
+    """
+    Get progress of the template re-encryption job (key rotation).
+    
+    Requires admin authentication.
     
-    return response
+    Returns:
+        Rows scanned/re-encrypted/failed, last id, throughput and throttle
+    """
+    return template_reencryption_job.progress()
+
+
+@router.post("/fingerprint-keys/reencryption", status_code=status.HTTP_202_ACCEPTED)
+async def start_fingerprint_reencryption(
+    start_after: Optional[int] = Query(None, ge=0, description="Resume after this template id"),
+    batch_size: Optional[int] = Query(None, ge=1, le=5000),
+    pause_ms: Optional[int] = Query(None, ge=0, le=60000),
+    admin: dict = Depends(require_roles({"primary_admin"}))
+):
+    """
+    Start re-encrypting stored templates with the current key.
+    
+    Run after setting a new ENCRYPTION_KEY / ENCRYPTION_KEY_ID and moving
+    the old key to ENCRYPTION_PREVIOUS_KEYS. Runs in the background in
+    short batches; without start_after it resumes where a stopped run ended.
+    
+    Returns:
+        Job progress
+        
+    Raises:
+        HTTPException 409: If the job is already running
+    """
+    if not template_reencryption_job.start(start_after, batch_size, pause_ms):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Template re-encryption is already running"
+        )
+    return template_reencryption_job.progress()
+
+
+@router.patch("/fingerprint-keys/reencryption")
+async def throttle_fingerprint_reencryption(
+    batch_size: Optional[int] = Query(None, ge=1, le=5000),
+    pause_ms: Optional[int] = Query(None, ge=0, le=60000),
+    admin: dict = Depends(require_roles({"primary_admin"}))
+):
+    """
+    Change the batch size or pause of the re-encryption job, also while it runs.
+    
+    Returns:
+        Job progress
+    """
+    template_reencryption_job.throttle(batch_size, pause_ms)
+    return template_reencryption_job.progress()
+
+
+@router.delete("/fingerprint-keys/reencryption")
+async def stop_fingerprint_reencryption(
+    admin: dict = Depends(require_roles({"primary_admin"}))
+):
+    """
+    Stop the re-encryption job after its current batch.
+    Start it again to resume from the last re-encrypted id.
+    
+    Returns:
+        Job progress
+    """
+    template_reencryption_job.stop()
+    await template_reencryption_job.wait()
+    return template_reencryption_job.progress()
@@ -3,16 +3,21 @@ Manual attendance routes.
 Allows users and secondary admins to mark attendance for employees.
 Only primary admin can update attendance records.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date, time, datetime
 from typing import Optional, List
 from pydantic import BaseModel, Field
 
 from auth.dependencies import require_roles
-from database import get_db
+from database import get_db, get_read_db
 from models.attendance import Attendance
 from models.employee import Employee
+from services.attendance_service import attendance_service
+from services.daily_summary import daily_summary_service
+from services.status_snapshot import employee_status_snapshot
 
 router = APIRouter(prefix="/manual-attendance", tags=["Manual Attendance"])
 
@@ -55,84 +60,84 @@ class EmployeeAttendanceStatus(BaseModel):
     status: str  # "not_marked", "time_in_only", "complete"
 
 
-@router.get("/employees-status", response_model=List[EmployeeAttendanceStatus])
+@router.get(
+    "/employees-status",
+    response_model=None,
+    response_class=JSONResponse,
+    responses={200: {
+        "model": List[EmployeeAttendanceStatus],
+        "description": "Employees with today's status; X-Total-Count holds the number matching"
+    }}
+)
 async def get_employees_attendance_status(
+    department: Optional[str] = Query(None, description="Filter by department"),
+    skip: int = Query(0, ge=0, description="Pagination offset"),
+    limit: Optional[int] = Query(None, ge=1, description="Max employees to return (default: all)"),
     payload: dict = Depends(require_roles({"user", "secondary_admin", "primary_admin"})),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """Get all employees with their attendance status for today."""
+    """
+    Get employees with their attendance status for today.
+    
+    Served from a short-lived snapshot that attendance writes invalidate;
+    the number of matching employees is returned in X-Total-Count. Rows
+    are built JSON-ready, so the response is not re-validated against
+    EmployeeAttendanceStatus (which documents its shape).
+    """
     today = date.today()
     
-    # Get all employees
-    employees = db.query(Employee).all()
+    rows = employee_status_snapshot.get(today)
+    if rows is None:
+        async with employee_status_snapshot.reload_lock:
+            # Another request may have reloaded while we waited
+            rows = employee_status_snapshot.get(today)
+            if rows is None:
+                generation = employee_status_snapshot.generation
+                rows = await attendance_service.get_employees_status(db, today)
+                employee_status_snapshot.store(today, rows, generation)
+    
+    if not department and not skip and not limit:
+        # The whole list: reuse the snapshot's pre-encoded body
+        return Response(
+            employee_status_snapshot.encoded(rows),
+            media_type="application/json",
+            headers={"X-Total-Count": str(len(rows))}
+        )
+    
+    if department:
+        rows = [row for row in rows if row["department"] == department]
     
-    result = []
-    for emp in employees:
-        # Get today's attendance for this employee
-        attendance = db.query(Attendance).filter(
-            Attendance.employee_no == emp.employee_no,
-            Attendance.attendance_date == today
-        ).first()
-        
-        if attendance is None:
-            status = "not_marked"
-            att_id = None
-            time_in = None
-            time_out = None
-        elif attendance.time_out is None:
-            status = "time_in_only"
-            att_id = attendance.id
-            time_in = attendance.time_in
-            time_out = None
-        else:
-            status = "complete"
-            att_id = attendance.id
-            time_in = attendance.time_in
-            time_out = attendance.time_out
-        
-        result.append(EmployeeAttendanceStatus(
-            employee_no=emp.employee_no,
-            name=emp.name,
-            department=emp.department,
-            attendance_id=att_id,
-            time_in=time_in,
-            time_out=time_out,
-            status=status
-        ))
+    page = rows[skip:skip + limit] if limit else rows[skip:]
     
-    return result
+    # Rows are already JSON-ready, so skip per-row model validation
+    return JSONResponse(page, headers={"X-Total-Count": str(len(rows))})
 
 
 @router.post("/time-in", response_model=ManualAttendanceResponse)
 async def mark_employee_time_in(
     request: ManualAttendanceRequest,
     payload: dict = Depends(require_roles({"user", "secondary_admin"})),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Mark time in for an employee. Users and secondary admins only."""
-    today = date.today()
-    now = datetime.now().time()
+    now = datetime.now()
     
     # Find employee
-    employee = db.query(Employee).filter(Employee.employee_no == request.employee_no).first()
+    employee = await db.scalar(select(Employee).where(Employee.employee_no == request.employee_no))
     if not employee:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Employee with number '{request.employee_no}' not found"
         )
     
-    # Check if already marked for today
-    attendance = db.query(Attendance).filter(
-        Attendance.employee_no == request.employee_no,
-        Attendance.attendance_date == today
-    ).first()
+    attendance, action = await attendance_service.mark_time_in(db, employee, now)
     
-    if attendance and attendance.time_in:
+    if action == "already_marked":
         return ManualAttendanceResponse(
             id=attendance.id,
             employee_no=employee.employee_no,
             employee_name=employee.name,
-            attendance_date=today,
+            attendance_date=attendance.attendance_date,
             time_in=attendance.time_in,
             time_out=attendance.time_out,
             total_work_minutes=attendance.total_work_minutes or 0,
@@ -140,26 +145,13 @@ async def mark_employee_time_in(
             message=f"Time in already recorded for {employee.name} today"
         )
     
-    if not attendance:
-        # Create new attendance record
-        attendance = Attendance(
-            employee_no=request.employee_no,
-            attendance_date=today,
-            time_in=now,
-            device_id="MANUAL_ENTRY"
-        )
-        db.add(attendance)
-    else:
-        attendance.time_in = now
-    
-    db.commit()
-    db.refresh(attendance)
+    await db.commit()
     
     return ManualAttendanceResponse(
         id=attendance.id,
         employee_no=employee.employee_no,
         employee_name=employee.name,
-        attendance_date=today,
+        attendance_date=attendance.attendance_date,
         time_in=attendance.time_in,
         time_out=attendance.time_out,
         total_work_minutes=attendance.total_work_minutes or 0,
@@ -172,38 +164,33 @@ async def mark_employee_time_in(
 async def mark_employee_time_out(
     request: ManualAttendanceRequest,
     payload: dict = Depends(require_roles({"user", "secondary_admin"})),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Mark time out for an employee. Users and secondary admins only."""
-    today = date.today()
-    now = datetime.now().time()
+    now = datetime.now()
     
     # Find employee
-    employee = db.query(Employee).filter(Employee.employee_no == request.employee_no).first()
+    employee = await db.scalar(select(Employee).where(Employee.employee_no == request.employee_no))
     if not employee:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Employee with number '{request.employee_no}' not found"
         )
     
-    # Check if time_in exists
-    attendance = db.query(Attendance).filter(
-        Attendance.employee_no == request.employee_no,
-        Attendance.attendance_date == today
-    ).first()
+    attendance, action = await attendance_service.mark_time_out(db, employee, now)
     
-    if not attendance or not attendance.time_in:
+    if action == "no_time_in":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Please mark time in first for {employee.name}"
         )
     
-    if attendance.time_out:
+    if action == "already_marked":
         return ManualAttendanceResponse(
             id=attendance.id,
             employee_no=employee.employee_no,
             employee_name=employee.name,
-            attendance_date=today,
+            attendance_date=attendance.attendance_date,
             time_in=attendance.time_in,
             time_out=attendance.time_out,
             total_work_minutes=attendance.total_work_minutes or 0,
@@ -211,19 +198,9 @@ async def mark_employee_time_out(
             message=f"Time out already recorded for {employee.name} today"
         )
     
-    # Calculate work duration
-    time_in_dt = datetime.combine(today, attendance.time_in)
-    time_out_dt = datetime.combine(today, now)
-    work_minutes = int((time_out_dt - time_in_dt).total_seconds() / 60)
-    
-    attendance.time_out = now
-    attendance.total_work_minutes = work_minutes
-    attendance.overtime = work_minutes > 480  # > 8 hours
-    attendance.overtime_minutes = max(0, work_minutes - 480) if work_minutes > 480 else 0
-    
-    db.commit()
-    db.refresh(attendance)
+    await db.commit()
     
+    work_minutes = attendance.total_work_minutes or 0
     hours = work_minutes // 60
     mins = work_minutes % 60
     
@@ -231,10 +208,10 @@ async def mark_employee_time_out(
         id=attendance.id,
         employee_no=employee.employee_no,
         employee_name=employee.name,
-        attendance_date=today,
+        attendance_date=attendance.attendance_date,
         time_in=attendance.time_in,
         time_out=attendance.time_out,
-        total_work_minutes=attendance.total_work_minutes or 0,
+        total_work_minutes=work_minutes,
         action="time_out",
         message=f"Time out recorded for {employee.name}. Total: {hours}h {mins}m"
     )
@@ -246,10 +223,10 @@ async def update_attendance(
     attendance_id: int,
     update_data: AttendanceUpdateRequest,
     payload: dict = Depends(require_roles({"primary_admin"})),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Update an attendance record. Primary admin only."""
-    attendance = db.query(Attendance).filter(Attendance.id == attendance_id).first()
+    attendance = await db.get(Attendance, attendance_id)
     
     if not attendance:
         raise HTTPException(
@@ -258,8 +235,9 @@ async def update_attendance(
         )
     
     # Get employee name
-    employee = db.query(Employee).filter(Employee.employee_no == attendance.employee_no).first()
+    employee = await db.scalar(select(Employee).where(Employee.employee_no == attendance.employee_no))
     employee_name = employee.name if employee else attendance.employee_no
+    before = (attendance.time_in, attendance.overtime)
     
     if update_data.time_in:
         try:
@@ -288,8 +266,12 @@ async def update_attendance(
         attendance.overtime = work_minutes > 480
         attendance.overtime_minutes = max(0, work_minutes - 480) if work_minutes > 480 else 0
     
-    db.commit()
-    db.refresh(attendance)
+    await daily_summary_service.record(
+        db, attendance.attendance_date, employee,
+        before=before, after=(attendance.time_in, attendance.overtime)
+    )
+    await db.commit()
+    await db.refresh(attendance)
     
     return ManualAttendanceResponse(
         id=attendance.id,
@@ -5,6 +5,7 @@ from schemas.employee import (
     EmployeeResponse,
     EmployeeListResponse,
     EmployeeMinimal,
+    FingerTemplate,
     FingerprintEnroll
 )
 from schemas.attendance import (
@@ -13,7 +14,12 @@ from schemas.attendance import (
     AttendanceWithEmployee,
     AttendanceListResponse,
     AttendanceMarkResponse,
-    DailyAttendanceSummary
+    AttendanceSync,
+    AttendanceSyncResponse,
+    DailyAttendanceSummary,
+    DepartmentAttendanceCounts,
+    MonthlyReportDay,
+    MonthlyAttendanceReport
 )
 from schemas.auth import LoginRequest, LoginResponse, TokenData
 
@@ -24,6 +30,7 @@ __all__ = [
     "EmployeeResponse",
     "EmployeeListResponse",
     "EmployeeMinimal",
+    "FingerTemplate",
     "FingerprintEnroll",
     # Attendance schemas
     "AttendanceMark",
@@ -31,7 +38,12 @@ __all__ = [
     "AttendanceWithEmployee",
     "AttendanceListResponse",
     "AttendanceMarkResponse",
+    "AttendanceSync",
+    "AttendanceSyncResponse",
     "DailyAttendanceSummary",
+    "DepartmentAttendanceCounts",
+    "MonthlyReportDay",
+    "MonthlyAttendanceReport",
     # Auth schemas
     "LoginRequest",
     "LoginResponse",
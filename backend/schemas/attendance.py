@@ -5,6 +5,7 @@ Handles request/response validation.
 from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional
 from datetime import date, time, datetime
+import datetime as dt
 
 from schemas.employee import EmployeeMinimal
 
@@ -17,6 +18,18 @@ class AttendanceMark(BaseModel):
     device_id: str = Field(..., min_length=1, max_length=100, description="Device identifier")
 
 
+class OfflineScanEvent(BaseModel):
+    """A scan buffered by a device while it was offline."""
+    fingerprint_template: str = Field(..., min_length=1, description="Fingerprint template from device")
+    device_id: str = Field(..., min_length=1, max_length=100, description="Device identifier")
+    captured_at: datetime = Field(..., description="When the device captured the scan")
+
+
+class AttendanceSync(BaseModel):
+    """Schema for uploading a device's offline scan backlog."""
+    events: list[OfflineScanEvent] = Field(..., min_length=1, max_length=20000)
+
+
 class ManualAttendanceMark(BaseModel):
     """Schema for manually marking attendance by admin."""
     employee_no: str = Field(..., min_length=1, max_length=50, description="Employee number")
@@ -61,8 +74,9 @@ class AttendanceWithEmployee(BaseModel):
 
 class AttendanceListResponse(BaseModel):
     """Schema for paginated attendance list."""
-    total: int
+    total: Optional[int] = None  # None when include_total=false
     records: list[AttendanceWithEmployee]
+    next_cursor: Optional[str] = None
 
 
 class AttendanceMarkResponse(BaseModel):
@@ -71,8 +85,21 @@ class AttendanceMarkResponse(BaseModel):
     message: str
     employee_no: str
     employee_name: str
-    action: str  # "time_in", "time_out", or "already_marked"
-    time: Optional[time] = None
+    action: str  # "time_in", "time_out", "already_marked", or "duplicate"
+    time: Optional[dt.time] = None  # module-qualified: the field name shadows `time`
+
+
+class AttendanceSyncResult(BaseModel):
+    """Result for one uploaded scan (same position as in the request)."""
+    employee_no: Optional[str] = None
+    action: str  # "time_in", "time_out", "already_marked", or "not_found"
+
+
+class AttendanceSyncResponse(BaseModel):
+    """Response after syncing an offline scan backlog."""
+    processed: int
+    matched: int
+    results: list[AttendanceSyncResult]
 
 
 class DailyAttendanceSummary(BaseModel):
@@ -84,3 +111,36 @@ class DailyAttendanceSummary(BaseModel):
     on_time: int
     late: int
     overtime_count: int
+
+
+class DepartmentAttendanceCounts(BaseModel):
+    """Attendance counts for one department on one day."""
+    department: Optional[str] = None
+    total_employees: int
+    present: int
+    absent: int
+    on_time: int
+    late: int
+    overtime_count: int
+
+
+class MonthlyReportDay(BaseModel):
+    """Attendance counts for one day of a monthly report."""
+    date: dt.date  # module-qualified: the field name shadows `date`
+    present: int
+    absent: int
+    on_time: int
+    late: int
+    overtime_count: int
+    departments: list[DepartmentAttendanceCounts]
+
+
+class MonthlyAttendanceReport(BaseModel):
+    """Per-day attendance counts for a month, aggregated in SQL."""
+    year: int
+    month: int
+    department: Optional[str] = None
+    total_employees: int
+    total_records: int
+    overtime_records: int
+    days: list[MonthlyReportDay]
@@ -2,7 +2,7 @@
 Pydantic schemas for Employee.
 Handles request/response validation.
 """
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
 from typing import Optional
 from datetime import datetime
 
@@ -51,10 +51,33 @@ class EmployeeUpdate(BaseModel):
     shift: Optional[str] = Field(None, max_length=1)
 
 
+class FingerTemplate(BaseModel):
+    """One captured finger."""
+    finger_index: int = Field(0, ge=0, le=10, description="ISO/IEC 19794 finger position (1-10), 0 if unspecified")
+    fingerprint_template: str = Field(..., min_length=1, description="Raw fingerprint template from device")
+    quality: Optional[int] = Field(None, ge=0, le=100, description="Capture quality reported by the device")
+
+
 class FingerprintEnroll(BaseModel):
-    """Schema for enrolling employee fingerprint."""
+    """
+    Schema for enrolling employee fingerprints.
+    Send several fingers in `fingers`, or a single `fingerprint_template`
+    (enrolled as finger 0). Each finger replaces the same finger's template.
+    """
     employee_no: str = Field(..., min_length=1, max_length=50)
-    fingerprint_template: str = Field(..., min_length=1, description="Raw fingerprint template from device")
+    fingerprint_template: Optional[str] = Field(None, min_length=1, description="Raw fingerprint template from device")
+    fingers: list[FingerTemplate] = Field(default_factory=list, max_length=10)
+
+    @model_validator(mode="after")
+    def _collect_fingers(self):
+        if self.fingerprint_template is not None:
+            self.fingers = [*self.fingers, FingerTemplate(fingerprint_template=self.fingerprint_template)]
+        if not self.fingers:
+            raise ValueError("Provide fingerprint_template or at least one entry in fingers")
+        indexes = [finger.finger_index for finger in self.fingers]
+        if len(indexes) != len(set(indexes)):
+            raise ValueError("Each finger_index may only be enrolled once per request")
+        return self
 
 
 # ==================== Response Schemas ====================
@@ -87,8 +110,9 @@ class EmployeeResponse(BaseModel):
 
 class EmployeeListResponse(BaseModel):
     """Schema for paginated employee list."""
-    total: int
+    total: Optional[int] = None  # None when include_total=false
     employees: list[EmployeeResponse]
+    next_cursor: Optional[str] = None
 
 
 class EmployeeMinimal(BaseModel):
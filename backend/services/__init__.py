@@ -1,5 +1,12 @@
 """Business logic services."""
+from services.template_gallery import template_gallery
+from services.device_affinity import device_affinity
+from services.daily_summary import daily_summary_service
 from services.employee_service import employee_service
 from services.attendance_service import attendance_service
+from services.write_queue import attendance_write_queue
+from services.scan_guard import scan_guard
+from services.status_snapshot import employee_status_snapshot
 
-__all__ = ["employee_service", "attendance_service"]
+__all__ = ["template_gallery", "device_affinity", "daily_summary_service", "employee_service",
+           "attendance_service", "attendance_write_queue", "scan_guard", "employee_status_snapshot"]
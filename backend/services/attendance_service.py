@@ -1,22 +1,182 @@
 """
 Attendance service - Business logic for attendance operations.
 """
-from typing import Optional, List
-from datetime import date, time, datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+import calendar
+from typing import AsyncIterator, Optional, List
+from datetime import date, time, datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, case, cast, func, insert, literal, or_, select, update, Integer, Time
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 
 from models.attendance import Attendance
+from models.daily_summary import DailySummary
 from models.employee import Employee
 from services.employee_service import employee_service
+from services.device_affinity import device_affinity
+from services.daily_summary import daily_summary_service, SummaryDelta
+from utils.shifts import get_shift_hours, calculate_overtime
+from utils.pagination import encode_cursor, decode_cursor
+
+MINUTES_PER_DAY = 24 * 60
+
+# Max bound parameters per IN (...) clause in bulk queries
+IN_CLAUSE_CHUNK = 500
+
+
+def _dialect_insert(db: AsyncSession):
+    """Return the dialect's INSERT construct (supports ON CONFLICT)."""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
+
+
+def _minutes_of_day(db: AsyncSession, time_expr):
+    """SQL expression for hour * 60 + minute of a TIME value."""
+    if db.get_bind().dialect.name == "postgresql":
+        time_expr = cast(time_expr, Time)  # Bound values need a type for EXTRACT
+        hours = cast(func.extract("hour", time_expr), Integer)
+        minutes = cast(func.extract("minute", time_expr), Integer)
+    else:
+        # SQLite stores TIME as 'HH:MM:SS.ffffff' text
+        hours = cast(func.substr(time_expr, 1, 2), Integer)
+        minutes = cast(func.substr(time_expr, 4, 2), Integer)
+    return hours * 60 + minutes
+
+
+def _work_values(db: AsyncSession, time_in_expr, time_out_expr, shift: Optional[str]) -> dict:
+    """
+    SQL expressions for total_work_minutes and overtime columns.
+    Mirrors Attendance.calculate_work_minutes() and update_overtime() so the
+    whole state transition can run inside a single statement.
+    """
+    work = case(
+        (time_in_expr.is_(None), 0),
+        (time_out_expr.is_(None), 0),
+        else_=(
+            _minutes_of_day(db, time_out_expr) - _minutes_of_day(db, time_in_expr)
+            + MINUTES_PER_DAY
+        ) % MINUTES_PER_DAY
+    )
+    shift_minutes = get_shift_hours(shift) * 60
+    return {
+        "total_work_minutes": work,
+        "overtime": work > shift_minutes,
+        "overtime_minutes": case((work > shift_minutes, work - shift_minutes), else_=0)
+    }
+
+
+def _time_param(value: Optional[time]):
+    """Bind a Python time as a typed SQL literal."""
+    return literal(value, Time)
+
+
+# Attendance columns returned by listings; selected as plain columns so
+# rows skip ORM identity-map hydration
+ATTENDANCE_LISTING_COLUMNS = (
+    Attendance.id,
+    Attendance.employee_no,
+    Attendance.attendance_date,
+    Attendance.time_in,
+    Attendance.time_out,
+    Attendance.total_work_minutes,
+    Attendance.overtime,
+    Attendance.overtime_minutes,
+    Attendance.device_id
+)
+
+# Employee columns joined onto attendance listings
+ATTENDANCE_EMPLOYEE_COLUMNS = (
+    Employee.name.label("employee_name"),
+    Employee.department,
+    Employee.designation
+)
+
+# Listing order for attendance; the keyset cursor holds these three values
+ATTENDANCE_ORDER = (
+    Attendance.attendance_date.desc(),
+    Attendance.time_in.nulls_first(),
+    Attendance.id
+)
+
+
+def _after_attendance_cursor(cursor: str):
+    """
+    WHERE condition for rows after a cursor in ATTENDANCE_ORDER.
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    attendance_date, time_in, attendance_id = decode_cursor(cursor, date, time, int)
+    if attendance_date is None or attendance_id is None:
+        raise ValueError("Invalid pagination cursor")
+    
+    if time_in is None:
+        # NULL time_in sorts first within a day: remaining NULLs, then every time
+        same_day = or_(
+            and_(Attendance.time_in.is_(None), Attendance.id > attendance_id),
+            Attendance.time_in.is_not(None)
+        )
+    else:
+        same_day = or_(
+            Attendance.time_in > _time_param(time_in),
+            and_(Attendance.time_in == _time_param(time_in), Attendance.id > attendance_id)
+        )
+    # The redundant upper bound lets the planner range-scan the date index
+    return and_(
+        Attendance.attendance_date <= attendance_date,
+        or_(
+            Attendance.attendance_date < attendance_date,
+            and_(Attendance.attendance_date == attendance_date, same_day)
+        )
+    )
+
+
+async def _page_attendance(
+    db: AsyncSession,
+    query,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    include_total: bool
+) -> tuple[list, Optional[int], Optional[str]]:
+    """
+    Run an attendance listing query (selecting at least attendance_date,
+    time_in and id) one page at a time.
+    
+    With a cursor the page starts after the cursor's row and skip is
+    ignored; otherwise skip/limit apply. One extra row is fetched to tell
+    whether a next page exists.
+    
+    Returns:
+        Tuple of (result rows, total count or None, next cursor or None)
+    """
+    total = None
+    if include_total:
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    
+    if cursor:
+        query = query.where(_after_attendance_cursor(cursor))
+    else:
+        query = query.offset(skip)
+    
+    rows = (await db.execute(query.order_by(*ATTENDANCE_ORDER).limit(limit + 1))).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.attendance_date, last.time_in, last.id)
+    
+    return rows, total, next_cursor
 
 
 class AttendanceService:
     """Service class for attendance operations."""
     
     @staticmethod
-    def mark_attendance(
-        db: Session,
+    async def mark_attendance(
+        db: AsyncSession,
         fingerprint_template: str,
         device_id: str
     ) -> tuple[Optional[Attendance], str, Optional[Employee]]:
@@ -37,56 +197,478 @@ class AttendanceService:
             Tuple of (attendance record, action, employee)
             action: "time_in", "time_out", "already_marked", or "not_found"
         """
-        # Find employee by fingerprint
-        employee = employee_service.find_employee_by_fingerprint(db, fingerprint_template)
+        employee = await AttendanceService.identify_employee(db, fingerprint_template, device_id)
         
         if not employee:
             return None, "not_found", None
         
-        today = date.today()
-        current_time = datetime.now().time()
+        attendance, action = await AttendanceService.record_scan(
+            db, employee, device_id, datetime.now()
+        )
+        await db.commit()
+        return attendance, action, employee
+    
+    @staticmethod
+    async def identify_employee(
+        db: AsyncSession,
+        fingerprint_template: str,
+        device_id: str,
+        matched_employee_no: Optional[str] = None,
+        skip_memory_match: bool = False
+    ) -> Optional[Employee]:
+        """
+        Identify the employee behind a device scan.
+        
+        Args:
+            db: Database session
+            fingerprint_template: Raw fingerprint template from device
+            device_id: ID of the attendance device
+            matched_employee_no: Result of an earlier in-memory match, if any
+            skip_memory_match: The in-memory match already ran (and missed)
+            
+        Returns:
+            Matched employee or None
+        """
+        employee = await employee_service.find_employee_by_fingerprint(
+            db, fingerprint_template, device_id=device_id,
+            matched_employee_no=matched_employee_no,
+            skip_memory_match=skip_memory_match
+        )
+        if employee:
+            device_affinity.record_match(device_id, employee.employee_no)
+        return employee
+    
+    @staticmethod
+    async def record_scan(
+        db: AsyncSession,
+        employee: Employee,
+        device_id: str,
+        scanned_at: datetime
+    ) -> tuple[Attendance, str]:
+        """
+        Apply the time_in/time_out transition for one scan (no commit).
+        
+        Runs as a single INSERT ... ON CONFLICT DO UPDATE ... RETURNING on
+        the (employee_no, attendance_date) unique index, so concurrent scans
+        cannot create duplicate rows for a day.
+        
+        Args:
+            db: Database session
+            employee: Identified employee
+            device_id: ID of the attendance device
+            scanned_at: Capture time of the scan
+            
+        Returns:
+            Tuple of (attendance record, action)
+            action: "time_in", "time_out", or "already_marked"
+        """
+        scan_date = scanned_at.date()
+        scan_time = scanned_at.time()
+        
+        stmt = _dialect_insert(db)(Attendance).values(
+            employee_no=employee.employee_no,
+            attendance_date=scan_date,
+            time_in=scan_time,
+            device_id=device_id,
+            total_work_minutes=0,
+            overtime=False,
+            overtime_minutes=0
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Attendance.employee_no, Attendance.attendance_date],
+            set_={
+                "time_out": scan_time,
+                "device_id": device_id,
+                **_work_values(db, Attendance.time_in, _time_param(scan_time), employee.shift)
+            },
+            where=Attendance.time_out.is_(None)
+        ).returning(Attendance)
+        
+        attendance = (await db.scalars(
+            stmt, execution_options={"populate_existing": True}
+        )).first()
+        
+        if attendance is None:
+            # Conflict row already has time_out, so nothing was updated
+            attendance = (await db.scalars(
+                select(Attendance).where(
+                    Attendance.employee_no == employee.employee_no,
+                    Attendance.attendance_date == scan_date
+                )
+            )).first()
+            return attendance, "already_marked"
+        
+        # A row without time_out has no work minutes, so it had no overtime
+        action = "time_in" if attendance.time_out is None else "time_out"
+        await daily_summary_service.record(
+            db, scan_date, employee,
+            before=None if action == "time_in" else (attendance.time_in, False),
+            after=(attendance.time_in, attendance.overtime)
+        )
+        return attendance, action
+    
+    @staticmethod
+    async def mark_manual(
+        db: AsyncSession,
+        employee: Employee,
+        attendance_date: date,
+        time_in: Optional[time],
+        time_out: Optional[time],
+        device_id: str = "manual_admin"
+    ) -> tuple[Attendance, str]:
+        """
+        Create or update an attendance record with explicit times.
+        Provided times overwrite stored ones; omitted times are kept.
         
-        # Check if attendance record exists for today
-        attendance = db.query(Attendance).filter(
-            and_(
+        Args:
+            db: Database session
+            employee: Employee to mark
+            attendance_date: Date to mark attendance for
+            time_in: Optional time in
+            time_out: Optional time out
+            device_id: Device ID recorded on newly created rows
+            
+        Returns:
+            Tuple of (attendance record, action)
+            action: "created" or "updated"
+        """
+        existing = (await db.execute(
+            select(Attendance.time_in, Attendance.overtime).where(
                 Attendance.employee_no == employee.employee_no,
-                Attendance.attendance_date == today
+                Attendance.attendance_date == attendance_date
             )
-        ).first()
+        )).first()
+        
+        new_time_in = func.coalesce(_time_param(time_in), Attendance.time_in)
+        new_time_out = func.coalesce(_time_param(time_out), Attendance.time_out)
+        
+        insert_values = _work_values(
+            db, _time_param(time_in), _time_param(time_out), employee.shift
+        )
+        stmt = _dialect_insert(db)(Attendance).values(
+            employee_no=employee.employee_no,
+            attendance_date=attendance_date,
+            time_in=time_in,
+            time_out=time_out,
+            device_id=device_id,
+            **insert_values
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Attendance.employee_no, Attendance.attendance_date],
+            set_={
+                "time_in": new_time_in,
+                "time_out": new_time_out,
+                **_work_values(db, new_time_in, new_time_out, employee.shift)
+            }
+        ).returning(Attendance)
+        
+        attendance = (await db.scalars(
+            stmt, execution_options={"populate_existing": True}
+        )).one()
+        
+        await daily_summary_service.record(
+            db, attendance_date, employee,
+            before=tuple(existing) if existing else None,
+            after=(attendance.time_in, attendance.overtime)
+        )
+        
+        return attendance, "updated" if existing else "created"
+    
+    @staticmethod
+    async def mark_time_in(
+        db: AsyncSession,
+        employee: Employee,
+        marked_at: datetime,
+        device_id: str = "MANUAL_ENTRY"
+    ) -> tuple[Attendance, str]:
+        """
+        Record time_in for an employee unless it is already set (no commit).
+        
+        Returns:
+            Tuple of (attendance record, action)
+            action: "time_in" or "already_marked"
+        """
+        existing = (await db.execute(
+            select(Attendance.time_in, Attendance.overtime).where(
+                Attendance.employee_no == employee.employee_no,
+                Attendance.attendance_date == marked_at.date()
+            )
+        )).first()
+        
+        stmt = _dialect_insert(db)(Attendance).values(
+            employee_no=employee.employee_no,
+            attendance_date=marked_at.date(),
+            time_in=marked_at.time(),
+            device_id=device_id
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Attendance.employee_no, Attendance.attendance_date],
+            set_={"time_in": marked_at.time()},
+            where=Attendance.time_in.is_(None)
+        ).returning(Attendance)
+        
+        attendance = (await db.scalars(
+            stmt, execution_options={"populate_existing": True}
+        )).first()
         
         if attendance is None:
-            # First scan - create record with time_in
-            attendance = Attendance(
-                employee_no=employee.employee_no,
-                attendance_date=today,
-                time_in=current_time,
-                device_id=device_id
+            attendance = (await db.scalars(
+                select(Attendance).where(
+                    Attendance.employee_no == employee.employee_no,
+                    Attendance.attendance_date == marked_at.date()
+                )
+            )).first()
+            return attendance, "already_marked"
+        
+        await daily_summary_service.record(
+            db, marked_at.date(), employee,
+            before=tuple(existing) if existing else None,
+            after=(attendance.time_in, attendance.overtime)
+        )
+        return attendance, "time_in"
+    
+    @staticmethod
+    async def mark_time_out(
+        db: AsyncSession,
+        employee: Employee,
+        marked_at: datetime
+    ) -> tuple[Optional[Attendance], str]:
+        """
+        Record time_out for an employee who has timed in (no commit).
+        
+        Returns:
+            Tuple of (attendance record, action)
+            action: "time_out", "already_marked" or "no_time_in"
+        """
+        scan_time = marked_at.time()
+        
+        stmt = update(Attendance).where(
+            Attendance.employee_no == employee.employee_no,
+            Attendance.attendance_date == marked_at.date(),
+            Attendance.time_in.isnot(None),
+            Attendance.time_out.is_(None)
+        ).values(
+            time_out=scan_time,
+            **_work_values(db, Attendance.time_in, _time_param(scan_time), employee.shift)
+        ).returning(Attendance)
+        
+        attendance = (await db.scalars(
+            stmt, execution_options={"populate_existing": True, "synchronize_session": False}
+        )).first()
+        
+        if attendance is not None:
+            await daily_summary_service.record(
+                db, marked_at.date(), employee,
+                before=(attendance.time_in, False),
+                after=(attendance.time_in, attendance.overtime)
             )
-            db.add(attendance)
-            db.commit()
-            db.refresh(attendance)
-            return attendance, "time_in", employee
-        
-        elif attendance.time_out is None:
-            # Second scan - set time_out
-            attendance.time_out = current_time
-            attendance.device_id = device_id
+            return attendance, "time_out"
+        
+        attendance = (await db.scalars(
+            select(Attendance).where(
+                Attendance.employee_no == employee.employee_no,
+                Attendance.attendance_date == marked_at.date()
+            )
+        )).first()
+        
+        if attendance is None or attendance.time_in is None:
+            return attendance, "no_time_in"
+        return attendance, "already_marked"
+    
+    @staticmethod
+    async def sync_offline_scans(
+        db: AsyncSession,
+        events: list[tuple[str, str, datetime]]
+    ) -> list[tuple[Optional[str], str]]:
+        """
+        Apply a batch of buffered device scans in one transaction.
+        
+        Templates are identified in bulk, then each employee's scans are
+        applied in capture order with the same rules as mark_attendance
+        (first scan of a day → time_in, second → time_out, later → ignored).
+        Scans are merged with existing rows by capture time: a scan taken
+        before the stored time_in becomes the day's time_in, so the day keeps
+        the earliest time_in and the latest time_out.
+        New rows are written with one bulk INSERT and changed rows with one
+        bulk UPDATE. If a concurrent write creates a conflicting row, the
+        batch is rolled back and replayed once against the fresh state.
+        
+        Args:
+            db: Database session
+            events: (fingerprint_template, device_id, captured_at) tuples
             
-            # Calculate work minutes and overtime
-            attendance.total_work_minutes = attendance.calculate_work_minutes()
-            attendance.update_overtime()
+        Returns:
+            (employee_no, action) for each event, in input order
+            action: "time_in", "time_out", "already_marked", or "not_found"
+        """
+        employee_nos = await employee_service.identify_fingerprints(db, [event[0] for event in events])
+        
+        try:
+            results = await AttendanceService._apply_offline_scans(db, events, employee_nos)
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            results = await AttendanceService._apply_offline_scans(db, events, employee_nos)
+            await db.commit()
+        
+        return results
+    
+    @staticmethod
+    async def _apply_offline_scans(
+        db: AsyncSession,
+        events: list[tuple[str, str, datetime]],
+        employee_nos: list[Optional[str]]
+    ) -> list[tuple[Optional[str], str]]:
+        """Replay identified offline scans against current attendance rows (no commit)."""
+        results: list[tuple[Optional[str], str]] = [
+            (employee_no, "not_found") for employee_no in employee_nos
+        ]
+        
+        # Capture times as naive local time, like datetime.now() on the server
+        captured = [
+            event[2].astimezone().replace(tzinfo=None) if event[2].tzinfo else event[2]
+            for event in events
+        ]
+        
+        matched = [i for i, employee_no in enumerate(employee_nos) if employee_no]
+        if not matched:
+            return results
+        
+        employee_set = list({employee_nos[i] for i in matched})
+        dates = [captured[i].date() for i in matched]
+        first_date, last_date = min(dates), max(dates)
+        
+        employees: dict[str, tuple[Optional[str], Optional[str]]] = {}
+        state: dict[tuple[str, date], dict] = {}
+        for start in range(0, len(employee_set), IN_CLAUSE_CHUNK):
+            chunk = employee_set[start:start + IN_CLAUSE_CHUNK]
+            for employee_no, department, shift in (await db.execute(
+                select(Employee.employee_no, Employee.department, Employee.shift)
+                .where(Employee.employee_no.in_(chunk))
+            )).all():
+                employees[employee_no] = (department, shift)
+            rows = (await db.execute(
+                select(
+                    Attendance.id,
+                    Attendance.employee_no,
+                    Attendance.attendance_date,
+                    Attendance.time_in,
+                    Attendance.time_out,
+                    Attendance.overtime
+                ).where(
+                    Attendance.employee_no.in_(chunk),
+                    Attendance.attendance_date.between(first_date, last_date)
+                )
+            )).mappings()
+            for row in rows:
+                state[(row["employee_no"], row["attendance_date"])] = dict(row)
+        
+        # Summary state of existing rows before this batch touches them
+        before = {record["id"]: (record["time_in"], record["overtime"]) for record in state.values()}
+        new_rows: list[dict] = []
+        changed_rows: dict[int, dict] = {}
+        
+        for i in sorted(matched, key=lambda i: (employee_nos[i], captured[i])):
+            employee_no = employee_nos[i]
+            scan_time = captured[i].time()
+            device_id = events[i][1]
+            key = (employee_no, captured[i].date())
+            record = state.get(key)
             
-            db.commit()
-            db.refresh(attendance)
-            return attendance, "time_out", employee
+            if record is None:
+                record = {
+                    "employee_no": employee_no,
+                    "attendance_date": key[1],
+                    "time_in": scan_time,
+                    "time_out": None,
+                    "device_id": device_id,
+                    "total_work_minutes": 0,
+                    "overtime": False,
+                    "overtime_minutes": 0
+                }
+                state[key] = record
+                new_rows.append(record)
+                action = "time_in"
+            elif record["time_in"] is not None and scan_time < record["time_in"]:
+                # Captured before a live scan that already marked time_in:
+                # keep the earliest time_in and the latest time_out
+                time_out = record["time_out"] or record["time_in"]
+                AttendanceService._close_offline_record(
+                    record, scan_time, time_out, device_id,
+                    employees.get(employee_no, (None, None))[1]
+                )
+                if "id" in record:
+                    changed_rows[record["id"]] = record
+                action = "time_in"
+            elif record["time_out"] is None:
+                AttendanceService._close_offline_record(
+                    record, record["time_in"], scan_time, device_id,
+                    employees.get(employee_no, (None, None))[1]
+                )
+                if "id" in record:
+                    changed_rows[record["id"]] = record
+                action = "time_out"
+            else:
+                action = "already_marked"
+            
+            results[i] = (employee_no, action)
+        
+        if new_rows:
+            await db.execute(insert(Attendance), new_rows)
+        if changed_rows:
+            await db.execute(update(Attendance), [
+                {
+                    "id": record["id"],
+                    "time_in": record["time_in"],
+                    "time_out": record["time_out"],
+                    "device_id": record["device_id"],
+                    "total_work_minutes": record["total_work_minutes"],
+                    "overtime": record["overtime"],
+                    "overtime_minutes": record["overtime_minutes"]
+                }
+                for record in changed_rows.values()
+            ])
         
-        else:
-            # Already marked both time_in and time_out
-            return attendance, "already_marked", employee
+        # New rows count in full; changed rows move from their stored state
+        delta = SummaryDelta()
+        for record in new_rows:
+            delta.change(
+                record["attendance_date"], *employees.get(record["employee_no"], (None, None)),
+                after=(record["time_in"], record["overtime"])
+            )
+        for record in changed_rows.values():
+            delta.change(
+                record["attendance_date"], *employees.get(record["employee_no"], (None, None)),
+                before=before[record["id"]],
+                after=(record["time_in"], record["overtime"])
+            )
+        await delta.apply(db)
+        
+        return results
+    
+    @staticmethod
+    def _close_offline_record(
+        record: dict,
+        time_in: time,
+        time_out: time,
+        device_id: str,
+        shift: Optional[str]
+    ) -> None:
+        """Set a replayed row's times and recalculate its work minutes and overtime."""
+        work_minutes = Attendance(time_in=time_in, time_out=time_out).calculate_work_minutes()
+        overtime, overtime_minutes = calculate_overtime(work_minutes, shift)
+        record.update(
+            time_in=time_in,
+            time_out=time_out,
+            device_id=device_id,
+            total_work_minutes=work_minutes,
+            overtime=overtime,
+            overtime_minutes=overtime_minutes
+        )
     
     @staticmethod
-    def get_attendance_by_date(
-        db: Session,
+    async def get_attendance_by_date(
+        db: AsyncSession,
         attendance_date: date,
         skip: int = 0,
         limit: int = 100
@@ -103,45 +685,31 @@ class AttendanceService:
         Returns:
             Tuple of (attendance records with employee info, total count)
         """
-        query = db.query(Attendance, Employee).join(
+        query = select(*ATTENDANCE_LISTING_COLUMNS, *ATTENDANCE_EMPLOYEE_COLUMNS).join(
             Employee, Attendance.employee_no == Employee.employee_no
-        ).filter(
+        ).where(
             Attendance.attendance_date == attendance_date
         )
         
-        total = query.count()
-        
-        results = query.order_by(Attendance.time_in).offset(skip).limit(limit).all()
-        
-        # Format results
-        records = []
-        for attendance, employee in results:
-            records.append({
-                "id": attendance.id,
-                "employee_no": attendance.employee_no,
-                "employee_name": employee.name,
-                "department": employee.department,
-                "designation": employee.designation,
-                "attendance_date": attendance.attendance_date,
-                "time_in": attendance.time_in,
-                "time_out": attendance.time_out,
-                "total_work_minutes": attendance.total_work_minutes,
-                "overtime": attendance.overtime,
-                "overtime_minutes": attendance.overtime_minutes,
-                "device_id": attendance.device_id
-            })
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
         
-        return records, total
+        results = (await db.execute(
+            query.order_by(Attendance.time_in).offset(skip).limit(limit)
+        )).all()
+        
+        return [row._asdict() for row in results], total
     
     @staticmethod
-    def get_attendance_by_employee(
-        db: Session,
+    async def get_attendance_by_employee(
+        db: AsyncSession,
         employee_no: str,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
         skip: int = 0,
-        limit: int = 100
-    ) -> tuple[List[Attendance], int]:
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        include_total: bool = True
+    ) -> tuple[list, Optional[int], Optional[str]]:
         """
         Get attendance records for a specific employee.
         
@@ -150,39 +718,45 @@ class AttendanceService:
             employee_no: Employee number to filter by
             start_date: Optional start date filter
             end_date: Optional end date filter
-            skip: Pagination offset
+            skip: Pagination offset (ignored when cursor is given)
             limit: Max records to return
+            cursor: next_cursor of the previous page
+            include_total: Count all matching records
             
         Returns:
-            Tuple of (attendance records, total count)
+            Tuple of (attendance rows with ATTENDANCE_LISTING_COLUMNS attributes,
+            total count or None, next cursor or None)
+            
+        Raises:
+            ValueError: If the cursor is malformed
         """
-        query = db.query(Attendance).filter(
+        query = select(*ATTENDANCE_LISTING_COLUMNS).where(
             Attendance.employee_no == employee_no
         )
         
         if start_date:
-            query = query.filter(Attendance.attendance_date >= start_date)
+            query = query.where(Attendance.attendance_date >= start_date)
         
         if end_date:
-            query = query.filter(Attendance.attendance_date <= end_date)
+            query = query.where(Attendance.attendance_date <= end_date)
         
-        total = query.count()
-        
-        records = query.order_by(
-            Attendance.attendance_date.desc()
-        ).offset(skip).limit(limit).all()
+        rows, total, next_cursor = await _page_attendance(
+            db, query, skip, limit, cursor, include_total
+        )
         
-        return records, total
+        return rows, total, next_cursor
     
     @staticmethod
-    def get_all_attendance(
-        db: Session,
+    async def get_all_attendance(
+        db: AsyncSession,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
         department: Optional[str] = None,
         skip: int = 0,
-        limit: int = 100
-    ) -> tuple[List[dict], int]:
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        include_total: bool = True
+    ) -> tuple[List[dict], Optional[int], Optional[str]]:
         """
         Get all attendance records with filters.
         
@@ -191,57 +765,162 @@ class AttendanceService:
             start_date: Optional start date filter
             end_date: Optional end date filter
             department: Optional department filter
-            skip: Pagination offset
+            skip: Pagination offset (ignored when cursor is given)
             limit: Max records to return
+            cursor: next_cursor of the previous page
+            include_total: Count all matching records
             
         Returns:
-            Tuple of (attendance records with employee info, total count)
+            Tuple of (attendance records with employee info, total count or None,
+            next cursor or None)
+            
+        Raises:
+            ValueError: If the cursor is malformed
         """
-        query = db.query(Attendance, Employee).join(
+        query = select(*ATTENDANCE_LISTING_COLUMNS, *ATTENDANCE_EMPLOYEE_COLUMNS).join(
             Employee, Attendance.employee_no == Employee.employee_no
         )
         
         if start_date:
-            query = query.filter(Attendance.attendance_date >= start_date)
+            query = query.where(Attendance.attendance_date >= start_date)
         
         if end_date:
-            query = query.filter(Attendance.attendance_date <= end_date)
+            query = query.where(Attendance.attendance_date <= end_date)
         
         if department:
-            query = query.filter(Employee.department == department)
-        
-        total = query.count()
-        
-        results = query.order_by(
-            Attendance.attendance_date.desc(),
-            Attendance.time_in
-        ).offset(skip).limit(limit).all()
-        
-        # Format results
-        records = []
-        for attendance, employee in results:
-            records.append({
-                "id": attendance.id,
-                "employee_no": attendance.employee_no,
-                "employee_name": employee.name,
-                "department": employee.department,
-                "designation": employee.designation,
-                "attendance_date": attendance.attendance_date,
-                "time_in": attendance.time_in,
-                "time_out": attendance.time_out,
-                "total_work_minutes": attendance.total_work_minutes,
-                "overtime": attendance.overtime,
-                "overtime_minutes": attendance.overtime_minutes,
-                "device_id": attendance.device_id
+            query = query.where(Employee.department == department)
+        
+        results, total, next_cursor = await _page_attendance(
+            db, query, skip, limit, cursor, include_total
+        )
+        
+        return [row._asdict() for row in results], total, next_cursor
+    
+    @staticmethod
+    async def get_employees_status(db: AsyncSession, target_date: date) -> List[dict]:
+        """
+        Get every employee with their attendance status for a date.
+        
+        One LEFT OUTER JOIN projection of only the needed columns, instead
+        of a query per employee. Times are ISO strings so the rows can be
+        cached and sent as JSON as-is.
+        
+        Args:
+            db: Database session
+            target_date: Date to report status for
+            
+        Returns:
+            List of status dictionaries, in employee order
+            status: "not_marked", "time_in_only" or "complete"
+        """
+        rows = (await db.execute(
+            select(
+                Employee.employee_no,
+                Employee.name,
+                Employee.department,
+                Attendance.id,
+                Attendance.time_in,
+                Attendance.time_out
+            ).outerjoin(
+                Attendance,
+                and_(
+                    Attendance.employee_no == Employee.employee_no,
+                    Attendance.attendance_date == target_date
+                )
+            ).order_by(Employee.id)
+        )).all()
+        
+        result = []
+        for employee_no, name, department, attendance_id, time_in, time_out in rows:
+            if attendance_id is None:
+                status = "not_marked"
+            elif time_out is None:
+                status = "time_in_only"
+            else:
+                status = "complete"
+            
+            result.append({
+                "employee_no": employee_no,
+                "name": name,
+                "department": department,
+                "attendance_id": attendance_id,
+                "time_in": time_in.isoformat() if time_in else None,
+                "time_out": time_out.isoformat() if time_out else None,
+                "status": status
             })
         
-        return records, total
+        return result
     
     @staticmethod
-    def get_daily_summary(db: Session, target_date: date) -> dict:
+    async def stream_attendance(
+        db: AsyncSession,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        department: Optional[str] = None,
+        employee_no: Optional[str] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[List[dict]]:
+        """
+        Stream attendance records with employee info in batches.
+        
+        Rows come from a server-side cursor (yield_per), so memory use is
+        bounded by batch_size however many records match. Order matches
+        the attendance listing.
+        
+        Args:
+            db: Database session (kept open while iterating)
+            start_date: Optional start date filter
+            end_date: Optional end date filter
+            department: Optional department filter
+            employee_no: Optional employee filter
+            batch_size: Rows fetched per round trip
+            
+        Yields:
+            Lists of up to batch_size record dictionaries
+        """
+        query = select(
+            Attendance.id,
+            Attendance.employee_no,
+            Employee.name.label("employee_name"),
+            Employee.department,
+            Employee.designation,
+            Attendance.attendance_date,
+            Attendance.time_in,
+            Attendance.time_out,
+            Attendance.total_work_minutes,
+            Attendance.overtime,
+            Attendance.overtime_minutes,
+            Attendance.device_id
+        ).join(
+            Employee, Attendance.employee_no == Employee.employee_no
+        )
+        
+        if start_date:
+            query = query.where(Attendance.attendance_date >= start_date)
+        
+        if end_date:
+            query = query.where(Attendance.attendance_date <= end_date)
+        
+        if department:
+            query = query.where(Employee.department == department)
+        
+        if employee_no:
+            query = query.where(Attendance.employee_no == employee_no)
+        
+        result = await db.stream(
+            query.order_by(*ATTENDANCE_ORDER).execution_options(yield_per=batch_size)
+        )
+        async for partition in result.mappings().partitions():
+            yield [dict(row) for row in partition]
+    
+    @staticmethod
+    async def get_daily_summary(db: AsyncSession, target_date: date) -> dict:
         """
         Get attendance summary for a specific date.
         
+        Reads the per-department rows of daily_attendance_summary, so the
+        cost does not depend on how many employees attended.
+        
         Args:
             db: Database session
             target_date: Date to get summary for
@@ -249,36 +928,122 @@ class AttendanceService:
         Returns:
             Summary dictionary with counts
         """
-        # Get total employees
-        total_employees = db.query(Employee).count()
+        summary = (await db.execute(
+            select(
+                select(func.count(Employee.id)).scalar_subquery().label("total_employees"),
+                func.sum(DailySummary.present).label("present"),
+                func.sum(DailySummary.on_time).label("on_time"),
+                func.sum(DailySummary.overtime_count).label("overtime_count")
+            ).where(DailySummary.attendance_date == target_date)
+        )).one()
         
-        # Get attendance records for the date
-        attendance_records = db.query(Attendance).filter(
-            Attendance.attendance_date == target_date
-        ).all()
+        # SUM over no rows is NULL
+        present = int(summary.present or 0)
+        on_time = int(summary.on_time or 0)
         
-        present = len(attendance_records)
-        absent = total_employees - present
+        return {
+            "date": target_date,
+            "total_employees": summary.total_employees,
+            "present": present,
+            "absent": summary.total_employees - present,
+            "on_time": on_time,
+            "late": present - on_time,
+            "overtime_count": int(summary.overtime_count or 0)
+        }
+    
+    @staticmethod
+    async def get_monthly_report(
+        db: AsyncSession,
+        year: int,
+        month: int,
+        department: Optional[str] = None
+    ) -> dict:
+        """
+        Get per-day attendance counts for a month, with department breakdowns.
+        
+        Counts come from daily_attendance_summary (one row per date and
+        department), so the work grows with the number of days, not
+        attendance records.
+        
+        Args:
+            db: Database session
+            year: Report year
+            month: Report month (1-12)
+            department: Optional department filter
+            
+        Returns:
+            Report dictionary with one entry per day of the month
+        """
+        first_day = date(year, month, 1)
+        last_day = date(year, month, calendar.monthrange(year, month)[1])
         
-        # Count overtime (worked more than 8 hours)
-        overtime_count = sum(1 for a in attendance_records if a.overtime)
+        # Headcount per department
+        headcount_query = select(Employee.department, func.count(Employee.id)).group_by(
+            Employee.department
+        )
+        if department:
+            headcount_query = headcount_query.where(Employee.department == department)
+        headcount: dict[Optional[str], int] = {}
+        for name, count in (await db.execute(headcount_query)).all():
+            headcount[name or None] = headcount.get(name or None, 0) + count
+        total_employees = sum(headcount.values())
         
-        # Count on-time (arrived before 9:00 AM) - configurable threshold
-        on_time_threshold = time(9, 0, 0)
-        on_time = sum(
-            1 for a in attendance_records 
-            if a.time_in and a.time_in <= on_time_threshold
+        # Attendance counts per (date, department)
+        counts_query = select(DailySummary).where(
+            DailySummary.attendance_date.between(first_day, last_day)
         )
-        late = present - on_time
+        if department:
+            counts_query = counts_query.where(DailySummary.department == department)
+        
+        by_day = {}
+        for row in (await db.scalars(counts_query)).all():
+            by_day.setdefault(row.attendance_date, {})[row.department or None] = row
+        
+        days = []
+        total_records = 0
+        overtime_records = 0
+        current = first_day
+        while current <= last_day:
+            rows = by_day.get(current, {})
+            departments = []
+            for name in sorted(set(headcount) | set(rows), key=lambda d: d or ""):
+                row = rows.get(name)
+                present = row.present if row else 0
+                punctual = row.on_time if row else 0
+                departments.append({
+                    "department": name,
+                    "total_employees": headcount.get(name, 0),
+                    "present": present,
+                    "absent": max(headcount.get(name, 0) - present, 0),
+                    "on_time": punctual,
+                    "late": present - punctual,
+                    "overtime_count": row.overtime_count if row else 0
+                })
+            
+            present = sum(d["present"] for d in departments)
+            overtime_count = sum(d["overtime_count"] for d in departments)
+            on_time_count = sum(d["on_time"] for d in departments)
+            days.append({
+                "date": current,
+                "present": present,
+                "absent": max(total_employees - present, 0),
+                "on_time": on_time_count,
+                "late": present - on_time_count,
+                "overtime_count": overtime_count,
+                "departments": departments
+            })
+            total_records += present
+            overtime_records += overtime_count
+            current += timedelta(days=1)
         
         return {
-            "date": target_date,
+            "year": year,
+            "month": month,
+            "department": department,
             "total_employees": total_employees,
-            "present": present,
-            "absent": absent,
-            "on_time": on_time,
-            "late": late,
-            "overtime_count": overtime_count
+            "total_records": total_records,
+            "overtime_records": overtime_records,
+            "days": days
         }
 
 
@@ -0,0 +1,232 @@
+"""
+Daily summary service - Maintains the daily_attendance_summary table.
+
+Every attendance write records how it changed the row's contribution
+(present / on time / overtime) in a SummaryDelta, which is applied as one
+additive upsert in the same transaction. Dashboard and report reads then
+sum a handful of summary rows instead of scanning attendance.
+"""
+from datetime import date, time
+from typing import Optional
+
+from sqlalchemy import and_, case, delete, func, insert, literal, select, Time
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.attendance import Attendance
+from models.daily_summary import DailySummary
+from models.employee import Employee
+from utils.shifts import SHIFT_ON_TIME_THRESHOLDS, DEFAULT_ON_TIME_THRESHOLD, get_on_time_threshold
+
+# Contribution of one attendance row: (time_in, overtime), or None if absent
+RowState = Optional[tuple[Optional[time], bool]]
+
+
+def on_time_condition(time_in_expr, shift_expr):
+    """
+    SQL condition for an on-time arrival.
+    Mirrors utils.shifts.get_on_time_threshold() as a CASE on the shift code.
+    """
+    threshold = case(
+        {code: literal(limit, Time) for code, limit in SHIFT_ON_TIME_THRESHOLDS.items()},
+        value=shift_expr,
+        else_=literal(DEFAULT_ON_TIME_THRESHOLD, Time)
+    )
+    return and_(time_in_expr.is_not(None), time_in_expr <= threshold)
+
+
+class SummaryDelta:
+    """
+    Pending summary count changes per (attendance_date, department).
+    Collect changes with change(), then write them with apply().
+    """
+
+    def __init__(self):
+        self.counts: dict[tuple[date, str], list[int]] = {}
+
+    def change(
+        self,
+        attendance_date: date,
+        department: Optional[str],
+        shift: Optional[str],
+        before: RowState = None,
+        after: RowState = None
+    ) -> None:
+        """
+        Record one attendance row changing from `before` to `after`.
+
+        Args:
+            attendance_date: Date of the attendance row
+            department: Employee department (None for none)
+            shift: Employee shift, for the on-time threshold
+            before: (time_in, overtime) before the write, None if the row was new
+            after: (time_in, overtime) after the write, None if it was deleted
+        """
+        counts = self.counts.setdefault((attendance_date, department or ""), [0, 0, 0])
+        for state, sign in ((before, -1), (after, 1)):
+            if state is None:
+                continue
+            time_in, overtime = state
+            counts[0] += sign
+            counts[1] += sign * (time_in is not None and time_in <= get_on_time_threshold(shift))
+            counts[2] += sign * bool(overtime)
+
+    async def apply(self, db: AsyncSession) -> None:
+        """Add the pending changes to the summary table (no commit)."""
+        rows = [
+            {
+                "attendance_date": attendance_date,
+                "department": department,
+                "present": present,
+                "on_time": on_time,
+                "overtime_count": overtime_count
+            }
+            for (attendance_date, department), (present, on_time, overtime_count) in self.counts.items()
+            if present or on_time or overtime_count
+        ]
+        self.counts.clear()
+        if not rows:
+            return
+
+        dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        stmt = dialect_insert(DailySummary)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DailySummary.attendance_date, DailySummary.department],
+            set_={
+                "present": DailySummary.present + stmt.excluded.present,
+                "on_time": DailySummary.on_time + stmt.excluded.on_time,
+                "overtime_count": DailySummary.overtime_count + stmt.excluded.overtime_count
+            }
+        )
+        await db.execute(stmt, rows)
+
+
+class DailySummaryService:
+    """Service class for the daily attendance summary table."""
+
+    @staticmethod
+    async def record(
+        db: AsyncSession,
+        attendance_date: date,
+        employee: Optional[Employee],
+        before: RowState = None,
+        after: RowState = None
+    ) -> None:
+        """
+        Apply the summary change for a single attendance write (no commit).
+
+        Args:
+            db: Database session
+            attendance_date: Date of the attendance row
+            employee: Owner of the row (None if the employee no longer exists)
+            before: (time_in, overtime) before the write, None if the row was new
+            after: (time_in, overtime) after the write, None if it was deleted
+        """
+        delta = SummaryDelta()
+        delta.change(
+            attendance_date,
+            employee.department if employee else None,
+            employee.shift if employee else None,
+            before=before,
+            after=after
+        )
+        await delta.apply(db)
+
+    @staticmethod
+    async def reassign_employee(
+        db: AsyncSession,
+        employee_no: str,
+        old: tuple[Optional[str], Optional[str]],
+        new: tuple[Optional[str], Optional[str]]
+    ) -> None:
+        """
+        Move an employee's attendance history between summary buckets after
+        their department or shift changes (no commit).
+
+        Args:
+            db: Database session
+            employee_no: Employee number on the attendance rows
+            old: (department, shift) the rows are currently counted under
+            new: (department, shift) they should be counted under
+        """
+        rows = (await db.execute(
+            select(Attendance.attendance_date, Attendance.time_in, Attendance.overtime)
+            .where(Attendance.employee_no == employee_no)
+        )).all()
+
+        delta = SummaryDelta()
+        for attendance_date, time_in, overtime in rows:
+            delta.change(attendance_date, *old, before=(time_in, overtime))
+            delta.change(attendance_date, *new, after=(time_in, overtime))
+        await delta.apply(db)
+
+    @staticmethod
+    async def remove_employee(
+        db: AsyncSession,
+        employee_no: str,
+        bucket: tuple[Optional[str], Optional[str]]
+    ) -> None:
+        """
+        Take an employee's attendance history out of the summary before the
+        employee and their attendance rows are deleted (no commit).
+
+        Args:
+            db: Database session
+            employee_no: Employee number on the attendance rows
+            bucket: (department, shift) the rows are currently counted under
+        """
+        rows = (await db.execute(
+            select(Attendance.attendance_date, Attendance.time_in, Attendance.overtime)
+            .where(Attendance.employee_no == employee_no)
+        )).all()
+
+        delta = SummaryDelta()
+        for attendance_date, time_in, overtime in rows:
+            delta.change(attendance_date, *bucket, before=(time_in, overtime))
+        await delta.apply(db)
+
+    @staticmethod
+    def rebuild_statements(start_date: date, end_date: date) -> list:
+        """
+        Statements that recompute the summary rows for a date range from raw
+        attendance: a DELETE of the range, then one INSERT ... SELECT with
+        a GROUP BY (attendance_date, department).
+        """
+        department = func.coalesce(Employee.department, "")
+        counts = select(
+            Attendance.attendance_date,
+            department,
+            func.count(Attendance.id),
+            func.sum(case((on_time_condition(Attendance.time_in, Employee.shift), 1), else_=0)),
+            func.sum(case((Attendance.overtime, 1), else_=0))
+        ).select_from(Attendance).outerjoin(
+            Employee, Attendance.employee_no == Employee.employee_no
+        ).where(
+            Attendance.attendance_date.between(start_date, end_date)
+        ).group_by(
+            Attendance.attendance_date, department
+        )
+
+        return [
+            delete(DailySummary).where(DailySummary.attendance_date.between(start_date, end_date)),
+            insert(DailySummary).from_select(
+                ["attendance_date", "department", "present", "on_time", "overtime_count"], counts
+            )
+        ]
+
+    @staticmethod
+    async def rebuild(db: AsyncSession, start_date: date, end_date: date) -> None:
+        """
+        Recompute the summary rows for a date range from raw attendance (no commit).
+
+        Args:
+            db: Database session
+            start_date: First date to rebuild
+            end_date: Last date to rebuild (inclusive)
+        """
+        for stmt in DailySummaryService.rebuild_statements(start_date, end_date):
+            await db.execute(stmt)
+
+
+# Singleton instance
+daily_summary_service = DailySummaryService()
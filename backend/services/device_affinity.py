@@ -0,0 +1,96 @@
+"""
+Device affinity service - Recent matches per attendance device.
+"""
+import threading
+from collections import OrderedDict
+
+from utils.config import settings
+
+
+class DeviceAffinityCache:
+    """
+    Per-device LRU of recently matched employee_nos.
+
+    Most scans at a gate come from the few hundred people who use it, so
+    identification first tries the probe against this small set. Only an
+    exact template match or a similarity score of at least accept_score
+    ends the search there; anything weaker is scored against the full
+    gallery, where a better match from someone outside the set may exist.
+    """
+
+    def __init__(self, capacity: int = 300, max_devices: int = 500, accept_score: float = 0.97):
+        """
+        Args:
+            capacity: Employees remembered per device (0 disables the cache)
+            max_devices: Devices tracked before the least recent is dropped
+            accept_score: Similarity a match from the recent set needs to skip
+                the full gallery (above 1.0, only exact matches skip it)
+        """
+        self.capacity = capacity
+        self.max_devices = max_devices
+        self.accept_score = accept_score
+        self._devices: OrderedDict[str, OrderedDict[str, None]] = OrderedDict()
+        self._stats: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def candidates(self, device_id: str) -> frozenset[str]:
+        """Return the employee_nos recently matched at a device."""
+        with self._lock:
+            recent = self._devices.get(device_id)
+            return frozenset(recent) if recent else frozenset()
+
+    def record_match(self, device_id: str, employee_no: str) -> None:
+        """Remember that an employee was matched at a device."""
+        if not self.enabled:
+            return
+        with self._lock:
+            recent = self._devices.get(device_id)
+            if recent is None:
+                recent = self._devices[device_id] = OrderedDict()
+                while len(self._devices) > self.max_devices:
+                    evicted, _ = self._devices.popitem(last=False)
+                    self._stats.pop(evicted, None)
+            else:
+                self._devices.move_to_end(device_id)
+
+            recent[employee_no] = None
+            recent.move_to_end(employee_no)
+            while len(recent) > self.capacity:
+                recent.popitem(last=False)
+
+    def record_lookup(self, device_id: str, hit: bool) -> None:
+        """
+        Count an affinity hit or miss for a device.
+        Only tracked devices are counted, so stats are evicted with them.
+        """
+        with self._lock:
+            if device_id not in self._devices:
+                return
+            stats = self._stats.setdefault(device_id, {"hits": 0, "misses": 0})
+            stats["hits" if hit else "misses"] += 1
+
+    def stats(self) -> dict:
+        """Return hit-rate metrics per device."""
+        with self._lock:
+            devices = {}
+            for device_id, stats in self._stats.items():
+                total = stats["hits"] + stats["misses"]
+                devices[device_id] = {
+                    "size": len(self._devices.get(device_id, ())),
+                    "hits": stats["hits"],
+                    "misses": stats["misses"],
+                    "hit_rate": round(stats["hits"] / total, 4) if total else 0.0
+                }
+            return {"capacity": self.capacity, "devices": devices}
+
+
+# Singleton instance
+device_affinity = DeviceAffinityCache(
+    capacity=settings.DEVICE_AFFINITY_SIZE,
+    max_devices=settings.DEVICE_AFFINITY_MAX_DEVICES,
+    accept_score=settings.DEVICE_AFFINITY_ACCEPT_SCORE
+)
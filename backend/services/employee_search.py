@@ -0,0 +1,112 @@
+"""
+Employee search - Indexed, ranked lookups by name, number, department and designation.
+
+Both match the search text as a substring of the name, employee_no,
+department or designation. SQLite uses the employees_fts FTS5 trigram
+table (ranked by bm25); PostgreSQL uses pg_trgm GIN indexes (ILIKE ranked
+by word similarity). Both indexes are declared in models/employee.py.
+"""
+from typing import Optional
+
+from sqlalchemy import Integer, column, func, or_, select, table, text
+from sqlalchemy.sql import ColumnElement, Select
+
+from models.employee import (
+    Employee,
+    EMPLOYEE_SEARCH_COLUMNS,
+    EMPLOYEE_SEARCH_POSTGRESQL_DDL,
+    EMPLOYEE_SEARCH_SQLITE_DDL,
+)
+
+# bm25 weights per column, in EMPLOYEE_SEARCH_COLUMNS order
+SEARCH_WEIGHTS = (10.0, 10.0, 2.0, 2.0)
+
+employees_fts = table(
+    "employees_fts",
+    column("rowid", Integer),
+    column("employees_fts"),  # Hidden column naming the table, used by MATCH and bm25
+)
+
+# The trigram tokenizer cannot match shorter terms from the index
+FTS_MIN_TERM_LENGTH = 3
+
+
+def fts_match_expression(search: str) -> Optional[str]:
+    """
+    Build an FTS5 trigram query matching the search text as a substring of
+    any indexed column, the same rows as ILIKE '%term%' on PostgreSQL.
+
+    e.g. 'ali kh' -> '"ali kh"', '001' -> '"001"'
+
+    Returns:
+        MATCH expression, or None if the term is too short for the index
+    """
+    term = search.strip()
+    if len(term) < FTS_MIN_TERM_LENGTH:
+        return None
+    # One quoted string: FTS5 operators (AND, NEAR, column:) stay literal text
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def apply_search(query: Select, dialect_name: str, search: str) -> tuple[Select, Optional[ColumnElement]]:
+    """
+    Restrict an Employee select to rows matching a search string.
+
+    Args:
+        query: select(Employee) with any other filters applied
+        dialect_name: Dialect of the session that will run the query
+        search: Text typed into the search box
+
+    Returns:
+        Tuple of (filtered query, rank expression or None). Lower ranks
+        are better matches; None means the results are unranked.
+    """
+    if dialect_name == "sqlite":
+        match = fts_match_expression(search)
+        if match:
+            matches = select(
+                employees_fts.c.rowid.label("employee_id"),
+                func.bm25(employees_fts.c.employees_fts, *SEARCH_WEIGHTS).label("rank")
+            ).where(employees_fts.c.employees_fts.op("MATCH")(match)).subquery()
+            return query.join(matches, matches.c.employee_id == Employee.id), matches.c.rank
+
+    elif dialect_name == "postgresql" and search.strip():
+        term = search.strip()
+        pattern = f"%{_escape_like(term)}%"
+        columns = [Employee.__table__.c[name] for name in EMPLOYEE_SEARCH_COLUMNS]
+        rank = -func.greatest(*(func.word_similarity(term, col) for col in columns))
+        return query.where(or_(*(col.ilike(pattern, escape="\\") for col in columns))), rank
+
+    # Unindexed fallback (other dialects, or terms too short for the index)
+    term = search.strip()
+    if not term:
+        return query, None
+    pattern = f"%{_escape_like(term)}%"
+    columns = [Employee.__table__.c[name] for name in EMPLOYEE_SEARCH_COLUMNS]
+    return query.where(or_(*(col.ilike(pattern, escape="\\") for col in columns))), None
+
+
+def ensure_employee_search_index(conn) -> None:
+    """
+    Create the search index for the connection's dialect if it is missing,
+    filling the FTS5 table from existing employees. The caller commits.
+    """
+    if conn.dialect.name == "sqlite":
+        existing = conn.scalar(text("SELECT sql FROM sqlite_master WHERE name = 'employees_fts'"))
+        if existing and "trigram" in existing:
+            return
+        if existing:
+            # Earlier word-prefix (unicode61) index: rebuild as trigram
+            conn.execute(text("DROP TABLE employees_fts"))
+        for ddl in EMPLOYEE_SEARCH_SQLITE_DDL:
+            conn.execute(ddl)
+        conn.execute(text("INSERT INTO employees_fts(employees_fts) VALUES ('rebuild')"))
+        print("✓ Created and filled search index employees_fts")
+    elif conn.dialect.name == "postgresql":
+        for ddl in EMPLOYEE_SEARCH_POSTGRESQL_DDL:
+            conn.execute(ddl)
+
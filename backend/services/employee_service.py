@@ -2,19 +2,29 @@
 Employee service - Business logic for employee operations.
 """
 from typing import Optional, List
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
+from models.attendance import Attendance
 from models.employee import Employee
+from models.fingerprint_template import FingerprintTemplate
 from schemas.employee import EmployeeCreate, EmployeeUpdate, FingerprintEnroll
 from utils.encryption import encryption_service
+from utils.pagination import encode_cursor, decode_cursor
+from services.template_gallery import template_gallery
+from services.key_rotation import template_reencryption_job
+from services.device_affinity import device_affinity
+from services.daily_summary import daily_summary_service
+from services.employee_search import apply_search
 
 
 class EmployeeService:
     """Service class for employee CRUD operations."""
     
     @staticmethod
-    def create_employee(db: Session, employee_data: EmployeeCreate) -> Employee:
+    async def create_employee(db: AsyncSession, employee_data: EmployeeCreate) -> Employee:
         """
         Create a new employee.
         
@@ -29,9 +39,9 @@ class EmployeeService:
             ValueError: If employee_no already exists
         """
         # Check if employee_no already exists
-        existing = db.query(Employee).filter(
-            Employee.employee_no == employee_data.employee_no
-        ).first()
+        existing = await db.scalar(
+            select(Employee).where(Employee.employee_no == employee_data.employee_no)
+        )
         
         if existing:
             raise ValueError(f"Employee with employee_no '{employee_data.employee_no}' already exists")
@@ -41,68 +51,105 @@ class EmployeeService:
         
         try:
             db.add(employee)
-            db.commit()
-            db.refresh(employee)
+            await db.commit()
+            await db.refresh(employee)
             return employee
         except IntegrityError:
-            db.rollback()
+            await db.rollback()
             raise ValueError("Failed to create employee. Employee number may already exist.")
     
     @staticmethod
-    def get_employee_by_id(db: Session, employee_id: int) -> Optional[Employee]:
+    async def get_employee_by_id(db: AsyncSession, employee_id: int) -> Optional[Employee]:
         """Get employee by ID."""
-        return db.query(Employee).filter(Employee.id == employee_id).first()
+        return await db.get(Employee, employee_id)
     
     @staticmethod
-    def get_employee_by_employee_no(db: Session, employee_no: str) -> Optional[Employee]:
+    async def get_employee_by_employee_no(db: AsyncSession, employee_no: str) -> Optional[Employee]:
         """Get employee by employee number."""
-        return db.query(Employee).filter(Employee.employee_no == employee_no).first()
+        return await db.scalar(select(Employee).where(Employee.employee_no == employee_no))
     
     @staticmethod
-    def get_all_employees(
-        db: Session, 
+    async def get_all_employees(
+        db: AsyncSession, 
         skip: int = 0, 
         limit: int = 100,
         department: Optional[str] = None,
-        search: Optional[str] = None
-    ) -> tuple[List[Employee], int]:
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True
+    ) -> tuple[List[Employee], Optional[int], Optional[str]]:
         """
         Get all employees with pagination and optional filters.
         
         Args:
             db: Database session
-            skip: Number of records to skip
+            skip: Number of records to skip (ignored when cursor is given)
             limit: Maximum records to return
             department: Filter by department
-            search: Search by name or employee_no
+            search: Prefix search over name, employee_no, department and
+                designation; results are ordered best match first
+            cursor: next_cursor of the previous page
+            include_total: Count all matching employees
             
         Returns:
-            Tuple of (employees list, total count)
+            Tuple of (employees list, total count or None, next cursor or None)
+            
+        Raises:
+            ValueError: If the cursor is malformed
         """
-        query = db.query(Employee)
+        query = select(Employee)
+        rank = None
         
         # Apply filters
         if department:
-            query = query.filter(Employee.department == department)
+            query = query.where(Employee.department == department)
         
         if search:
-            search_pattern = f"%{search}%"
-            query = query.filter(
-                (Employee.name.ilike(search_pattern)) |
-                (Employee.employee_no.ilike(search_pattern))
-            )
+            query, rank = apply_search(query, db.get_bind().dialect.name, search)
         
         # Get total count before pagination
-        total = query.count()
+        total = None
+        if include_total:
+            total = await db.scalar(select(func.count()).select_from(query.subquery()))
         
-        # Apply pagination
-        employees = query.order_by(Employee.id).offset(skip).limit(limit).all()
+        if rank is None:
+            # Apply pagination: keyset on id after a cursor, offset otherwise
+            if cursor:
+                (last_id,) = decode_cursor(cursor, int)
+                query = query.where(Employee.id > last_id)
+            else:
+                query = query.offset(skip)
+            
+            employees = (await db.scalars(query.order_by(Employee.id).limit(limit + 1))).all()
+            
+            next_cursor = None
+            if len(employees) > limit:
+                employees = employees[:limit]
+                next_cursor = encode_cursor(employees[-1].id)
+            
+            return employees, total, next_cursor
         
-        return employees, total
+        # Ranked search: best matches first, keyset on (rank, id)
+        if cursor:
+            last_rank, last_id = decode_cursor(cursor, float, int)
+            query = query.where(or_(rank > last_rank, and_(rank == last_rank, Employee.id > last_id)))
+        else:
+            query = query.offset(skip)
+        
+        rows = (await db.execute(
+            query.add_columns(rank).order_by(rank, Employee.id).limit(limit + 1)
+        )).all()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][1], rows[-1][0].id)
+        
+        return [employee for employee, _ in rows], total, next_cursor
     
     @staticmethod
-    def update_employee(
-        db: Session, 
+    async def update_employee(
+        db: AsyncSession, 
         employee_id: int, 
         update_data: EmployeeUpdate
     ) -> Optional[Employee]:
@@ -120,7 +167,7 @@ class EmployeeService:
         Raises:
             ValueError: If updating to a duplicate employee_no
         """
-        employee = db.query(Employee).filter(Employee.id == employee_id).first()
+        employee = await db.get(Employee, employee_id)
         
         if not employee:
             return None
@@ -130,29 +177,55 @@ class EmployeeService:
         
         # Check if updating employee_no to an existing one
         if "employee_no" in update_dict:
-            existing = db.query(Employee).filter(
-                Employee.employee_no == update_dict["employee_no"],
-                Employee.id != employee_id
-            ).first()
+            existing = await db.scalar(
+                select(Employee).where(
+                    Employee.employee_no == update_dict["employee_no"],
+                    Employee.id != employee_id
+                )
+            )
             if existing:
                 raise ValueError(f"Employee with employee_no '{update_dict['employee_no']}' already exists")
         
+        old_employee_no = employee.employee_no
+        old_bucket = (employee.department, employee.shift)
+        
         # Update fields
         for field, value in update_dict.items():
             setattr(employee, field, value)
         
+        # Attendance rows stay under the old employee_no, so a renumbered
+        # employee's history no longer joins to any department or shift
+        new_bucket = (
+            (employee.department, employee.shift)
+            if employee.employee_no == old_employee_no else (None, None)
+        )
+        if new_bucket != old_bucket:
+            await daily_summary_service.reassign_employee(db, old_employee_no, old_bucket, new_bucket)
+        
         try:
-            db.commit()
-            db.refresh(employee)
+            if employee.employee_no != old_employee_no:
+                # Enrolled fingers follow the employee (the FK cascade only
+                # runs where foreign keys are enforced)
+                await db.flush()
+                await db.execute(
+                    update(FingerprintTemplate)
+                    .where(FingerprintTemplate.employee_no == old_employee_no)
+                    .values(employee_no=employee.employee_no)
+                )
+            await db.commit()
+            await db.refresh(employee)
+            if employee.employee_no != old_employee_no:
+                template_gallery.rename(old_employee_no, employee.employee_no)
             return employee
         except IntegrityError:
-            db.rollback()
+            await db.rollback()
             raise ValueError("Failed to update employee. Employee number may already exist.")
     
     @staticmethod
-    def delete_employee(db: Session, employee_id: int) -> bool:
+    async def delete_employee(db: AsyncSession, employee_id: int) -> bool:
         """
-        Delete an employee.
+        Delete an employee with their fingerprint templates and attendance.
+        Their attendance is taken out of the daily summary first.
         
         Args:
             db: Database session
@@ -161,23 +234,33 @@ class EmployeeService:
         Returns:
             True if deleted, False if not found
         """
-        employee = db.query(Employee).filter(Employee.id == employee_id).first()
+        employee = await db.get(Employee, employee_id)
         
         if not employee:
             return False
         
-        db.delete(employee)
-        db.commit()
+        # Deleted explicitly: the FK cascade only runs where foreign keys are enforced
+        await daily_summary_service.remove_employee(
+            db, employee.employee_no, (employee.department, employee.shift)
+        )
+        await db.execute(delete(Attendance).where(Attendance.employee_no == employee.employee_no))
+        await db.execute(
+            delete(FingerprintTemplate).where(FingerprintTemplate.employee_no == employee.employee_no)
+        )
+        await db.delete(employee)
+        await db.commit()
+        template_gallery.remove(employee.employee_no)
         return True
     
     @staticmethod
-    def enroll_fingerprint(
-        db: Session, 
+    async def enroll_fingerprint(
+        db: AsyncSession, 
         enroll_data: FingerprintEnroll
     ) -> Optional[Employee]:
         """
-        Enroll or update employee fingerprint.
-        Encrypts the fingerprint template before storing.
+        Enroll or update one or more of an employee's fingers.
+        Each template is encrypted and upserted on (employee_no, finger_index);
+        fingers not in the request are kept.
         
         Args:
             db: Database session
@@ -186,49 +269,192 @@ class EmployeeService:
         Returns:
             Updated employee or None if not found
         """
-        employee = db.query(Employee).filter(
-            Employee.employee_no == enroll_data.employee_no
-        ).first()
+        employee = await db.scalar(
+            select(Employee).where(Employee.employee_no == enroll_data.employee_no)
+        )
         
         if not employee:
             return None
         
-        # Encrypt and store fingerprint template
-        encrypted_template = encryption_service.encrypt(enroll_data.fingerprint_template)
-        employee.fingerprint_template = encrypted_template
+        dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        stmt = dialect_insert(FingerprintTemplate).values([
+            {
+                "employee_no": employee.employee_no,
+                "finger_index": finger.finger_index,
+                "quality": finger.quality,
+                "template": encryption_service.encrypt_template(finger.fingerprint_template),
+                "template_hash": encryption_service.fingerprint_digest(finger.fingerprint_template)
+            }
+            for finger in enroll_data.fingers
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[FingerprintTemplate.employee_no, FingerprintTemplate.finger_index],
+            set_={
+                "quality": stmt.excluded.quality,
+                "template": stmt.excluded.template,
+                "template_hash": stmt.excluded.template_hash,
+                "updated_at": func.now()
+            }
+        )
+        await db.execute(stmt)
         
-        db.commit()
-        db.refresh(employee)
+        await db.commit()
+        await db.refresh(employee)
+        for finger in enroll_data.fingers:
+            template_gallery.put(employee.employee_no, finger.fingerprint_template, finger.finger_index)
         return employee
     
     @staticmethod
-    def find_employee_by_fingerprint(db: Session, fingerprint_template: str) -> Optional[Employee]:
+    async def match_fingerprint(
+        fingerprint_template: str,
+        device_id: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Match a fingerprint against in-memory state only (no database).
+        
+        Tries the employees recently matched at the device first, accepting
+        only an exact match or a score of at least device_affinity.accept_score
+        there, then the whole template gallery.
+        
+        Args:
+            fingerprint_template: Raw fingerprint template from device
+            device_id: Optional ID of the scanning device
+            
+        Returns:
+            Matching employee_no or None
+        """
+        employee_no = None
+        
+        if device_id and device_affinity.enabled:
+            recent = device_affinity.candidates(device_id)
+            if recent:
+                employee_no = await template_gallery.lookup(
+                    fingerprint_template, candidates=recent, min_score=device_affinity.accept_score
+                )
+            device_affinity.record_lookup(device_id, hit=employee_no is not None)
+        
+        if employee_no is None:
+            employee_no = await template_gallery.lookup(fingerprint_template)
+        
+        return employee_no
+    
+    @staticmethod
+    async def find_employee_by_fingerprint(
+        db: AsyncSession,
+        fingerprint_template: str,
+        device_id: Optional[str] = None,
+        matched_employee_no: Optional[str] = None,
+        skip_memory_match: bool = False
+    ) -> Optional[Employee]:
         """
         Find an employee by matching fingerprint template.
         
-        In a real implementation, this would use fingerprint matching algorithms.
-        For now, we iterate through all employees and compare templates.
+        When a device_id is given, the employees recently matched at that
+        device are tried first. Then the in-memory template gallery (exact match, then
+        similarity scoring above MATCH_THRESHOLD). On a miss, uses the keyed
+        blind index (fingerprint_templates.template_hash) to locate candidate
+        fingers with a single indexed lookup, then decrypts only those
+        templates to confirm the match. A confirmed template still in an
+        older storage format is handed to the background re-encryption job.
         
         Args:
             db: Database session
             fingerprint_template: Raw fingerprint template from device
+            device_id: Optional ID of the scanning device
+            matched_employee_no: Result of an earlier match_fingerprint call
+                for this scan, so the in-memory match is not repeated
+            skip_memory_match: The caller already ran match_fingerprint and
+                it missed; go straight to the database lookup
             
         Returns:
             Matching employee or None if no match
         """
-        # Get all employees with enrolled fingerprints
-        employees = db.query(Employee).filter(
-            Employee.fingerprint_template.isnot(None)
-        ).all()
+        if matched_employee_no is not None or skip_memory_match:
+            employee_no = matched_employee_no
+        else:
+            employee_no = await EmployeeService.match_fingerprint(fingerprint_template, device_id)
         
-        for employee in employees:
-            if encryption_service.verify_fingerprint(
-                fingerprint_template, 
-                employee.fingerprint_template
-            ):
+        if employee_no is not None:
+            employee = await db.scalar(
+                select(Employee).where(Employee.employee_no == employee_no)
+            )
+            if employee:
                 return employee
         
+        # Digests under every key in the ring (rows may predate a rotation)
+        digests = encryption_service.fingerprint_digests(fingerprint_template)
+        
+        candidates = (await db.execute(
+            select(
+                FingerprintTemplate.id,
+                FingerprintTemplate.employee_no,
+                FingerprintTemplate.finger_index,
+                FingerprintTemplate.template
+            ).where(FingerprintTemplate.template_hash.in_(digests))
+        )).all()
+        
+        for template_id, employee_no, finger_index, stored in candidates:
+            if encryption_service.verify_fingerprint(fingerprint_template, stored):
+                employee = await db.scalar(
+                    select(Employee).where(Employee.employee_no == employee_no)
+                )
+                if employee:
+                    if encryption_service.template_needs_reseal(stored):
+                        template_reencryption_job.submit([(template_id, stored, fingerprint_template)])
+                    template_gallery.put(employee_no, fingerprint_template, finger_index)
+                    return employee
+        
         return None
+    
+    @staticmethod
+    async def identify_fingerprints(db: AsyncSession, fingerprint_templates: list[str]) -> list[Optional[str]]:
+        """
+        Identify a batch of fingerprint templates.
+        
+        Uses the gallery's batched matcher, then resolves remaining templates
+        with one blind-index IN query instead of a lookup per template.
+        
+        Args:
+            db: Database session
+            fingerprint_templates: Raw fingerprint templates from devices
+            
+        Returns:
+            Matching employee_no or None for each template, in input order
+        """
+        results = await template_gallery.lookup_many(fingerprint_templates)
+        
+        # digest -> indexes of the unresolved templates with that digest
+        pending: dict[str, list[int]] = {}
+        for i, template in enumerate(fingerprint_templates):
+            if results[i] is None:
+                for digest in encryption_service.fingerprint_digests(template):
+                    pending.setdefault(digest, []).append(i)
+        
+        digests = list(pending)
+        stale = []
+        for start in range(0, len(digests), 500):
+            fingers = (await db.execute(
+                select(
+                    FingerprintTemplate.id,
+                    FingerprintTemplate.employee_no,
+                    FingerprintTemplate.finger_index,
+                    FingerprintTemplate.template_hash,
+                    FingerprintTemplate.template
+                ).where(FingerprintTemplate.template_hash.in_(digests[start:start + 500]))
+            )).all()
+            for template_id, employee_no, finger_index, digest, stored in fingers:
+                indexes = pending[digest]
+                template = fingerprint_templates[indexes[0]]
+                if encryption_service.verify_fingerprint(template, stored):
+                    if encryption_service.template_needs_reseal(stored):
+                        stale.append((template_id, stored, template))
+                    template_gallery.put(employee_no, template, finger_index)
+                    for i in indexes:
+                        results[i] = employee_no
+        
+        template_reencryption_job.submit(stale)
+        
+        return results
 
 
 # Singleton instance
@@ -0,0 +1,224 @@
+"""
+Key rotation service - Background re-encryption of fingerprint templates.
+"""
+import asyncio
+import time
+from typing import Optional
+
+from sqlalchemy import func, select
+
+from database import AsyncSessionLocal
+from models.fingerprint_template import FingerprintTemplate
+from services.template_gallery import reseal_templates
+from utils.config import settings
+from utils.encryption import encryption_service
+
+
+class TemplateReencryptionJob:
+    """
+    Re-encrypts stored templates with the current key after a rotation.
+
+    Walks fingerprint_templates in id order (keyset batches, no OFFSET) and
+    rewrites only rows sealed with a previous key or stored as Fernet
+    tokens, together with their blind index digest. Each batch is its own
+    short transaction followed by a pause, so device scans and enrollments
+    are never held up for long. Rows changed concurrently are left alone
+    (see reseal_templates).
+
+    The job is resumable: stop() halts it after the current batch and the
+    next start() continues from the last id; after a restart, a run from
+    the beginning skips rows that are already current.
+
+    Lookups that decrypt a stale row hand it over with submit(), so it is
+    resealed in its own short transaction instead of the request's.
+    """
+
+    def __init__(self, batch_size: int = 200, pause_ms: int = 50):
+        """
+        Args:
+            batch_size: Templates read and rewritten per transaction
+            pause_ms: Sleep between batches (the throttle)
+        """
+        self.batch_size = max(1, batch_size)
+        self.pause_ms = max(0, pause_ms)
+        self._task: Optional[asyncio.Task] = None
+        self._resealing: set[asyncio.Task] = set()
+        self._stop = False
+        self._reset(start_after=0)
+
+    def _reset(self, start_after: int) -> None:
+        self.last_id = start_after
+        self.total = 0
+        self.scanned = 0
+        self.resealed = 0
+        self.failed = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.completed = False
+        self.error: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(
+        self,
+        start_after: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        pause_ms: Optional[int] = None
+    ) -> bool:
+        """
+        Start the job on the running event loop.
+
+        Args:
+            start_after: Resume after this fingerprint_templates.id. Defaults to
+                where an interrupted run stopped, or the beginning.
+            batch_size: Optional new batch size
+            pause_ms: Optional new pause between batches
+
+        Returns:
+            False if the job is already running
+        """
+        if self.running:
+            return False
+        self.throttle(batch_size, pause_ms)
+        self._task = asyncio.create_task(self.run(start_after))
+        # Failures are reported through progress()["error"]
+        self._task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        return True
+
+    def stop(self) -> None:
+        """Ask a running job to stop after its current batch."""
+        self._stop = True
+
+    async def wait(self) -> None:
+        """Wait for a running job to finish (or stop), and for submitted reseals."""
+        pending = [*self._resealing, *([self._task] if self.running else [])]
+        if pending:
+            await asyncio.wait(pending)
+
+    def submit(self, templates: list[tuple[int, bytes, str]]) -> None:
+        """
+        Reseal stale templates a lookup has already decrypted, in the
+        background on the running event loop. A failed reseal leaves the
+        row for the next run of the job.
+
+        Args:
+            templates: (fingerprint_templates.id, stored blob, decrypted template) tuples
+        """
+        if not templates:
+            return
+        task = asyncio.create_task(self._reseal(list(templates)))
+        self._resealing.add(task)
+        task.add_done_callback(self._resealing.discard)
+        task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    @staticmethod
+    async def _reseal(templates: list[tuple[int, bytes, str]]) -> None:
+        async with AsyncSessionLocal() as db:
+            await reseal_templates(db, templates)
+            await db.commit()
+
+    def throttle(self, batch_size: Optional[int] = None, pause_ms: Optional[int] = None) -> None:
+        """Change the batch size and/or pause; a running job picks them up on its next batch."""
+        if batch_size is not None:
+            self.batch_size = max(1, batch_size)
+        if pause_ms is not None:
+            self.pause_ms = max(0, pause_ms)
+
+    async def run(self, start_after: Optional[int] = None, report=None) -> dict:
+        """
+        Re-encrypt every stale template, batch by batch.
+
+        Args:
+            start_after: See start()
+            report: Optional callable given progress() after each batch
+
+        Returns:
+            Final progress()
+        """
+        if start_after is None:
+            start_after = 0 if self.completed else self.last_id
+        self._reset(start_after)
+        self._stop = False
+        self.started_at = time.time()
+
+        try:
+            async with AsyncSessionLocal() as db:
+                self.total = await db.scalar(
+                    select(func.count(FingerprintTemplate.id)).where(FingerprintTemplate.id > start_after)
+                )
+
+            while not self._stop:
+                if not await self._run_batch():
+                    self.completed = True
+                    break
+                if report:
+                    report(self.progress())
+                if self.pause_ms:
+                    await asyncio.sleep(self.pause_ms / 1000)
+        except Exception as e:
+            self.error = repr(e)
+            raise
+        finally:
+            self.finished_at = time.time()
+
+        return self.progress()
+
+    async def _run_batch(self) -> bool:
+        """Re-encrypt the next batch in one transaction. Returns False when no rows are left."""
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(FingerprintTemplate.id, FingerprintTemplate.template)
+                .where(FingerprintTemplate.id > self.last_id)
+                .order_by(FingerprintTemplate.id)
+                .limit(self.batch_size)
+            )).all()
+            if not rows:
+                return False
+
+            stale = []
+            for template_id, stored in rows:
+                if not encryption_service.template_needs_reseal(stored):
+                    continue
+                try:
+                    stale.append((template_id, stored, encryption_service.decrypt_template(stored)))
+                except Exception:
+                    # Sealed with a key no longer in the ring, or corrupt
+                    self.failed += 1
+
+            if stale:
+                await reseal_templates(db, stale)
+                await db.commit()
+
+        self.last_id = rows[-1].id
+        self.scanned += len(rows)
+        self.resealed += len(stale)
+        return True
+
+    def progress(self) -> dict:
+        """Progress counters for monitoring."""
+        end = self.finished_at if self.finished_at and not self.running else time.time()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        return {
+            "running": self.running,
+            "completed": self.completed,
+            "key_id": encryption_service.key_id,
+            "total": self.total,
+            "scanned": self.scanned,
+            "resealed": self.resealed,
+            "failed": self.failed,
+            "percent": round(100 * self.scanned / self.total, 1) if self.total else 100.0,
+            "last_id": self.last_id,
+            "rows_per_second": round(self.scanned / elapsed, 1) if elapsed else 0.0,
+            "batch_size": self.batch_size,
+            "pause_ms": self.pause_ms,
+            "error": self.error
+        }
+
+
+# Singleton instance
+template_reencryption_job = TemplateReencryptionJob(
+    batch_size=settings.KEY_ROTATION_BATCH_SIZE,
+    pause_ms=settings.KEY_ROTATION_PAUSE_MS
+)
@@ -0,0 +1,156 @@
+"""
+Scan guard service - Idempotent replays and debounce for device scans.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from utils.config import settings
+
+
+class ScanGuard:
+    """
+    In-memory protection against retried and repeated device scans.
+
+    - Idempotency: the response to a request carrying an Idempotency-Key
+      is kept for ttl_seconds, keyed by (device_id, key), and replayed for
+      retries of that request. A retry that arrives while the original is
+      still being processed waits for the original's outcome.
+    - Debounce: once a scan is recorded for an employee, further scans of
+      that employee within debounce_seconds are no-ops.
+
+    Both checks are answered from memory, before any database access.
+    """
+
+    def __init__(
+        self,
+        max_keys: int = 10000,
+        ttl_seconds: int = 600,
+        debounce_seconds: int = 60
+    ):
+        """
+        Args:
+            max_keys: Idempotency keys remembered before the oldest is dropped
+            ttl_seconds: How long a stored response can be replayed
+            debounce_seconds: Repeat-scan window per employee (0 disables)
+        """
+        self.max_keys = max_keys
+        self.ttl_seconds = ttl_seconds
+        self.debounce_seconds = debounce_seconds
+        self._responses: OrderedDict[tuple[str, str], tuple[float, Any]] = OrderedDict()
+        self._recent_scans: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._in_flight: dict[tuple[str, str], asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.replays = 0
+        self.debounced = 0
+
+    def replay(self, device_id: str, key: str) -> Optional[Any]:
+        """Return the stored response for a retried request, if still fresh."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(self._responses, now - self.ttl_seconds)
+            entry = self._responses.get((device_id, key))
+            if entry is None:
+                return None
+            self.replays += 1
+            return entry[1]
+
+    def begin(self, device_id: str, key: str) -> Optional[asyncio.Future]:
+        """
+        Mark a request as in flight, unless one with the same key already is.
+        Must be called from the event loop; finish with remember() or fail().
+
+        Returns:
+            None if the caller now owns the key, otherwise a future that
+            resolves to the in-flight request's response (or raises its error)
+        """
+        with self._lock:
+            in_flight = self._in_flight.get((device_id, key))
+            if in_flight is not None:
+                self.replays += 1
+                return in_flight
+            self._in_flight[(device_id, key)] = asyncio.get_running_loop().create_future()
+            return None
+
+    def remember(self, device_id: str, key: str, response: Any) -> None:
+        """Store the response sent for an idempotency key and release waiting retries."""
+        with self._lock:
+            in_flight = self._in_flight.pop((device_id, key), None)
+            if self.max_keys > 0:
+                self._responses[(device_id, key)] = (time.monotonic(), response)
+                self._responses.move_to_end((device_id, key))
+                while len(self._responses) > self.max_keys:
+                    self._responses.popitem(last=False)
+        if in_flight is not None and not in_flight.done():
+            in_flight.set_result(response)
+
+    def fail(self, device_id: str, key: str, error: BaseException) -> None:
+        """
+        Release a key whose request failed. Waiting retries get the same
+        error; later retries are processed again.
+        """
+        with self._lock:
+            in_flight = self._in_flight.pop((device_id, key), None)
+        if in_flight is None or in_flight.done():
+            return
+        if isinstance(error, Exception):
+            in_flight.set_exception(error)
+            in_flight.exception()  # Retrieved here so an unawaited future is not logged
+        else:
+            in_flight.cancel()
+
+    def recent_scan(self, employee_no: str) -> Optional[tuple[float, Any]]:
+        """
+        Check whether an employee's scan falls in the debounce window.
+
+        Returns:
+            (seconds since the recorded scan, its response), or None
+        """
+        if self.debounce_seconds <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            self._expire(self._recent_scans, now - self.debounce_seconds)
+            entry = self._recent_scans.get(employee_no)
+            if entry is None:
+                return None
+            self.debounced += 1
+            return now - entry[0], entry[1]
+
+    def record_scan(self, employee_no: str, response: Any) -> None:
+        """Start the debounce window for an employee's recorded scan."""
+        if self.debounce_seconds <= 0:
+            return
+        with self._lock:
+            self._recent_scans[employee_no] = (time.monotonic(), response)
+            self._recent_scans.move_to_end(employee_no)
+
+    def stats(self) -> dict:
+        """Return cache sizes and counters."""
+        with self._lock:
+            return {
+                "idempotency_keys": len(self._responses),
+                "in_flight": len(self._in_flight),
+                "debounced_employees": len(self._recent_scans),
+                "replays": self.replays,
+                "debounced": self.debounced
+            }
+
+    @staticmethod
+    def _expire(entries: OrderedDict, cutoff: float) -> None:
+        """Drop entries stored before cutoff (oldest are first)."""
+        while entries:
+            stored_at = next(iter(entries.values()))[0]
+            if stored_at >= cutoff:
+                break
+            entries.popitem(last=False)
+
+
+# Singleton instance
+scan_guard = ScanGuard(
+    max_keys=settings.IDEMPOTENCY_CACHE_SIZE,
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+    debounce_seconds=settings.SCAN_DEBOUNCE_SECONDS
+)
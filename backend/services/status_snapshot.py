@@ -0,0 +1,146 @@
+"""
+Status snapshot service - Short-lived cache of today's employee attendance status.
+"""
+import asyncio
+import json
+import threading
+import time
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models.attendance import Attendance
+from models.employee import Employee
+from utils.config import settings
+
+# Session.info flag set when a transaction writes attendance or employees
+_DIRTY_FLAG = "employee_status_dirty"
+_WATCHED = (Attendance, Employee)
+
+
+class EmployeeStatusSnapshot:
+    """
+    In-memory snapshot of the employees-status rows for one date.
+
+    The front desk polls this list all day; between writes every poll is
+    answered from memory. Committed attendance/employee writes invalidate
+    the snapshot (see the session hooks below), and ttl_seconds bounds
+    staleness from writes made by other processes.
+    """
+
+    def __init__(self, ttl_seconds: float = 5.0):
+        """
+        Args:
+            ttl_seconds: Max age of a snapshot before it is reloaded (0 disables)
+        """
+        self.ttl_seconds = ttl_seconds
+        self._date: Optional[date] = None
+        self._rows: Optional[list[dict]] = None
+        self._body: Optional[bytes] = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+        # Serializes reloads so a burst of polls after a write runs one query
+        self.reload_lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def generation(self) -> int:
+        """Counter bumped by every invalidation; pass it back to store()."""
+        return self._generation
+
+    def get(self, target_date: date) -> Optional[list[dict]]:
+        """Return the cached rows for a date if still fresh."""
+        with self._lock:
+            fresh = (
+                self._rows is not None
+                and self._date == target_date
+                and time.monotonic() - self._loaded_at < self.ttl_seconds
+            )
+            if not fresh:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return self._rows
+
+    def encoded(self, rows: list[dict]) -> bytes:
+        """
+        JSON body for the full row list, encoded once per snapshot.
+        Encoding 20k rows costs more than serving them, so unfiltered
+        polls reuse the bytes until the next invalidation.
+        """
+        with self._lock:
+            if rows is self._rows and self._body is not None:
+                return self._body
+        body = json.dumps(rows, separators=(",", ":")).encode()
+        with self._lock:
+            if rows is self._rows:
+                self._body = body
+        return body
+
+    def store(self, target_date: date, rows: list[dict], generation: int) -> None:
+        """
+        Cache rows loaded while `generation` was current.
+        Dropped if a write was committed during the load.
+        """
+        with self._lock:
+            if generation != self._generation or self.ttl_seconds <= 0:
+                return
+            self._date = target_date
+            self._rows = rows
+            self._body = None
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """Discard the snapshot after a committed write."""
+        with self._lock:
+            self._generation += 1
+            self._rows = None
+            self._body = None
+
+    def stats(self) -> dict:
+        """Hit/miss counters for monitoring."""
+        with self._lock:
+            return {
+                "cached_rows": len(self._rows) if self._rows is not None else 0,
+                "hits": self.hits,
+                "misses": self.misses,
+                "ttl_seconds": self.ttl_seconds
+            }
+
+
+# Singleton instance
+employee_status_snapshot = EmployeeStatusSnapshot(ttl_seconds=settings.EMPLOYEE_STATUS_TTL_SECONDS)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement_writes(orm_execute_state):
+    """Flag INSERT/UPDATE/DELETE statements on watched tables."""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, _WATCHED):
+        orm_execute_state.session.info[_DIRTY_FLAG] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_writes(session, flush_context):
+    """Flag unit-of-work changes (add / attribute edits / delete) to watched rows."""
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, _WATCHED):
+            session.info[_DIRTY_FLAG] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop(_DIRTY_FLAG, False):
+        employee_status_snapshot.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _reset_on_rollback(session):
+    session.info.pop(_DIRTY_FLAG, None)
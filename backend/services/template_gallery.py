@@ -0,0 +1,318 @@
+"""
+Template gallery service - In-memory cache of decrypted fingerprint templates.
+"""
+import threading
+from collections import OrderedDict
+from typing import Collection, Optional
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.fingerprint_template import FingerprintTemplate
+from utils.config import settings
+from utils.encryption import encryption_service
+from utils.matcher import create_matcher
+
+# Gallery entries are per enrolled finger
+TemplateKey = tuple[str, int]  # (employee_no, finger_index)
+
+
+async def reseal_templates(db: AsyncSession, templates: list[tuple[int, bytes, str]]) -> int:
+    """
+    Re-encrypt stored templates with the current format and key, and
+    refresh their blind index digest (lazy migration of Fernet tokens and
+    of rows sealed with a previous key). A row is only rewritten if it
+    still holds the blob that was read, so a concurrent re-enrollment is
+    never overwritten. updated_at is left untouched so the gallery's
+    recency order is unchanged. The caller commits.
+
+    Args:
+        db: Database session
+        templates: (fingerprint_templates.id, stored blob, decrypted template) tuples
+
+    Returns:
+        Number of templates submitted for rewriting
+    """
+    if not templates:
+        return 0
+    table = FingerprintTemplate.__table__
+    await db.execute(
+        update(table)
+        .where(table.c.id == bindparam("template_id"), table.c.template == bindparam("stored"))
+        .values(
+            template=bindparam("sealed"),
+            template_hash=bindparam("digest"),
+            updated_at=table.c.updated_at
+        ),
+        [
+            {
+                "template_id": template_id,
+                "stored": bytes(stored),
+                "sealed": encryption_service.encrypt_template(template),
+                "digest": encryption_service.fingerprint_digest(template)
+            }
+            for template_id, stored, template in templates
+        ]
+    )
+    return len(templates)
+
+
+class TemplateGallery:
+    """
+    Process-level gallery of decrypted fingerprint templates.
+
+    Templates are decrypted once (at startup or on enrollment) and kept keyed
+    by (employee_no, finger_index), together with a digest -> keys map so an
+    exact match costs one dict lookup instead of a database query and a
+    decrypt (several fingers may hold identical templates). Probes that do
+    not match byte for byte are scored against every cached finger by the
+    configured matcher engine (see utils.matcher; the default "exact" engine
+    scores nothing). Lookups return the employee_no of whichever finger
+    matched.
+
+    With max_size > 0 the gallery is memory-bounded: it behaves as an LRU and
+    misses fall back to the database lookup in EmployeeService. That lookup
+    goes through the blind index, so a finger evicted from the gallery is
+    only found again by a byte-identical capture; similarity matching only
+    covers the cached fingers. Size the gallery to hold every enrolled finger
+    where devices send fresh (non-identical) captures.
+    """
+
+    def __init__(self, max_size: int = 0):
+        """
+        Args:
+            max_size: Maximum templates (fingers) kept in memory (0 = unbounded)
+        """
+        self.max_size = max_size
+        self._templates: OrderedDict[TemplateKey, str] = OrderedDict()  # key -> template
+        self._digests: dict[str, set[TemplateKey]] = {}  # digest -> keys
+        self._fingers: dict[str, set[int]] = {}  # employee_no -> cached finger indexes
+        self._lock = threading.Lock()
+        self.matcher = create_matcher()
+        self.hits = 0
+        self.similarity_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale = 0  # Loaded templates still sealed with an old format or key
+
+    async def load(self, db: AsyncSession) -> int:
+        """
+        Load and decrypt all enrolled templates.
+        In bounded mode only the most recently updated templates are loaded.
+        Templates sealed with an old format or key are only counted (in
+        self.stale); services.key_rotation re-encrypts them in the background.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of templates loaded
+        """
+        query = select(
+            FingerprintTemplate.employee_no,
+            FingerprintTemplate.finger_index,
+            FingerprintTemplate.template
+        ).order_by(FingerprintTemplate.updated_at.desc())
+
+        if self.max_size:
+            query = query.limit(self.max_size)
+
+        with self._lock:
+            self._templates.clear()
+            self._digests.clear()
+            self._fingers.clear()
+            self.matcher.clear()
+
+        # Oldest first so the most recent end up at the LRU head
+        self.stale = 0
+        for employee_no, finger_index, encrypted in reversed((await db.execute(query)).all()):
+            try:
+                template = encryption_service.decrypt_template(encrypted)
+            except Exception:
+                continue
+            self.put(employee_no, template, finger_index)
+            self.stale += encryption_service.template_needs_reseal(encrypted)
+
+        return len(self._templates)
+
+    def put(self, employee_no: str, template: str, finger_index: int = 0) -> None:
+        """Add or replace the template of one of an employee's fingers."""
+        normalized = encryption_service.normalize_template(template)
+        digest = encryption_service.fingerprint_digest(normalized)
+        key = (employee_no, finger_index)
+
+        with self._lock:
+            self._discard(key)
+            self._templates[key] = normalized
+            self._digests.setdefault(digest, set()).add(key)
+            self._fingers.setdefault(employee_no, set()).add(finger_index)
+            self.matcher.add(key, normalized)
+
+            while self.max_size and len(self._templates) > self.max_size:
+                oldest = next(iter(self._templates))
+                self._discard(oldest)
+                self.evictions += 1
+
+    def remove(self, employee_no: str, finger_index: Optional[int] = None) -> None:
+        """Remove one cached finger of an employee, or all of them."""
+        with self._lock:
+            fingers = [finger_index] if finger_index is not None else list(self._fingers.get(employee_no, ()))
+            for finger in fingers:
+                self._discard((employee_no, finger))
+
+    def rename(self, old_employee_no: str, new_employee_no: str) -> None:
+        """Re-key cached fingers after an employee_no change."""
+        with self._lock:
+            templates = {
+                finger: self._templates[(old_employee_no, finger)]
+                for finger in self._fingers.get(old_employee_no, ())
+            }
+        self.remove(old_employee_no)
+        for finger, template in templates.items():
+            self.put(new_employee_no, template, finger)
+
+    async def lookup(
+        self,
+        template: str,
+        candidates: Optional[Collection[str]] = None,
+        min_score: Optional[float] = None
+    ) -> Optional[str]:
+        """
+        Find the employee_no whose cached template matches the probe.
+        Tries an exact digest match first, then similarity scoring.
+
+        Args:
+            template: Raw fingerprint template from device
+            candidates: Optional employee_nos to restrict the search to.
+                Restricted lookups are not counted in the gallery stats.
+            min_score: Optional similarity a scored match must reach, above
+                the matcher threshold (exact matches always count)
+
+        Returns:
+            Matching employee_no, or None on a miss
+        """
+        normalized = encryption_service.normalize_template(template)
+        digest = encryption_service.fingerprint_digest(normalized)
+
+        with self._lock:
+            key = self._exact_match(digest, normalized, candidates)
+            if key is not None:
+                self._templates.move_to_end(key)
+                if candidates is None:
+                    self.hits += 1
+                return key[0]
+
+            labels = None
+            if candidates is not None:
+                labels = [
+                    (employee_no, finger)
+                    for employee_no in candidates
+                    for finger in self._fingers.get(employee_no, ())
+                ]
+
+        # Score outside the gallery lock; the matcher has its own
+        match = await self.matcher.identify_async(normalized, labels=labels)
+
+        with self._lock:
+            if (
+                match is not None
+                and match[0] in self._templates
+                and (min_score is None or match[1] >= min_score)
+            ):
+                key = match[0]
+                self._templates.move_to_end(key)
+                if candidates is None:
+                    self.hits += 1
+                    self.similarity_hits += 1
+                return key[0]
+
+            if candidates is None:
+                self.misses += 1
+            return None
+
+    async def lookup_many(self, templates: list[str]) -> list[Optional[str]]:
+        """
+        Identify a batch of probes.
+        Exact digest matches are resolved first; the rest are scored by the
+        matcher in one batched call.
+
+        Args:
+            templates: Raw fingerprint templates from devices
+
+        Returns:
+            Matching employee_no or None for each template, in input order
+        """
+        normalized = [encryption_service.normalize_template(t) for t in templates]
+        keys: list[Optional[TemplateKey]] = [None] * len(templates)
+        pending: list[int] = []
+
+        with self._lock:
+            for i, template in enumerate(normalized):
+                key = self._exact_match(encryption_service.fingerprint_digest(template), template)
+                if key is not None:
+                    keys[i] = key
+                else:
+                    pending.append(i)
+
+        matches = await self.matcher.identify_many_async([normalized[i] for i in pending]) if pending else []
+
+        with self._lock:
+            for i, match in zip(pending, matches):
+                if match is not None and match[0] in self._templates:
+                    keys[i] = match[0]
+                    self.similarity_hits += 1
+            for key in keys:
+                if key is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                    self._templates.move_to_end(key)
+
+        return [key[0] if key is not None else None for key in keys]
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current size."""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._templates),
+            "employees": len(self._fingers),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "similarity_hits": self.similarity_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions
+        }
+
+    def _exact_match(
+        self,
+        digest: str,
+        template: str,
+        candidates: Optional[Collection[str]] = None
+    ) -> Optional[TemplateKey]:
+        """Return a cached key holding exactly this template, or None. Caller must hold the lock."""
+        keys = [
+            key for key in self._digests.get(digest, ())
+            if self._templates.get(key) == template and (candidates is None or key[0] in candidates)
+        ]
+        return min(keys) if keys else None
+
+    def _discard(self, key: TemplateKey) -> None:
+        """Drop an entry and its digest. Caller must hold the lock."""
+        template = self._templates.pop(key, None)
+        if template is not None:
+            digest = encryption_service.fingerprint_digest(template)
+            keys = self._digests.get(digest)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._digests[digest]
+            self.matcher.remove(key)
+            fingers = self._fingers.get(key[0])
+            if fingers is not None:
+                fingers.discard(key[1])
+                if not fingers:
+                    del self._fingers[key[0]]
+
+
+# Singleton instance
+template_gallery = TemplateGallery(max_size=settings.TEMPLATE_GALLERY_MAX_SIZE)
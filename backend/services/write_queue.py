@@ -0,0 +1,184 @@
+"""
+Write queue service - Write-behind group commit for device attendance scans.
+"""
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+from database import AsyncSessionLocal
+from models.attendance import Attendance
+from models.employee import Employee
+from services.attendance_service import attendance_service
+from utils.config import settings
+
+
+class AttendanceWriteQueue:
+    """
+    In-process asyncio queue that batches device scans into one transaction.
+
+    A batch is committed when max_batch scans are pending or max_delay_ms
+    after its first scan arrived, whichever comes first. Each caller awaits
+    its own result, which resolves only after its batch has committed.
+    """
+
+    def __init__(self, max_batch: int = 64, max_delay_ms: int = 5):
+        """
+        Args:
+            max_batch: Scans applied per transaction at most
+            max_delay_ms: Longest a scan waits for its batch to fill up
+        """
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max(0, max_delay_ms) / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._batches = 0
+        self._writes = 0
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def start(self) -> None:
+        """Start the background writer on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def drain(self) -> None:
+        """Commit everything already queued, then stop the writer."""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._worker
+        self._worker = None
+
+    async def submit(
+        self,
+        employee: Employee,
+        device_id: str,
+        scanned_at: datetime
+    ) -> tuple[Attendance, str]:
+        """
+        Queue a scan and wait for its batch to commit.
+
+        Args:
+            employee: Identified employee
+            device_id: ID of the attendance device
+            scanned_at: Capture time of the scan
+
+        Returns:
+            Tuple of (attendance record, action) as from record_scan
+        """
+        if not self.running:
+            raise RuntimeError("Attendance write queue is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((employee, device_id, scanned_at, future))
+        return await future
+
+    def stats(self) -> dict:
+        """Return batching metrics."""
+        return {
+            "running": self.running,
+            "pending": self._queue.qsize() if self._queue else 0,
+            "batches": self._batches,
+            "writes": self._writes,
+            "avg_batch_size": round(self._writes / self._batches, 2) if self._batches else 0.0
+        }
+
+    async def _run(self) -> None:
+        """
+        Collect scans into batches and commit them until drained.
+
+        A batch that fails outside record_scan (e.g. opening the session or
+        rolling back) fails its own callers and the writer moves on. Scans
+        still queued when the writer stops are failed, never left pending.
+        """
+        loop = asyncio.get_running_loop()
+        stopped = RuntimeError("Attendance write queue stopped")
+        stopping = False
+        try:
+            while not stopping:
+                item = await self._queue.get()
+                if item is None:
+                    break
+
+                batch = [item]
+                deadline = loop.time() + self.max_delay
+                while len(batch) < self.max_batch:
+                    if self._queue.empty():
+                        remaining = deadline - loop.time()
+                        if remaining <= 0:
+                            break
+                        try:
+                            item = await asyncio.wait_for(self._queue.get(), remaining)
+                        except asyncio.TimeoutError:
+                            break
+                    else:
+                        item = self._queue.get_nowait()
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+
+                try:
+                    await self._commit(batch)
+                except Exception as exc:
+                    self._resolve(batch, [exc] * len(batch))
+                except BaseException:
+                    self._resolve(batch, [stopped] * len(batch))
+                    raise
+        finally:
+            while not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is not None:
+                    self._resolve([item], [stopped])
+
+    async def _commit(self, batch: list) -> None:
+        """
+        Apply a batch in one transaction and resolve its callers.
+
+        If the batch fails as a whole, scans are retried one per
+        transaction so a single bad scan only fails its own caller.
+        """
+        async with AsyncSessionLocal() as db:
+            try:
+                results = [
+                    await attendance_service.record_scan(db, employee, device_id, scanned_at)
+                    for employee, device_id, scanned_at, _ in batch
+                ]
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                results = []
+                for employee, device_id, scanned_at, _ in batch:
+                    try:
+                        results.append(
+                            await attendance_service.record_scan(db, employee, device_id, scanned_at)
+                        )
+                        await db.commit()
+                    except Exception as exc:
+                        await db.rollback()
+                        results.append(exc)
+
+        self._batches += 1
+        self._writes += len(batch)
+        self._resolve(batch, results)
+
+    @staticmethod
+    def _resolve(batch: list, results: list) -> None:
+        """Hand each caller its result or exception, skipping callers that went away."""
+        for (_, _, _, future), result in zip(batch, results):
+            if future.done():
+                continue  # Caller went away (request cancelled)
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+# Singleton instance
+attendance_write_queue = AttendanceWriteQueue(
+    max_batch=settings.WRITE_QUEUE_MAX_BATCH,
+    max_delay_ms=settings.WRITE_QUEUE_MAX_DELAY_MS
+)
@@ -0,0 +1,65 @@
+"""
+Shared test setup.
+Points the app at a throwaway SQLite database (unless DATABASE_URL is set)
+before any app module is imported, and provides a clean-database fixture.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test_attendance.db")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import delete, select
+
+from auth.jwt_handler import create_access_token
+from database import AsyncSessionLocal, Base, SessionLocal, engine, init_db
+from models import DailySummary
+from rebuild_daily_summary import rebuild_daily_summary
+from services.template_gallery import template_gallery
+
+
+async def _reload_gallery() -> None:
+    async with AsyncSessionLocal() as db:
+        await template_gallery.load(db)
+
+
+@pytest.fixture
+def clean_db():
+    """Create the schema once, empty every table and the template gallery before the test."""
+    init_db()
+    with SessionLocal() as db:
+        for table in reversed(Base.metadata.sorted_tables):
+            db.execute(delete(table))
+        db.commit()
+    asyncio.run(_reload_gallery())
+    yield
+
+
+def _summary_counts(conn) -> dict:
+    return {
+        (row.attendance_date, row.department): (row.present, row.on_time, row.overtime_count)
+        for row in conn.execute(select(DailySummary))
+        if row.present or row.on_time or row.overtime_count
+    }
+
+
+@pytest.fixture
+def assert_summary_matches_rebuild():
+    """Check that the incrementally kept daily summary equals a full rebuild from attendance."""
+    def check() -> None:
+        with engine.connect() as conn:
+            kept = _summary_counts(conn)
+            rebuild_daily_summary(conn)
+            rebuilt = _summary_counts(conn)
+            conn.rollback()
+        assert kept == rebuilt
+    return check
+
+
+@pytest.fixture
+def admin_headers() -> dict:
+    """Bearer token headers for an admin-only endpoint."""
+    return {"Authorization": f"Bearer {create_access_token({'sub': 'admin', 'role': 'primary_admin'})}"}
@@ -0,0 +1,96 @@
+"""
+Tests for GET /admin/attendance/export (streamed CSV / NDJSON).
+"""
+import asyncio
+import csv
+import io
+import json
+from datetime import date, time
+
+import httpx
+from sqlalchemy import insert
+
+from database import engine
+from main import app
+from models import Attendance, Employee
+from routers.attendance import EXPORT_COLUMNS
+from services.attendance_service import AttendanceService
+from utils.config import settings
+
+
+def get(path: str, headers: dict, **params) -> httpx.Response:
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get(path, params=params, headers=headers)
+    return asyncio.run(run())
+
+
+def seed() -> None:
+    with engine.begin() as conn:
+        conn.execute(insert(Employee), [
+            {"employee_no": f"EMP{i:03d}", "name": f"Employee {i}", "department": "Ops" if i % 2 else "Sales"}
+            for i in range(5)
+        ])
+        conn.execute(insert(Attendance), [
+            {
+                "employee_no": f"EMP{i:03d}",
+                "attendance_date": date(2026, 3, day),
+                "time_in": time(8, 30 + i),
+                "time_out": time(17, 0) if day % 2 else None,
+                "total_work_minutes": 500 if day % 2 else 0,
+                "device_id": "D1"
+            }
+            for i in range(5)
+            for day in range(1, 5)
+        ])
+
+
+def test_export_streams_csv_and_ndjson_in_batches(clean_db, admin_headers, monkeypatch):
+    seed()
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 3)
+    batches = []
+    stream_attendance = AttendanceService.stream_attendance
+
+    async def counting_stream(*args, **kwargs):
+        async for batch in stream_attendance(*args, **kwargs):
+            batches.append(len(batch))
+            yield batch
+
+    monkeypatch.setattr(AttendanceService, "stream_attendance", staticmethod(counting_stream))
+
+    response = get("/admin/attendance/export", admin_headers, format="csv")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="attendance-all-all.csv"'
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == EXPORT_COLUMNS
+    assert len(rows) == 1 + 20
+    assert batches == [3] * 6 + [2]
+
+    batches.clear()
+    response = get("/admin/attendance/export", admin_headers, format="ndjson")
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert len(records) == 20 and len(batches) == 7
+    assert list(records[0]) == EXPORT_COLUMNS
+    assert records[0]["attendance_date"] == "2026-03-04" and records[0]["time_in"] == "08:30:00"
+
+
+def test_export_filters_match_the_list_endpoint(clean_db, admin_headers, monkeypatch):
+    seed()
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+
+    for filters in (
+        {"department": "Ops", "start_date": "2026-03-02", "end_date": "2026-03-03"},
+        {"employee_no": "EMP002", "start_date": "2026-03-03"},
+        {},
+    ):
+        listed = get("/admin/attendance", admin_headers, limit=1000, **filters).json()["records"]
+        exported = [
+            json.loads(line)
+            for line in get("/admin/attendance/export", admin_headers, format="ndjson", **filters).text.splitlines()
+        ]
+        assert [(row["employee_no"], row["attendance_date"]) for row in exported] == [
+            (row["employee_no"], row["attendance_date"]) for row in listed
+        ]
+        assert exported
@@ -0,0 +1,60 @@
+"""
+Tests for the per-day attendance upsert and the unique index it relies on.
+"""
+import asyncio
+from datetime import date, datetime, time
+
+from sqlalchemy import create_engine, inspect, insert, select, text
+
+from database import AsyncSessionLocal, Base, SessionLocal
+from migrate_database import ensure_attendance_unique_index
+from models import Attendance, Employee
+from services.attendance_service import attendance_service
+
+
+def scan(employee: Employee, at: datetime) -> str:
+    async def run():
+        async with AsyncSessionLocal() as db:
+            _, action = await attendance_service.record_scan(db, employee, "D1", at)
+            await db.commit()
+            return action
+    return asyncio.run(run())
+
+
+def test_record_scan_transitions(clean_db):
+    with SessionLocal() as db:
+        employee = Employee(employee_no="EMP001", name="Ali")
+        db.add(employee)
+        db.commit()
+
+    day = date(2026, 3, 2)
+    assert scan(employee, datetime.combine(day, time(9, 0))) == "time_in"
+    assert scan(employee, datetime.combine(day, time(17, 30))) == "time_out"
+    assert scan(employee, datetime.combine(day, time(18, 0))) == "already_marked"
+    assert scan(employee, datetime.combine(date(2026, 3, 3), time(9, 5))) == "time_in"
+
+    with SessionLocal() as db:
+        rows = db.scalars(select(Attendance).order_by(Attendance.attendance_date)).all()
+    assert [(row.time_in, row.time_out) for row in rows] == [(time(9, 0), time(17, 30)), (time(9, 5), None)]
+    assert rows[0].total_work_minutes == 510
+
+
+def test_missing_unique_index_is_added_after_merging_duplicates(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        # An attendance table from before the unique index, with a duplicate day
+        conn.execute(text("DROP INDEX uq_attendance_employee_date"))
+        conn.execute(insert(Employee), [{"employee_no": "EMP001", "name": "Ali"}])
+        conn.execute(insert(Attendance), [
+            {"employee_no": "EMP001", "attendance_date": date(2026, 3, 2), "time_in": time(9, 0), "time_out": None},
+            {"employee_no": "EMP001", "attendance_date": date(2026, 3, 2), "time_in": time(8, 30), "time_out": time(17, 0)},
+        ])
+
+    with engine.connect() as conn:
+        ensure_attendance_unique_index(conn)
+        indexes = {index["name"] for index in inspect(conn).get_indexes("attendance")}
+        rows = conn.execute(select(Attendance.time_in, Attendance.time_out)).all()
+
+    assert "uq_attendance_employee_date" in indexes
+    assert rows == [(time(8, 30), time(17, 0))]
@@ -0,0 +1,65 @@
+"""
+Tests for keeping the daily summary in step with attendance writes.
+"""
+import asyncio
+from datetime import date, datetime, time
+
+from sqlalchemy import select
+
+from database import AsyncSessionLocal, SessionLocal
+from models import Attendance, DailySummary, Employee
+from schemas.employee import EmployeeUpdate
+from services.attendance_service import attendance_service
+from services.employee_service import employee_service
+
+
+def run(action):
+    async def body():
+        async with AsyncSessionLocal() as db:
+            return await action(db)
+    return asyncio.run(body())
+
+
+def scan(employee_no: str, at: datetime) -> None:
+    async def action(db):
+        employee = await db.scalar(select(Employee).where(Employee.employee_no == employee_no))
+        await attendance_service.record_scan(db, employee, "D1", at)
+        await db.commit()
+    run(action)
+
+
+def test_summary_follows_scans_reassignment_and_deletion(clean_db, assert_summary_matches_rebuild):
+    with SessionLocal() as db:
+        db.add_all([
+            Employee(employee_no="EMP001", name="Ali", department="Ops", shift="G"),
+            Employee(employee_no="EMP002", name="Sara", department="Ops", shift="B"),
+        ])
+        db.commit()
+        ali_id = db.scalar(select(Employee.id).where(Employee.employee_no == "EMP001"))
+        sara_id = db.scalar(select(Employee.id).where(Employee.employee_no == "EMP002"))
+
+    for day in (date(2026, 3, 2), date(2026, 3, 3)):
+        scan("EMP001", datetime.combine(day, time(8, 55)))
+        scan("EMP001", datetime.combine(day, time(18, 30)))
+        scan("EMP002", datetime.combine(day, time(9, 30)))
+    assert_summary_matches_rebuild()
+
+    with SessionLocal() as db:
+        counts = db.execute(
+            select(DailySummary.present, DailySummary.on_time, DailySummary.overtime_count)
+            .where(DailySummary.attendance_date == date(2026, 3, 2), DailySummary.department == "Ops")
+        ).one()
+    assert tuple(counts) == (2, 2, 1)
+
+    # Sara moves to Shift G (09:00 threshold): her 09:30 arrivals become late
+    run(lambda db: employee_service.update_employee(db, sara_id, EmployeeUpdate(shift="G", department="Sales")))
+    assert_summary_matches_rebuild()
+
+    assert run(lambda db: employee_service.delete_employee(db, ali_id))
+    assert_summary_matches_rebuild()
+    with SessionLocal() as db:
+        assert db.scalars(select(Attendance.employee_no).distinct()).all() == ["EMP002"]
+        assert db.scalar(
+            select(DailySummary.present)
+            .where(DailySummary.attendance_date == date(2026, 3, 2), DailySummary.department == "Ops")
+        ) in (None, 0)
@@ -0,0 +1,55 @@
+"""
+Tests for the per-device affinity short-circuit.
+"""
+import asyncio
+import base64
+import importlib
+
+import numpy as np
+
+from services.device_affinity import DeviceAffinityCache
+from services.employee_service import employee_service
+from services.template_gallery import template_gallery
+from utils.matcher import VectorizedMatcher
+
+
+def b64(raw: np.ndarray) -> str:
+    return base64.b64encode(raw.astype(np.uint8).tobytes()).decode()
+
+
+def test_weak_recent_match_does_not_hide_a_better_global_match(clean_db, monkeypatch):
+    rng = np.random.default_rng(3)
+    base = rng.integers(0, 256, 200)
+    probe = b64(base)
+    close = b64(np.clip(base + rng.integers(-4, 5, 200), 0, 255))
+    loose = b64(np.clip(base + rng.integers(-40, 41, 200), 0, 255))
+
+    # The loose template matches, but below the accept score
+    matcher = VectorizedMatcher(threshold=0.9)
+    matcher.add("EMP_LOOSE", loose)
+    assert 0.9 <= matcher.identify(probe)[1] < 0.97
+
+    affinity = DeviceAffinityCache(capacity=10, accept_score=0.97)
+    monkeypatch.setattr(importlib.import_module("services.employee_service"), "device_affinity", affinity)
+    monkeypatch.setattr(template_gallery, "matcher", VectorizedMatcher(threshold=0.9))
+    template_gallery.put("EMP_CLOSE", close)
+    template_gallery.put("EMP_LOOSE", loose)
+    affinity.record_match("GATE1", "EMP_LOOSE")
+
+    assert asyncio.run(employee_service.match_fingerprint(probe, "GATE1")) == "EMP_CLOSE"
+    assert affinity.stats()["devices"]["GATE1"]["misses"] == 1
+
+    # An exact template still ends the search in the recent set
+    assert asyncio.run(employee_service.match_fingerprint(loose, "GATE1")) == "EMP_LOOSE"
+    assert affinity.stats()["devices"]["GATE1"]["hits"] == 1
+
+
+def test_lookup_stats_are_bounded_by_tracked_devices():
+    affinity = DeviceAffinityCache(capacity=10, max_devices=2)
+    for device_id in ("GATE1", "GATE2", "GATE3"):
+        affinity.record_match(device_id, "EMP001")
+        affinity.record_lookup(device_id, hit=True)
+    for i in range(100):
+        affinity.record_lookup(f"UNKNOWN{i}", hit=False)
+
+    assert set(affinity.stats()["devices"]) == {"GATE2", "GATE3"}
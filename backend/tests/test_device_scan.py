@@ -0,0 +1,145 @@
+"""
+Tests for POST /device/attendance/mark.
+"""
+import asyncio
+import base64
+
+import httpx
+from sqlalchemy import func, select, update
+
+from database import AsyncSessionLocal, SessionLocal
+from main import app
+from models import Attendance, Employee, FingerprintTemplate
+from schemas.employee import FingerprintEnroll
+from services.attendance_service import AttendanceService
+from services.employee_service import employee_service
+from services.key_rotation import template_reencryption_job
+from services.template_gallery import template_gallery
+from services.write_queue import attendance_write_queue
+from utils.config import settings
+from utils.encryption import encryption_service
+
+HEADERS = {"X-API-Key": settings.DEVICE_API_KEY}
+
+
+def enroll(employee_no: str, template: str) -> None:
+    async def run():
+        async with AsyncSessionLocal() as db:
+            db.add(Employee(employee_no=employee_no, name=f"Employee {employee_no}"))
+            await db.commit()
+            await employee_service.enroll_fingerprint(
+                db, FingerprintEnroll(employee_no=employee_no, fingerprint_template=template)
+            )
+    asyncio.run(run())
+
+
+async def post_mark(template: str, device_id: str, idempotency_key: str = None) -> httpx.Response:
+    headers = {**HEADERS, **({"Idempotency-Key": idempotency_key} if idempotency_key else {})}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await client.post(
+            "/device/attendance/mark",
+            json={"fingerprint_template": template, "device_id": device_id},
+            headers=headers
+        )
+
+
+def test_unrecognised_scan_is_matched_in_memory_once(clean_db, monkeypatch):
+    calls = []
+    lookup = template_gallery.lookup
+    monkeypatch.setattr(template_gallery, "lookup", lambda *args, **kwargs: calls.append(args) or lookup(*args, **kwargs))
+
+    response = asyncio.run(post_mark(base64.b64encode(bytes(range(64))).decode(), "DEV-MISS"))
+
+    assert response.status_code == 404
+    assert len(calls) == 1
+
+
+def test_concurrent_retries_with_one_idempotency_key_record_one_scan(clean_db, monkeypatch):
+    template = base64.b64encode(bytes(range(100, 164))).decode()
+    enroll("EMP-IDEM", template)
+
+    record_scan = AttendanceService.record_scan
+
+    async def slow_record_scan(*args, **kwargs):
+        await asyncio.sleep(0.2)  # Keep the original in flight while the retry arrives
+        return await record_scan(*args, **kwargs)
+
+    monkeypatch.setattr(AttendanceService, "record_scan", staticmethod(slow_record_scan))
+
+    async def run():
+        return await asyncio.gather(*(post_mark(template, "DEV-IDEM", "key-1") for _ in range(3)))
+
+    responses = asyncio.run(run())
+
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    assert {response.json()["action"] for response in responses} == {"time_in"}
+    with SessionLocal() as db:
+        assert db.scalar(select(func.count(Attendance.id)).where(Attendance.employee_no == "EMP-IDEM")) == 1
+
+
+def test_retry_of_unrecognised_scan_gets_the_same_error(clean_db):
+    template = base64.b64encode(bytes(range(1, 65))).decode()
+
+    async def run():
+        return await asyncio.gather(*(post_mark(template, "DEV-404", "key-404") for _ in range(2)))
+
+    assert [response.status_code for response in asyncio.run(run())] == [404, 404]
+
+
+def test_stale_template_outside_the_gallery_is_resealed_without_blocking_the_queue(clean_db):
+    # A legacy Fernet template the gallery has not loaded
+    template = base64.b64encode(bytes(range(7, 71))).decode()
+    with SessionLocal() as db:
+        db.add(Employee(employee_no="EMP-OLD", name="Employee EMP-OLD"))
+        db.add(FingerprintTemplate(
+            employee_no="EMP-OLD",
+            finger_index=0,
+            template=encryption_service._fernet.encrypt(template.encode()),
+            template_hash=encryption_service.fingerprint_digest(template)
+        ))
+        db.commit()
+
+    async def run():
+        attendance_write_queue.start()
+        try:
+            response = await asyncio.wait_for(post_mark(template, "DEV-OLD"), 5)
+            await template_reencryption_job.wait()
+            return response
+        finally:
+            await attendance_write_queue.drain()
+
+    response = asyncio.run(run())
+
+    assert response.status_code == 200
+    assert response.json()["action"] == "time_in"
+    with SessionLocal() as db:
+        stored = db.scalar(select(FingerprintTemplate.template).where(FingerprintTemplate.employee_no == "EMP-OLD"))
+    assert not encryption_service.template_needs_reseal(stored)
+    assert encryption_service.decrypt_template(stored) == template
+
+
+def test_queued_scan_ends_the_request_transaction_first(clean_db, monkeypatch):
+    template = base64.b64encode(bytes(range(30, 94))).decode()
+    enroll("EMP-TXN", template)
+
+    identify_employee = AttendanceService.identify_employee
+
+    async def identify_and_write(db, *args, **kwargs):
+        # Leaves a write pending on the request session
+        employee = await identify_employee(db, *args, **kwargs)
+        await db.execute(update(Employee).where(Employee.employee_no == "EMP-TXN").values(designation="Guard"))
+        return employee
+
+    monkeypatch.setattr(AttendanceService, "identify_employee", staticmethod(identify_and_write))
+
+    async def run():
+        attendance_write_queue.start()
+        try:
+            return await asyncio.wait_for(post_mark(template, "DEV-TXN"), 5)
+        finally:
+            await attendance_write_queue.drain()
+
+    response = asyncio.run(run())
+
+    assert response.status_code == 200
+    assert response.json()["employee_name"] == "Employee EMP-TXN"
@@ -0,0 +1,72 @@
+"""
+Tests for the indexed employee search.
+"""
+import asyncio
+
+from sqlalchemy import delete, insert, text, update
+
+from database import AsyncSessionLocal, engine
+from models import Employee
+from services.employee_search import ensure_employee_search_index, fts_match_expression
+from services.employee_service import employee_service
+
+
+def test_fts_match_expression_quotes_the_whole_term():
+    assert fts_match_expression(" ali kh ") == '"ali kh"'
+    assert fts_match_expression("001") == '"001"'
+    # FTS5 syntax in user input stays literal text
+    assert fts_match_expression('name:ali OR "x" NEAR(') == '"name:ali OR ""x"" NEAR("'
+    # Too short for the trigram index: the caller falls back to ILIKE
+    assert fts_match_expression(" 01 ") is None
+
+
+def search(term: str) -> list[str]:
+    async def run():
+        async with AsyncSessionLocal() as db:
+            employees, total, _ = await employee_service.get_all_employees(db, search=term)
+            assert total == len(employees)
+            return [employee.employee_no for employee in employees]
+    return asyncio.run(run())
+
+
+def test_search_matches_substrings_like_postgresql_and_follows_edits(clean_db):
+    with engine.begin() as conn:
+        conn.execute(insert(Employee), [
+            {"employee_no": "EMP001", "name": "Ali Khan", "department": "Ops", "designation": "Guard"},
+            {"employee_no": "EMP002", "name": "Sara Ali", "department": "Sales", "designation": "Lead"},
+            {"employee_no": "EMP003", "name": "Hamza", "department": "Alignment", "designation": "Fitter"},
+            {"employee_no": "EMP010", "name": "Hina", "department": "Ops", "designation": "Clerk_1"},
+        ])
+
+    assert search("ali kh") == ["EMP001"]
+    # Mid-string employee numbers, as the earlier ILIKE '%term%' search found them
+    assert search("001") == ["EMP001"]
+    assert search("p01") == ["EMP010"]
+    assert sorted(search("01")) == ["EMP001", "EMP010"]
+    # Name matches outrank a department match
+    assert sorted(search("ali")) == ["EMP001", "EMP002", "EMP003"]
+    assert search("ali")[-1] == "EMP003"
+    assert search('ali" OR "hina') == []
+    # LIKE wildcards are literal in the short-term fallback
+    assert search("_1") == ["EMP010"]
+
+    # The index follows updates and deletes
+    with engine.begin() as conn:
+        conn.execute(update(Employee).where(Employee.employee_no == "EMP010").values(name="Alina"))
+        conn.execute(delete(Employee).where(Employee.employee_no == "EMP002"))
+    assert sorted(search("ali")) == ["EMP001", "EMP003", "EMP010"]
+
+
+def test_word_prefix_index_is_rebuilt_as_trigram(clean_db):
+    with engine.begin() as conn:
+        conn.execute(insert(Employee), [{"employee_no": "EMP001", "name": "Ali Khan"}])
+        # The index as first shipped: unicode61 word prefixes
+        conn.execute(text("DROP TABLE employees_fts"))
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE employees_fts USING fts5(name, employee_no, department, designation, "
+            "content='employees', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        ))
+        conn.execute(text("INSERT INTO employees_fts(employees_fts) VALUES ('rebuild')"))
+        ensure_employee_search_index(conn)
+
+    assert search("001") == ["EMP001"]
@@ -0,0 +1,73 @@
+"""
+Tests for GET /manual-attendance/employees-status and its snapshot.
+"""
+import asyncio
+from datetime import datetime
+
+import httpx
+from sqlalchemy import select, update
+
+from database import AsyncSessionLocal, SessionLocal
+from main import app
+from models import Employee
+from services.attendance_service import attendance_service
+from services.status_snapshot import employee_status_snapshot
+
+
+def statuses(headers: dict, **params) -> dict:
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get("/manual-attendance/employees-status", params=params, headers=headers)
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert response.headers["x-total-count"] == str(len(response.json()))
+    return {row["employee_no"]: row for row in response.json()}
+
+
+def test_snapshot_is_invalidated_by_committed_writes_within_the_ttl(clean_db, admin_headers, monkeypatch):
+    monkeypatch.setattr(employee_status_snapshot, "ttl_seconds", 600)
+    employee_status_snapshot.invalidate()
+    with SessionLocal() as db:
+        db.add_all([Employee(employee_no="EMP001", name="Ali", department="Ops"), Employee(employee_no="EMP002", name="Sara")])
+        db.commit()
+
+    assert statuses(admin_headers)["EMP001"]["status"] == "not_marked"
+    hits = employee_status_snapshot.hits
+    assert statuses(admin_headers)["EMP001"]["status"] == "not_marked"
+    assert employee_status_snapshot.hits == hits + 1
+
+    # A device scan (INSERT ... ON CONFLICT statement)
+    async def scan():
+        async with AsyncSessionLocal() as db:
+            employee = await db.scalar(select(Employee).where(Employee.employee_no == "EMP001"))
+            await attendance_service.record_scan(db, employee, "D1", datetime.now())
+            await db.commit()
+    asyncio.run(scan())
+    assert statuses(admin_headers)["EMP001"]["status"] == "time_in_only"
+
+    # An employee edit through the unit of work
+    with SessionLocal() as db:
+        db.scalar(select(Employee).where(Employee.employee_no == "EMP002")).name = "Sara Khan"
+        db.commit()
+    assert statuses(admin_headers)["EMP002"]["name"] == "Sara Khan"
+
+    # A bulk UPDATE statement
+    with SessionLocal() as db:
+        db.execute(update(Employee).where(Employee.employee_no == "EMP002").values(department="Ops"))
+        db.commit()
+    assert set(statuses(admin_headers, department="Ops")) == {"EMP001", "EMP002"}
+
+    # A rolled-back write keeps the snapshot
+    with SessionLocal() as db:
+        db.execute(update(Employee).values(department="Sales"))
+        db.rollback()
+    hits = employee_status_snapshot.hits
+    assert set(statuses(admin_headers, department="Ops")) == {"EMP001", "EMP002"}
+    assert employee_status_snapshot.hits == hits + 1
+
+
+def test_openapi_documents_the_status_rows():
+    response = app.openapi()["paths"]["/manual-attendance/employees-status"]["get"]["responses"]["200"]
+    schema = response["content"]["application/json"]["schema"]
+    assert schema["type"] == "array"
+    assert schema["items"]["$ref"].endswith("/EmployeeAttendanceStatus")
@@ -0,0 +1,83 @@
+"""
+Tests for the sealed fingerprint template format.
+"""
+import base64
+
+import pytest
+from cryptography.exceptions import InvalidTag
+
+from utils.encryption import (
+    TEMPLATE_FORMAT_BASE64,
+    TEMPLATE_FORMAT_TEXT,
+    TEMPLATE_NONCE_SIZE,
+    EncryptionService,
+)
+
+TEMPLATE = base64.b64encode(bytes(range(200))).decode()
+
+
+@pytest.fixture
+def service():
+    return EncryptionService(key="current-key", key_id=2, previous_keys={1: "old-key"})
+
+
+def with_header(blob: bytes, header: int) -> bytes:
+    return bytes([header]) + blob[1:]
+
+
+def test_templates_round_trip_in_both_formats(service):
+    sealed = service.encrypt_template(TEMPLATE)
+    assert sealed[0] == 2 << 4 | TEMPLATE_FORMAT_BASE64
+    assert len(sealed) == 1 + TEMPLATE_NONCE_SIZE + 200 + 16
+    assert service.decrypt_template(sealed) == TEMPLATE
+
+    text = service.encrypt_template(" FP_TEMPLATE \n_001 ")
+    assert text[0] == 2 << 4 | TEMPLATE_FORMAT_TEXT
+    assert service.decrypt_template(text) == "FP_TEMPLATE_001"
+
+    # Non-canonical base64 ("QUJ=" decodes to what "QUI=" encodes) is kept as text
+    assert service.encrypt_template("QUJ=")[0] & 0x0F == TEMPLATE_FORMAT_TEXT
+    assert service.decrypt_template(service.encrypt_template("QUJ=")) == "QUJ="
+
+
+def test_tampered_templates_are_rejected(service):
+    sealed = service.encrypt_template(TEMPLATE)
+
+    # The header is authenticated: swapping the format or key id fails the tag
+    with pytest.raises(InvalidTag):
+        service.decrypt_template(with_header(sealed, 2 << 4 | TEMPLATE_FORMAT_TEXT))
+    with pytest.raises(InvalidTag):
+        service.decrypt_template(with_header(sealed, 1 << 4 | TEMPLATE_FORMAT_BASE64))
+
+    flipped = bytearray(sealed)
+    flipped[-20] ^= 0x01
+    with pytest.raises(InvalidTag):
+        service.decrypt_template(bytes(flipped))
+    with pytest.raises(InvalidTag):
+        service.decrypt_template(sealed[:-1])
+
+    assert not service.verify_fingerprint(TEMPLATE, bytes(flipped))
+    assert service.verify_fingerprint(TEMPLATE, sealed)
+
+
+@pytest.mark.parametrize("header, message", [
+    (2 << 4 | 0x0, "Unsupported template header"),
+    (2 << 4 | 0xF, "Unsupported template header"),
+    (7 << 4 | TEMPLATE_FORMAT_BASE64, "key id 7"),
+])
+def test_unknown_headers_are_rejected(service, header, message):
+    sealed = service.encrypt_template(TEMPLATE)
+    with pytest.raises(ValueError, match=message):
+        service.decrypt_template(with_header(sealed, header))
+
+
+def test_empty_blob_is_rejected(service):
+    with pytest.raises(ValueError):
+        service.decrypt_template(b"")
+
+
+def test_fernet_templates_are_still_read_and_flagged_for_reseal(service):
+    token = service._fernet.encrypt(TEMPLATE.encode())
+    assert service.decrypt_template(token) == TEMPLATE
+    assert service.template_needs_reseal(token)
+    assert not service.template_needs_reseal(service.encrypt_template(TEMPLATE))
@@ -0,0 +1,87 @@
+"""
+Tests for the encryption key ring and the template re-encryption job.
+"""
+import asyncio
+import base64
+import importlib
+
+import pytest
+from sqlalchemy import insert, select
+
+from database import engine
+from models import Employee, FingerprintTemplate
+from services.key_rotation import TemplateReencryptionJob
+from utils.encryption import EncryptionService, parse_key_ring
+
+OLD = EncryptionService(key="old-key", key_id=1, previous_keys={})
+NEW = EncryptionService(key="new-key", key_id=2, previous_keys={1: "old-key"})
+LOST = EncryptionService(key="lost-key", key_id=3, previous_keys={})
+
+
+def template(i: int) -> str:
+    return base64.b64encode(bytes([i]) * 64).decode()
+
+
+def test_parse_key_ring():
+    assert parse_key_ring(" 1:alpha , 3:beta:with:colons,") == {1: "alpha", 3: "beta:with:colons"}
+    assert parse_key_ring("") == {}
+    for bad in ("alpha", "x:alpha", "1:", "0:alpha", "16:alpha"):
+        with pytest.raises(ValueError):
+            parse_key_ring(bad)
+    with pytest.raises(ValueError):
+        EncryptionService(key="new-key", key_id=1, previous_keys={1: "old-key"})
+
+
+def test_previous_keys_stay_readable_and_are_flagged_for_reseal():
+    sealed = OLD.encrypt_template(template(1))
+    assert NEW.decrypt_template(sealed) == template(1)
+    assert NEW.template_needs_reseal(sealed)
+    assert not NEW.template_needs_reseal(NEW.encrypt_template(template(1)))
+    assert NEW.key_ids == [2, 1]
+    # Lookups try the blind index digest of every key in the ring, current first
+    assert NEW.fingerprint_digests(template(1)) == [
+        NEW.fingerprint_digest(template(1)),
+        OLD.fingerprint_digest(template(1))
+    ]
+    with pytest.raises(ValueError, match="key id 3"):
+        NEW.decrypt_template(LOST.encrypt_template(template(1)))
+
+
+def test_reencryption_job_reseals_stale_rows_in_resumable_batches(clean_db, monkeypatch):
+    for module in ("services.key_rotation", "services.template_gallery"):
+        monkeypatch.setattr(importlib.import_module(module), "encryption_service", NEW)
+
+    sealers = [OLD, OLD, NEW, OLD, LOST, OLD, OLD]
+    with engine.begin() as conn:
+        conn.execute(insert(Employee), [{"employee_no": f"EMP{i}", "name": f"Employee {i}"} for i in range(len(sealers))])
+        conn.execute(insert(FingerprintTemplate), [
+            {
+                "employee_no": f"EMP{i}",
+                "finger_index": 0,
+                "template": sealer.encrypt_template(template(i)),
+                "template_hash": sealer.fingerprint_digest(template(i))
+            }
+            for i, sealer in enumerate(sealers)
+        ])
+
+    job = TemplateReencryptionJob(batch_size=2, pause_ms=0)
+    # Stop after the first batch, then resume where it left off
+    first = asyncio.run(job.run(report=lambda progress: job.stop()))
+    assert (first["completed"], first["scanned"], first["resealed"]) == (False, 2, 2)
+
+    second = asyncio.run(job.run())
+    assert second["completed"] and second["error"] is None
+    assert (second["total"], second["scanned"], second["resealed"], second["failed"]) == (5, 5, 3, 1)
+
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(FingerprintTemplate.employee_no, FingerprintTemplate.template, FingerprintTemplate.template_hash)
+            .order_by(FingerprintTemplate.id)
+        ).all()
+    for i, (employee_no, stored, digest) in enumerate(rows):
+        if sealers[i] is LOST:
+            assert stored[0] >> 4 == 3
+            continue
+        assert stored[0] >> 4 == 2
+        assert NEW.decrypt_template(stored) == template(i)
+        assert digest == NEW.fingerprint_digest(template(i))
@@ -0,0 +1,95 @@
+"""
+Tests for the LSH candidate pre-filtering index.
+"""
+import base64
+
+import numpy as np
+
+from utils.lsh_index import LSHIndex
+from utils.matcher import VectorizedMatcher
+
+TEMPLATE_BYTES = 256
+
+
+def b64(raw: np.ndarray) -> str:
+    return base64.b64encode(raw.tobytes()).decode()
+
+
+def noisy(raw: np.ndarray, rng: np.random.Generator, fraction: float = 0.05) -> np.ndarray:
+    """A fresh capture of the same finger: a share of the bytes changed."""
+    probe = raw.copy()
+    positions = rng.choice(len(raw), int(len(raw) * fraction), replace=False)
+    probe[positions] = rng.integers(0, 256, size=len(positions), dtype=np.uint8)
+    return probe
+
+
+def build(raw_templates: np.ndarray, index=None) -> VectorizedMatcher:
+    matcher = VectorizedMatcher(
+        feature_length=TEMPLATE_BYTES,
+        initial_capacity=len(raw_templates),
+        index=index,
+        full_scan_on_empty=False
+    )
+    for i, raw in enumerate(raw_templates):
+        matcher.add(f"EMP{i:05d}", b64(raw))
+    return matcher
+
+
+def test_indexed_matcher_recall_against_brute_force():
+    rng = np.random.default_rng(42)
+    raw_templates = rng.integers(0, 256, size=(3000, TEMPLATE_BYTES), dtype=np.uint8)
+    targets = rng.integers(0, len(raw_templates), size=300)
+    probes = [b64(noisy(raw_templates[target], rng)) for target in targets]
+    probes += [b64(rng.integers(0, 256, TEMPLATE_BYTES, dtype=np.uint8)) for _ in range(50)]
+
+    brute = build(raw_templates)
+    indexed = build(raw_templates, LSHIndex(TEMPLATE_BYTES, num_tables=8, hash_bits=12, multiprobe=2))
+
+    expected = [match and match[0] for match in brute.identify_many(probes)]
+    results = [match and match[0] for match in indexed.identify_many(probes)]
+
+    assert expected[:300] == [f"EMP{target:05d}" for target in targets]
+    assert expected[300:] == [None] * 50
+    # The index only narrows the search: it never invents a match...
+    assert all(result is None or result == truth for result, truth in zip(results, expected))
+    # ...and keeps almost every one brute force finds
+    assert np.mean([result == truth for result, truth in zip(results[:300], expected[:300])]) >= 0.95
+
+
+def test_index_follows_incremental_put_and_remove():
+    rng = np.random.default_rng(3)
+    index = LSHIndex(TEMPLATE_BYTES, num_tables=4, hash_bits=8)
+    matcher = VectorizedMatcher(feature_length=TEMPLATE_BYTES, index=index, full_scan_on_empty=False)
+    raw = {f"EMP{i:02d}": rng.integers(0, 256, TEMPLATE_BYTES, dtype=np.uint8) for i in range(20)}
+    for label, template in raw.items():
+        matcher.add(label, b64(template))
+
+    assert len(index) == 20
+    for label, template in raw.items():
+        assert label in index.candidates(matcher.encode(b64(template)))
+        assert matcher.identify(b64(template))[0] == label
+
+    # Removing a label drops it from every table (and empty buckets with it)
+    matcher.remove("EMP05")
+    assert len(index) == 19
+    assert all("EMP05" not in bucket for table in index._buckets for bucket in table.values())
+    assert all(bucket for table in index._buckets for bucket in table.values())
+    assert matcher.identify(b64(raw["EMP05"])) is None
+    # The row moved into the freed slot is still indexed under its own label
+    assert all(matcher.identify(b64(raw[label]))[0] == label for label in raw if label != "EMP05")
+
+    # Re-enrolling a finger re-hashes it: the old template no longer matches
+    replacement = rng.integers(0, 256, TEMPLATE_BYTES, dtype=np.uint8)
+    matcher.add("EMP07", b64(replacement))
+    assert len(index) == 19
+    assert "EMP07" in index.candidates(matcher.encode(b64(replacement)))
+    assert matcher.identify(b64(replacement))[0] == "EMP07"
+    assert matcher.identify(b64(raw["EMP07"])) is None
+
+    matcher.rename("EMP08", "EMP80")
+    assert "EMP80" in index.candidates(matcher.encode(b64(raw["EMP08"])))
+    assert all("EMP08" not in bucket for table in index._buckets for bucket in table.values())
+    assert matcher.identify(b64(raw["EMP08"]))[0] == "EMP80"
+
+    matcher.clear()
+    assert len(index) == 0 and index.candidates(matcher.encode(b64(replacement))) == set()
@@ -0,0 +1,154 @@
+"""
+Tests for the fingerprint matcher engines.
+"""
+import asyncio
+import base64
+
+import numpy as np
+
+from utils.config import settings
+from utils.matcher import ExactMatcher, ParallelMatcher, VectorizedMatcher, create_matcher
+
+
+def b64(raw: bytes) -> str:
+    return base64.b64encode(raw).decode()
+
+
+def test_short_unrelated_templates_do_not_match():
+    matcher = VectorizedMatcher(threshold=0.9, min_template_bytes=0)
+    matcher.add("EMP001", "FP_TEMPLATE_EMPLOYEE_001")
+
+    assert matcher.identify("totally-different-xyz") is None
+    assert matcher.search("totally-different-xyz")[0][1] < 0.9
+
+
+def test_random_templates_do_not_match_unrelated_employees():
+    rng = np.random.default_rng(7)
+    matcher = VectorizedMatcher(threshold=0.9, min_template_bytes=32)
+    for i in range(2000):
+        matcher.add(f"EMP{i:04d}", b64(rng.bytes(60)))
+
+    probes = [b64(rng.bytes(60)) for _ in range(200)]
+    assert all(matcher.identify(probe) is None for probe in probes)
+    assert all(result is None for result in matcher.identify_many(probes))
+
+
+def test_enrolled_template_matches_itself_and_noisy_captures():
+    rng = np.random.default_rng(11)
+    templates = [rng.integers(0, 256, 200, dtype=np.uint8) for _ in range(100)]
+    matcher = VectorizedMatcher(threshold=0.9)
+    for i, raw in enumerate(templates):
+        matcher.add(f"EMP{i:03d}", b64(raw.tobytes()))
+
+    label, score = matcher.identify(b64(templates[42].tobytes()))
+    assert label == "EMP042" and score > 0.999
+
+    noisy = np.clip(templates[42].astype(int) + rng.integers(-10, 11, 200), 0, 255).astype(np.uint8)
+    assert matcher.identify(b64(noisy.tobytes()))[0] == "EMP042"
+    assert matcher.identify_many([b64(noisy.tobytes())])[0][0] == "EMP042"
+
+
+def test_templates_below_minimum_length_are_not_scored():
+    matcher = VectorizedMatcher(min_template_bytes=32)
+    matcher.add("EMP001", "FP_TEMPLATE_EMPLOYEE_001")
+    assert len(matcher) == 0
+
+    matcher.add("EMP002", b64(bytes(range(64))))
+    assert matcher.search("FP_TEMPLATE_EMPLOYEE_002") == []
+    assert matcher.identify_many(["short", b64(bytes(range(64)))])[0] is None
+
+
+def test_exact_mode_is_the_default_and_scores_nothing():
+    assert settings.MATCHER_MODE == "exact"
+    matcher = create_matcher()
+    assert isinstance(matcher, ExactMatcher)
+
+    template = b64(bytes(range(200)))
+    matcher.add("EMP001", template)
+    assert len(matcher) == 0
+    assert matcher.identify(template) is None
+    assert matcher.identify_many([template]) == [None]
+
+
+def test_padding_does_not_contribute_to_scores():
+    matcher = VectorizedMatcher(min_template_bytes=0)
+    vector = matcher.encode(b64(bytes(range(40))))
+    assert np.all(vector[40:] == 0)
+    assert abs(float(vector[:40].sum())) < 1e-4
+    assert abs(float(np.linalg.norm(vector)) - 1) < 1e-5
+
+
+def test_parallel_matcher_pool_starts_lazily_and_matches_in_process_results():
+    rng = np.random.default_rng(5)
+    templates = rng.integers(0, 256, size=(400, 128), dtype=np.uint8)
+    matcher = ParallelMatcher(feature_length=128, workers=2, min_parallel_rows=0)
+    try:
+        assert matcher._executor is None
+        for i, raw in enumerate(templates):
+            matcher.add(f"EMP{i:03d}", b64(raw.tobytes()))
+        matcher.start()
+
+        probes = [b64(templates[i].tobytes()) for i in (0, 17, 399)] + [b64(rng.bytes(128))]
+
+        async def run():
+            single = [await matcher.identify_async(probe) for probe in probes]
+            return single, await matcher.identify_many_async(probes)
+
+        single, batch = asyncio.run(run())
+        assert [m and m[0] for m in single] == ["EMP000", "EMP017", "EMP399", None]
+        assert [m and m[0] for m in batch] == ["EMP000", "EMP017", "EMP399", None]
+        assert [m and m[0] for m in matcher.identify_many(probes)] == ["EMP000", "EMP017", "EMP399", None]
+    finally:
+        matcher.close()
+
+
+def test_parallel_search_does_not_block_the_event_loop():
+    rng = np.random.default_rng(9)
+    matcher = ParallelMatcher(feature_length=256, workers=2, min_parallel_rows=0, initial_capacity=60_000)
+    try:
+        matcher.start()
+        raw = rng.integers(0, 256, size=(60_000, 256), dtype=np.uint8)
+        for i in range(len(raw)):
+            matcher.add(i, b64(raw[i].tobytes()))
+
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0)
+
+            task = asyncio.create_task(ticker())
+            await matcher.identify_async(b64(raw[123].tobytes()))  # Warm up the workers
+            ticks = 0
+            results = [await matcher.identify_async(b64(raw[i].tobytes())) for i in (1, 2, 3)]
+            task.cancel()
+            return ticks, results
+
+        ticks, results = asyncio.run(run())
+        assert [label for label, _ in results] == [1, 2, 3]
+        assert ticks > 0
+    finally:
+        matcher.close()
+
+
+def test_parallel_search_falls_back_when_rows_move_during_scoring():
+    templates = [b64(bytes((i * 7 + j) % 256 for j in range(64))) for i in range(50)]
+    matcher = ParallelMatcher(feature_length=64, workers=2, min_parallel_rows=0, min_template_bytes=32)
+    try:
+        for i, template in enumerate(templates):
+            matcher.add(f"EMP{i:02d}", template)
+        matcher.start()
+
+        async def run():
+            pending = asyncio.ensure_future(matcher.identify_async(templates[0]))
+            await asyncio.sleep(0)
+            matcher.remove("EMP00")  # Moves the last row into row 0
+            return await pending
+
+        result = asyncio.run(run())
+        assert result is None or result[0] != "EMP00"
+    finally:
+        matcher.close()
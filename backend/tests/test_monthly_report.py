@@ -0,0 +1,132 @@
+"""
+Tests for the summary-backed monthly attendance report.
+"""
+import asyncio
+import calendar
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import select
+
+from database import AsyncSessionLocal, SessionLocal
+from models import Attendance, Employee
+from services.attendance_service import attendance_service
+from utils.shifts import get_on_time_threshold
+
+EMPLOYEES = [
+    ("EMP001", "Ops", "G"), ("EMP002", "Ops", "B"), ("EMP003", "Sales", "A"),
+    ("EMP004", None, None), ("EMP005", "Sales", "G"),
+]
+
+
+def per_day_report(year: int, month: int, department=None) -> list[dict]:
+    """The per-day computation the report replaced: bucket raw attendance rows."""
+    with SessionLocal() as db:
+        employees = db.execute(select(Employee.employee_no, Employee.department, Employee.shift)).all()
+        records = db.execute(select(
+            Attendance.employee_no, Attendance.attendance_date, Attendance.time_in, Attendance.overtime
+        )).all()
+    info = {
+        employee_no: (dept, shift)
+        for employee_no, dept, shift in employees
+        if not department or dept == department
+    }
+    headcount = {}
+    for dept, _ in info.values():
+        headcount[dept] = headcount.get(dept, 0) + 1
+
+    days = []
+    for day in range(1, calendar.monthrange(year, month)[1] + 1):
+        current = date(year, month, day)
+        departments = {dept: {"present": 0, "on_time": 0, "overtime_count": 0} for dept in headcount}
+        for employee_no, attendance_date, time_in, overtime in records:
+            if attendance_date != current or employee_no not in info:
+                continue
+            dept, shift = info[employee_no]
+            counts = departments[dept]
+            counts["present"] += 1
+            counts["on_time"] += time_in is not None and time_in <= get_on_time_threshold(shift)
+            counts["overtime_count"] += bool(overtime)
+        present = sum(d["present"] for d in departments.values())
+        on_time = sum(d["on_time"] for d in departments.values())
+        days.append({
+            "date": current,
+            "present": present,
+            "absent": sum(headcount.values()) - present,
+            "on_time": on_time,
+            "late": present - on_time,
+            "overtime_count": sum(d["overtime_count"] for d in departments.values()),
+            "departments": sorted(
+                (
+                    dept or "", headcount[dept], d["present"], headcount[dept] - d["present"],
+                    d["on_time"], d["present"] - d["on_time"], d["overtime_count"]
+                )
+                for dept, d in departments.items()
+            )
+        })
+    return days
+
+
+def report(year: int, month: int, department=None) -> dict:
+    async def run():
+        async with AsyncSessionLocal() as db:
+            return await attendance_service.get_monthly_report(db, year, month, department)
+    result = asyncio.run(run())
+    for day in result["days"]:
+        day["departments"] = sorted(
+            (
+                d["department"] or "", d["total_employees"], d["present"], d["absent"],
+                d["on_time"], d["late"], d["overtime_count"]
+            )
+            for d in day["departments"]
+        )
+    return result
+
+
+def test_monthly_report_matches_the_per_day_computation(clean_db):
+    with SessionLocal() as db:
+        db.add_all([
+            Employee(employee_no=employee_no, name=employee_no, department=department, shift=shift)
+            for employee_no, department, shift in EMPLOYEES
+        ])
+        db.commit()
+
+    today = date.today()
+    first = today.replace(day=1)
+
+    async def scans():
+        async with AsyncSessionLocal() as db:
+            employees = (await db.scalars(select(Employee).order_by(Employee.employee_no))).all()
+            current = first
+            while current <= today:
+                for i, employee in enumerate(employees):
+                    if (current.day + i) % 3 == 0:
+                        continue  # Absent
+                    scanned_in = datetime.combine(current, time(5 + i * 2, 10 * (current.day % 5)))
+                    await attendance_service.record_scan(db, employee, "D1", scanned_in)
+                    if current.day % 2:
+                        scanned_out = scanned_in + timedelta(hours=7 + current.day % 4)
+                        await attendance_service.record_scan(db, employee, "D1", scanned_out)
+                current += timedelta(days=1)
+            await db.commit()
+
+    asyncio.run(scans())
+
+    for department in (None, "Ops", "Sales"):
+        result = report(today.year, today.month, department)
+        expected = per_day_report(today.year, today.month, department)
+        assert result["days"] == expected
+        assert result["total_records"] == sum(day["present"] for day in expected)
+        assert result["overtime_records"] == sum(day["overtime_count"] for day in expected)
+    assert any(day["overtime_count"] for day in expected)
+    assert any(day["late"] for day in expected)
+
+    # Days after today: nobody present, everyone counted absent per department
+    result = report(today.year, today.month)
+    assert result["total_employees"] == len(EMPLOYEES)
+    for day in result["days"]:
+        if day["date"] > today:
+            assert (day["present"], day["absent"]) == (0, len(EMPLOYEES))
+    next_month = (first + timedelta(days=32)).replace(day=1)
+    future = report(next_month.year, next_month.month, "Ops")
+    assert future["days"] == per_day_report(next_month.year, next_month.month, "Ops")
+    assert all(day["departments"] == [("Ops", 2, 0, 2, 0, 0, 0)] for day in future["days"])
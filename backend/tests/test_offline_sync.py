@@ -0,0 +1,84 @@
+"""
+Tests for replaying buffered device scans against existing attendance rows.
+"""
+import asyncio
+from datetime import date, datetime, time
+
+from sqlalchemy import select
+
+from database import AsyncSessionLocal, SessionLocal
+from models import Attendance, Employee
+from services.attendance_service import attendance_service
+from services.employee_service import employee_service
+
+DAY = date(2026, 3, 2)
+
+
+async def identify_by_name(db, templates):
+    """Stand-in matcher: the test 'template' is the employee number."""
+    return list(templates)
+
+
+def sync(events: list[tuple[str, time]]) -> list:
+    async def run():
+        async with AsyncSessionLocal() as db:
+            return await attendance_service.sync_offline_scans(
+                db, [(employee_no, "D1", datetime.combine(DAY, at)) for employee_no, at in events]
+            )
+    return asyncio.run(run())
+
+
+def live_scan(employee_no: str, at: time) -> None:
+    async def run():
+        async with AsyncSessionLocal() as db:
+            employee = await db.scalar(select(Employee).where(Employee.employee_no == employee_no))
+            await attendance_service.record_scan(db, employee, "D2", datetime.combine(DAY, at))
+            await db.commit()
+    asyncio.run(run())
+
+
+def day_rows() -> dict:
+    with SessionLocal() as db:
+        return {
+            row.employee_no: (row.time_in, row.time_out, row.total_work_minutes, row.overtime)
+            for row in db.scalars(select(Attendance).where(Attendance.attendance_date == DAY))
+        }
+
+
+def test_offline_scans_merge_with_existing_rows_by_capture_time(clean_db, monkeypatch, assert_summary_matches_rebuild):
+    monkeypatch.setattr(employee_service, "identify_fingerprints", identify_by_name)
+    with SessionLocal() as db:
+        db.add_all([
+            Employee(employee_no=employee_no, name=employee_no, department="Ops", shift="G")
+            for employee_no in ("OPEN", "CLOSED", "NEW")
+        ])
+        db.commit()
+
+    # Live scans reached the server before the device uploaded its buffer
+    live_scan("OPEN", time(9, 30))
+    live_scan("CLOSED", time(9, 30))
+    live_scan("CLOSED", time(17, 0))
+
+    results = sync([
+        ("OPEN", time(8, 30)),
+        ("CLOSED", time(8, 45)),
+        ("CLOSED", time(12, 0)),
+        ("NEW", time(17, 0)),
+        ("NEW", time(8, 50)),
+        ("NEW", time(12, 0)),
+    ])
+
+    assert results == [
+        ("OPEN", "time_in"),
+        ("CLOSED", "time_in"),
+        ("CLOSED", "already_marked"),
+        ("NEW", "already_marked"),
+        ("NEW", "time_in"),
+        ("NEW", "time_out"),
+    ]
+    assert day_rows() == {
+        "OPEN": (time(8, 30), time(9, 30), 60, False),
+        "CLOSED": (time(8, 45), time(17, 0), 495, True),
+        "NEW": (time(8, 50), time(12, 0), 190, False),
+    }
+    assert_summary_matches_rebuild()
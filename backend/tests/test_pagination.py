@@ -0,0 +1,65 @@
+"""
+Tests for keyset cursor pagination.
+"""
+import asyncio
+from datetime import date, time
+
+import pytest
+from sqlalchemy import insert
+
+from database import AsyncSessionLocal, engine
+from models import Attendance, Employee
+from services.attendance_service import attendance_service
+from services.employee_service import employee_service
+from utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(date(2026, 3, 2), time(9, 5, 30), None, 42, "EMP001", 0.5)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, date, time, time, int, str, float) == (
+        date(2026, 3, 2), time(9, 5, 30), None, 42, "EMP001", 0.5
+    )
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor(1, 2), encode_cursor("x")])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, int)
+
+
+def test_cursor_pages_match_the_full_listing(clean_db):
+    with engine.begin() as conn:
+        conn.execute(insert(Employee), [{"employee_no": f"EMP{i:03d}", "name": f"Employee {i}"} for i in range(7)])
+        # Same day and time_in for several rows, and NULL time_in rows, to exercise every tie-break
+        conn.execute(insert(Attendance), [
+            {"employee_no": f"EMP{i:03d}", "attendance_date": date(2026, 3, day), "time_in": time_in}
+            for day in (2, 3)
+            for i, time_in in enumerate([time(9, 0), None, time(8, 0), time(9, 0), None, time(7, 0), time(9, 0)])
+        ])
+
+    async def pages(fetch, limit: int) -> list:
+        seen, cursor = [], None
+        while True:
+            rows, _, cursor = await fetch(cursor, limit)
+            seen.extend(rows)
+            if cursor is None:
+                return seen
+
+    async def run():
+        async with AsyncSessionLocal() as db:
+            def attendance(cursor, limit):
+                return attendance_service.get_all_attendance(db, limit=limit, cursor=cursor)
+
+            def employees(cursor, limit):
+                return employee_service.get_all_employees(db, limit=limit, cursor=cursor, include_total=False)
+
+            full, total, last_cursor = await attendance(None, 100)
+            assert total == 14 and last_cursor is None
+            for limit in (1, 2, 3, 5):
+                assert [row["id"] for row in await pages(attendance, limit)] == [row["id"] for row in full]
+            assert [employee.employee_no for employee in await pages(employees, 3)] == [
+                f"EMP{i:03d}" for i in range(7)
+            ]
+
+    asyncio.run(run())
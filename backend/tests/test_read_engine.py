@@ -0,0 +1,85 @@
+"""
+Tests for the read-only engine used by GET endpoints.
+Needs a separate read engine (file-backed SQLite or DATABASE_READ_URL);
+skipped otherwise.
+"""
+import asyncio
+from contextlib import contextmanager
+from datetime import date
+
+import httpx
+import pytest
+from sqlalchemy import event, insert, select
+from sqlalchemy.exc import DBAPIError
+
+from database import AsyncReadSessionLocal, async_engine, async_read_engine, engine
+from main import app
+from models import Employee
+
+pytestmark = pytest.mark.skipif(
+    async_read_engine is async_engine,
+    reason="needs a separate read engine"
+)
+
+
+def get(path: str, headers: dict, **params) -> httpx.Response:
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get(path, params=params, headers=headers)
+    return asyncio.run(run())
+
+
+@contextmanager
+def recorded_statements(async_db_engine):
+    """Collect the SQL statements executed on an async engine."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_db_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(async_db_engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.mark.skipif(async_engine.url.get_backend_name() != "sqlite", reason="SQLite only")
+def test_read_engine_opens_sqlite_read_only():
+    assert async_read_engine.url.query["mode"] == "ro"
+    assert async_read_engine.url.database.startswith("file:")
+
+
+def test_report_reads_go_through_the_read_engine(clean_db, admin_headers):
+    with engine.begin() as conn:
+        conn.execute(insert(Employee), [{"employee_no": "EMP001", "name": "Employee 1", "department": "Ops"}])
+
+    today = date.today()
+    with recorded_statements(async_engine) as primary, recorded_statements(async_read_engine) as replica:
+        for path, params in [
+            ("/admin/attendance/report/monthly", {"year": today.year, "month": today.month}),
+            ("/admin/attendance/summary", {}),
+            ("/admin/attendance/today", {}),
+            ("/admin/attendance", {}),
+            ("/admin/employees", {}),
+        ]:
+            response = get(path, admin_headers, **params)
+            assert response.status_code == 200, path
+
+    assert primary == []
+    assert replica and all(statement.lstrip().upper().startswith(("SELECT", "WITH", "PRAGMA")) for statement in replica)
+    assert any("daily_attendance_summary" in statement for statement in replica)
+
+
+def test_writes_through_the_read_engine_are_refused(clean_db):
+    async def run():
+        async with AsyncReadSessionLocal() as db:
+            assert await db.scalar(select(Employee).limit(1)) is None  # Reads work
+            await db.execute(insert(Employee).values(employee_no="EMP999", name="Nobody"))
+            await db.commit()
+
+    with pytest.raises(DBAPIError, match="(?i)read-?only"):
+        asyncio.run(run())
+
+    with engine.connect() as conn:
+        assert conn.scalar(select(Employee.id).where(Employee.employee_no == "EMP999")) is None
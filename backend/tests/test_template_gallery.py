@@ -0,0 +1,67 @@
+"""
+Tests for the in-memory template gallery.
+"""
+import asyncio
+import base64
+
+import numpy as np
+from sqlalchemy import select
+
+from database import AsyncSessionLocal, SessionLocal
+from models import Employee, FingerprintTemplate
+from services.template_gallery import TemplateGallery
+from utils.encryption import encryption_service
+
+
+def test_identical_templates_do_not_drop_each_other():
+    gallery = TemplateGallery()
+    template = base64.b64encode(np.random.default_rng(5).bytes(120)).decode()
+    gallery.put("EMP001", template, 0)
+    gallery.put("EMP002", template, 0)
+    gallery.put("EMP001", template, 1)
+
+    assert asyncio.run(gallery.lookup(template, candidates={"EMP002"})) == "EMP002"
+
+    gallery.remove("EMP001")
+    assert asyncio.run(gallery.lookup(template)) == "EMP002"
+    assert asyncio.run(gallery.lookup_many([template])) == ["EMP002"]
+
+    gallery.remove("EMP002")
+    assert asyncio.run(gallery.lookup(template)) is None
+    assert gallery._digests == {}
+
+
+def test_bounded_gallery_evicts_least_recently_used():
+    gallery = TemplateGallery(max_size=2)
+    templates = [f"FP_TEMPLATE_EMPLOYEE_{i:03d}" for i in range(3)]
+    gallery.put("EMP000", templates[0])
+    gallery.put("EMP001", templates[1])
+    assert asyncio.run(gallery.lookup(templates[0])) == "EMP000"
+    gallery.put("EMP002", templates[2])
+
+    assert asyncio.run(gallery.lookup(templates[1])) is None
+    assert asyncio.run(gallery.lookup_many(templates)) == ["EMP000", None, "EMP002"]
+    assert gallery.stats()["evictions"] == 1
+
+
+def test_load_leaves_stale_templates_to_the_reencryption_job(clean_db):
+    template = base64.b64encode(bytes(range(64))).decode()
+    token = encryption_service._fernet.encrypt(template.encode())
+    with SessionLocal() as db:
+        db.add(Employee(employee_no="EMP001", name="Ali"))
+        db.add(FingerprintTemplate(
+            employee_no="EMP001", finger_index=0, template=token,
+            template_hash=encryption_service.fingerprint_digest(template)
+        ))
+        db.commit()
+
+    async def load():
+        async with AsyncSessionLocal() as db:
+            return await gallery.load(db)
+
+    gallery = TemplateGallery()
+    assert asyncio.run(load()) == 1
+    assert gallery.stale == 1
+    assert asyncio.run(gallery.lookup(template)) == "EMP001"
+    with SessionLocal() as db:
+        assert db.scalar(select(FingerprintTemplate.template)) == token
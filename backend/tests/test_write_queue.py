@@ -0,0 +1,48 @@
+"""
+Tests for the group-commit attendance write queue.
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from database import SessionLocal
+from models import Employee
+from services import write_queue
+from services.write_queue import AttendanceWriteQueue
+
+
+def test_failed_batch_fails_its_callers_and_the_writer_keeps_going(clean_db, monkeypatch):
+    with SessionLocal() as db:
+        db.add_all([Employee(employee_no="EMP001", name="Ali"), Employee(employee_no="EMP002", name="Sara")])
+        db.commit()
+        employees = db.query(Employee).order_by(Employee.employee_no).all()
+
+    real_session = write_queue.AsyncSessionLocal
+    calls = []
+
+    def flaky_session():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionError("database unavailable")
+        return real_session()
+
+    monkeypatch.setattr(write_queue, "AsyncSessionLocal", flaky_session)
+
+    async def run():
+        queue = AttendanceWriteQueue(max_batch=8, max_delay_ms=20)
+        queue.start()
+        first = await asyncio.gather(
+            *(queue.submit(employee, "D1", datetime(2026, 3, 2, 9, 0)) for employee in employees),
+            return_exceptions=True
+        )
+        assert queue.running
+        _, action = await asyncio.wait_for(queue.submit(employees[0], "D1", datetime(2026, 3, 2, 9, 0)), 5)
+        await queue.drain()
+        with pytest.raises(RuntimeError):
+            await queue.submit(employees[0], "D1", datetime(2026, 3, 2, 17, 0))
+        return first, action
+
+    first, action = asyncio.run(run())
+    assert [type(result) for result in first] == [ConnectionError, ConnectionError]
+    assert action == "time_in"
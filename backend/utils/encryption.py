@@ -1,25 +1,144 @@
 """
 Encryption utilities for fingerprint template storage.
-Uses Fernet symmetric encryption.
+Templates are sealed with AES-256-GCM into a versioned binary format;
+Fernet is kept for general strings and templates stored before that.
+Keys come from a key ring so a rotated-out key stays readable.
 """
-from cryptography.fernet import Fernet
+from typing import Optional
+from cryptography.fernet import Fernet, MultiFernet
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 import base64
+import binascii
 import hashlib
+import hmac
+import os
 
 from utils.config import settings
 
+# Template BLOB layout: header byte | 12-byte nonce | ciphertext + 16-byte tag.
+# The header packs the key id (high nibble) and the payload format (low nibble).
+TEMPLATE_FORMAT_TEXT = 0x1  # UTF-8 template text
+TEMPLATE_FORMAT_BASE64 = 0x2  # Raw bytes of a base64 template (re-encoded on decrypt)
+TEMPLATE_NONCE_SIZE = 12
+MAX_KEY_ID = 15
+
+# Fernet tokens (version byte 0x80, base64url) always start with this
+_FERNET_PREFIX = b"gAAAAA"
+
+
+def parse_key_ring(previous_keys: str) -> dict[int, str]:
+    """
+    Parse ENCRYPTION_PREVIOUS_KEYS ("id:key,id:key") into {key_id: key}.
+    
+    Raises:
+        ValueError: If an entry is malformed or its id is outside 1-15
+    """
+    ring = {}
+    for entry in filter(None, (part.strip() for part in previous_keys.split(","))):
+        key_id, sep, key = entry.partition(":")
+        if not sep or not key_id.strip().isdigit() or not key:
+            raise ValueError("ENCRYPTION_PREVIOUS_KEYS entries must look like 'id:key'")
+        ring[int(key_id)] = key
+    for key_id in ring:
+        if not 1 <= key_id <= MAX_KEY_ID:
+            raise ValueError(f"Encryption key ids must be 1-{MAX_KEY_ID}, got {key_id}")
+    return ring
+
 
 class EncryptionService:
     """
     Service for encrypting and decrypting fingerprint templates.
-    Uses Fernet symmetric encryption with a derived key.
+    Uses AES-GCM for stored templates and Fernet for strings, with keys
+    derived from every key in the ring. New data is always written with
+    the current key; data written with a previous key is still read.
     """
     
-    def __init__(self):
-        """Initialize encryption service with derived Fernet key."""
-        # Derive a valid 32-byte key from the encryption key
-        key = hashlib.sha256(settings.ENCRYPTION_KEY.encode()).digest()
-        self._fernet = Fernet(base64.urlsafe_b64encode(key))
+    def __init__(
+        self,
+        key: Optional[str] = None,
+        key_id: Optional[int] = None,
+        previous_keys: Optional[dict[int, str]] = None
+    ):
+        """
+        Args:
+            key: Current key (defaults to settings.ENCRYPTION_KEY)
+            key_id: Id recorded for the current key (defaults to settings.ENCRYPTION_KEY_ID)
+            previous_keys: {key_id: key} still readable
+                (defaults to settings.ENCRYPTION_PREVIOUS_KEYS)
+            
+        Raises:
+            ValueError: If a key id is out of range or used twice
+        """
+        key = settings.ENCRYPTION_KEY if key is None else key
+        self.key_id = settings.ENCRYPTION_KEY_ID if key_id is None else key_id
+        if previous_keys is None:
+            previous_keys = parse_key_ring(settings.ENCRYPTION_PREVIOUS_KEYS)
+        if not 1 <= self.key_id <= MAX_KEY_ID:
+            raise ValueError(f"Encryption key ids must be 1-{MAX_KEY_ID}, got {self.key_id}")
+        if self.key_id in previous_keys:
+            raise ValueError(f"Key id {self.key_id} is both the current and a previous key")
+        
+        # Current key first: it encrypts, the rest only decrypt
+        ring = {self.key_id: key, **previous_keys}
+        self._template_aeads: dict[int, AESGCM] = {}
+        self._index_keys: dict[int, bytes] = {}
+        fernets = []
+        for ring_id, secret in ring.items():
+            # Derive a valid 32-byte Fernet key from the encryption key
+            fernets.append(Fernet(base64.urlsafe_b64encode(hashlib.sha256(secret.encode()).digest())))
+            # Template sealing key (domain-separated from the Fernet key)
+            self._template_aeads[ring_id] = AESGCM(hashlib.sha256(
+                b"fingerprint-template:" + secret.encode()
+            ).digest())
+            # Separate key for the fingerprint blind index (domain-separated)
+            self._index_keys[ring_id] = hashlib.sha256(
+                b"fingerprint-index:" + secret.encode()
+            ).digest()
+        self._fernet = MultiFernet(fernets)
+    
+    @property
+    def key_ids(self) -> list[int]:
+        """Ids of every readable key, current first."""
+        return list(self._template_aeads)
+    
+    @staticmethod
+    def normalize_template(template: str) -> str:
+        """Strip whitespace so equivalent device payloads compare equal."""
+        return "".join(template.split())
+    
+    def fingerprint_digest(self, template: str) -> str:
+        """
+        Compute the keyed blind index for a fingerprint template.
+        
+        The digest is an HMAC-SHA256 of the normalized template, so it can be
+        stored in an indexed column without revealing the template itself.
+        
+        Args:
+            template: Raw fingerprint template from device
+            
+        Returns:
+            Hex-encoded HMAC digest (64 characters)
+        """
+        normalized = self.normalize_template(template)
+        return hmac.new(self._index_keys[self.key_id], normalized.encode('utf-8'), hashlib.sha256).hexdigest()
+    
+    def fingerprint_digests(self, template: str) -> list[str]:
+        """
+        Blind index digests of a template under every key in the ring,
+        current first. Rows not yet re-encrypted after a rotation still
+        carry a digest made with a previous key, so lookups try them all.
+        
+        Args:
+            template: Raw fingerprint template from device
+            
+        Returns:
+            Hex-encoded HMAC digests
+        """
+        normalized = self.normalize_template(template).encode('utf-8')
+        return [
+            hmac.new(index_key, normalized, hashlib.sha256).hexdigest()
+            for index_key in self._index_keys.values()
+        ]
     
     def encrypt(self, data: str) -> str:
         """
@@ -51,23 +170,100 @@ class EncryptionService:
         decrypted = self._fernet.decrypt(encrypted_data.encode('utf-8'))
         return decrypted.decode('utf-8')
     
-    def verify_fingerprint(self, template: str, stored_encrypted_template: str) -> bool:
+    def encrypt_template(self, template: str) -> bytes:
+        """
+        Seal a normalized fingerprint template for the template BLOB column.
+        
+        Base64 templates are stored as their raw bytes, so the BLOB is about
+        3/4 of the template text plus 29 bytes of header, nonce and tag.
+        
+        Args:
+            template: Raw fingerprint template from device
+            
+        Returns:
+            Encrypted template bytes (header byte, nonce, ciphertext)
+        """
+        normalized = self.normalize_template(template)
+        try:
+            payload = base64.b64decode(normalized, validate=True)
+            payload_format = TEMPLATE_FORMAT_BASE64
+            # Only lossless when the text is canonical base64
+            if base64.b64encode(payload).decode('ascii') != normalized:
+                raise ValueError("non-canonical base64")
+        except (binascii.Error, ValueError):
+            payload = normalized.encode('utf-8')
+            payload_format = TEMPLATE_FORMAT_TEXT
+        
+        header = bytes([self.key_id << 4 | payload_format])
+        nonce = os.urandom(TEMPLATE_NONCE_SIZE)
+        # The header is authenticated so its key id and format cannot be swapped
+        return header + nonce + self._template_aeads[self.key_id].encrypt(nonce, payload, header)
+    
+    def decrypt_template(self, blob: bytes) -> str:
+        """
+        Decrypt a template stored by encrypt_template.
+        Fernet tokens written by earlier versions are still accepted.
+        
+        Args:
+            blob: Encrypted template bytes from the database
+            
+        Returns:
+            Fingerprint template
+            
+        Raises:
+            ValueError: If the header names a key not in the ring or an unknown format
+            cryptography.exceptions.InvalidTag / InvalidToken: If the blob was tampered with
+        """
+        blob = bytes(blob)
+        if blob.startswith(_FERNET_PREFIX):
+            return self._fernet.decrypt(blob).decode('utf-8')
+        
+        header = blob[:1]
+        if not header:
+            raise ValueError("Empty template")
+        key_id, payload_format = header[0] >> 4, header[0] & 0x0F
+        if payload_format not in (TEMPLATE_FORMAT_TEXT, TEMPLATE_FORMAT_BASE64):
+            raise ValueError(f"Unsupported template header 0x{header.hex()}")
+        if key_id not in self._template_aeads:
+            raise ValueError(f"Template was sealed with key id {key_id}, which is not in the key ring")
+        
+        nonce = blob[1:1 + TEMPLATE_NONCE_SIZE]
+        payload = self._template_aeads[key_id].decrypt(nonce, blob[1 + TEMPLATE_NONCE_SIZE:], header)
+        if payload_format == TEMPLATE_FORMAT_BASE64:
+            return base64.b64encode(payload).decode('ascii')
+        return payload.decode('utf-8')
+    
+    def template_needs_reseal(self, blob: bytes) -> bool:
+        """
+        Check whether a stored template predates the current format or key
+        (a Fernet token, or sealed under a previous key id).
+        Callers re-encrypt such rows lazily the next time they read them;
+        services.key_rotation re-encrypts the rest in the background.
+        """
+        if not blob or bytes(blob[:6]) == _FERNET_PREFIX:
+            return True
+        return blob[0] >> 4 != self.key_id
+    
+    def verify_fingerprint(self, template: str, stored_template: bytes) -> bool:
         """
-        Verify if a fingerprint template matches the stored encrypted template.
+        Verify if a fingerprint template matches a stored encrypted template.
         
-        In a real implementation, this would use fingerprint matching algorithms
-        with a similarity threshold. For now, we do exact comparison.
+        This is an exact comparison used to confirm blind-index candidates.
+        Similarity matching with a threshold is done by utils.matcher.
         
         Args:
             template: Raw fingerprint template from device
-            stored_encrypted_template: Encrypted template from database
+            stored_template: Encrypted template bytes from the database
             
         Returns:
             True if templates match, False otherwise
         """
         try:
-            decrypted_stored = self.decrypt(stored_encrypted_template)
-            return template == decrypted_stored
+            decrypted_stored = self.decrypt_template(stored_template)
+            return hmac.compare_digest(
+                self.normalize_template(template).encode('utf-8'),
+                self.normalize_template(decrypted_stored).encode('utf-8')
+            )
         except Exception:
             return False
 
@@ -0,0 +1,126 @@
+"""
+Candidate pre-filtering index for fingerprint identification.
+Locality-sensitive hashing over normalized template vectors.
+"""
+from typing import Iterable
+
+import numpy as np
+
+
+class LSHIndex:
+    """
+    Random-hyperplane LSH index (signed random projections).
+
+    Each of num_tables tables hashes a vector to a bucket from the signs of
+    hash_bits random projections, so vectors with high cosine similarity
+    tend to share a bucket in at least one table. A probe is narrowed to the
+    union of its buckets before full scoring. multiprobe additionally visits
+    buckets reached by flipping the least certain bits, trading latency for
+    recall without adding tables.
+    """
+
+    def __init__(
+        self,
+        feature_length: int,
+        num_tables: int = 8,
+        hash_bits: int = 12,
+        multiprobe: int = 0,
+        seed: int = 0
+    ):
+        """
+        Args:
+            feature_length: Length of the indexed vectors
+            num_tables: Number of independent hash tables
+            hash_bits: Projections (bits) per table
+            multiprobe: Extra buckets visited per table for each probe
+            seed: Seed for the random hyperplanes
+        """
+        self.num_tables = num_tables
+        self.hash_bits = hash_bits
+        self.multiprobe = min(multiprobe, hash_bits)
+        rng = np.random.default_rng(seed)
+        self._planes = rng.standard_normal(
+            (num_tables * hash_bits, feature_length)
+        ).astype(np.float32)
+        self._weights = 1 << np.arange(hash_bits, dtype=np.int64)
+        self._buckets: list[dict[int, set[str]]] = [{} for _ in range(num_tables)]
+        self._keys: dict[str, np.ndarray] = {}  # label -> bucket key per table
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, label: str, vector: np.ndarray) -> None:
+        """Index a vector under a label, replacing any previous entry."""
+        self.remove(label)
+        keys = self._bucket_keys(self._project(vector))
+        for table, key in zip(self._buckets, keys.tolist()):
+            table.setdefault(key, set()).add(label)
+        self._keys[label] = keys
+
+    def remove(self, label: str) -> None:
+        """Remove a label from every table."""
+        keys = self._keys.pop(label, None)
+        if keys is None:
+            return
+        for table, key in zip(self._buckets, keys.tolist()):
+            bucket = table.get(key)
+            if bucket is not None:
+                bucket.discard(label)
+                if not bucket:
+                    del table[key]
+
+    def rename(self, old_label: str, new_label: str) -> None:
+        """Re-key a label without re-hashing its vector."""
+        keys = self._keys.pop(old_label, None)
+        if keys is None:
+            return
+        for table, key in zip(self._buckets, keys.tolist()):
+            bucket = table[key]
+            bucket.discard(old_label)
+            bucket.add(new_label)
+        self._keys[new_label] = keys
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._buckets = [{} for _ in range(self.num_tables)]
+        self._keys.clear()
+
+    def candidates(self, vector: np.ndarray) -> set[str]:
+        """
+        Collect the labels sharing a bucket with the probe in any table.
+
+        Args:
+            vector: Normalized probe vector
+
+        Returns:
+            Set of candidate labels
+        """
+        projections = self._project(vector)
+        found: set[str] = set()
+        for table, keys in zip(self._buckets, self._probe_keys(projections)):
+            for key in keys:
+                bucket = table.get(key)
+                if bucket:
+                    found.update(bucket)
+        return found
+
+    def _project(self, vector: np.ndarray) -> np.ndarray:
+        """Project a vector onto every hyperplane, shaped (tables, bits)."""
+        return (self._planes @ vector).reshape(self.num_tables, self.hash_bits)
+
+    def _bucket_keys(self, projections: np.ndarray) -> np.ndarray:
+        """Turn projection signs into one integer bucket key per table."""
+        return (projections > 0).astype(np.int64) @ self._weights
+
+    def _probe_keys(self, projections: np.ndarray) -> Iterable[list[int]]:
+        """Yield the bucket keys to visit per table, home bucket first."""
+        home = self._bucket_keys(projections).tolist()
+        if not self.multiprobe:
+            return ([key] for key in home)
+
+        # Flip the bits whose projections lie closest to the hyperplane
+        uncertain = np.argsort(np.abs(projections), axis=1)[:, :self.multiprobe]
+        return (
+            [key] + [key ^ int(self._weights[bit]) for bit in bits]
+            for key, bits in zip(home, uncertain.tolist())
+        )
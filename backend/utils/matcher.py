@@ -0,0 +1,645 @@
+"""
+Fingerprint matcher engines.
+Scores a probe template against the whole enrolled gallery with NumPy.
+"""
+import asyncio
+import base64
+import binascii
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Iterable, Optional
+
+import numpy as np
+
+from utils.config import settings
+from utils.lsh_index import LSHIndex
+
+
+class VectorizedMatcher:
+    """
+    1:N template matcher backed by one contiguous template matrix.
+
+    Each template's raw bytes are turned into a fixed-length, mean-centred,
+    L2-normalized float32 vector (templates shorter than min_template_bytes
+    are not scored at all) and stored as a row of the matrix, so scoring a
+    probe against every enrolled template is a single matrix-vector product
+    (cosine similarity). Rows are addressed by a hashable label (the
+    gallery uses (employee_no, finger_index)).
+
+    This is byte similarity, not a fingerprint comparison: no minutiae are
+    extracted or aligned. It only identifies captures whose encoded bytes
+    stay close between scans, which is why it is opt-in (MATCHER_MODE) and
+    exact digest matching is the default.
+
+    With a candidate index attached, galleries of at least index_min_rows
+    are first narrowed to the probe's index candidates and only those rows
+    are scored. If the index returns no candidates, the whole gallery is
+    scored when full_scan_on_empty is set.
+    """
+
+    def __init__(
+        self,
+        feature_length: int = 256,
+        threshold: float = 0.9,
+        initial_capacity: int = 1024,
+        index: Optional[LSHIndex] = None,
+        index_min_rows: int = 0,
+        full_scan_on_empty: bool = True,
+        min_template_bytes: int = 128
+    ):
+        """
+        Args:
+            feature_length: Number of features per template vector
+            threshold: Minimum byte (cosine) similarity accepted as a match
+            initial_capacity: Rows allocated up front (grows by doubling)
+            index: Optional candidate pre-filtering index
+            index_min_rows: Gallery size at which the index is used
+            full_scan_on_empty: Score everything when the index finds nothing
+            min_template_bytes: Shorter templates are never similarity-matched
+        """
+        self.feature_length = feature_length
+        self.min_template_bytes = min_template_bytes
+        self.threshold = threshold
+        self.index = index
+        self.index_min_rows = index_min_rows
+        self.full_scan_on_empty = full_scan_on_empty
+        self._lock = threading.RLock()
+        self._labels: list[str] = []
+        self._rows: dict[str, int] = {}
+        # Bumped whenever rows move or change label, so results computed
+        # outside the lock can be checked against the current layout
+        self._version = 0
+        self._matrix = self._allocate(max(initial_capacity, 1))
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def encode(self, template: str) -> np.ndarray:
+        """
+        Decode a template into a normalized byte vector.
+
+        Templates are expected to be base64-encoded; anything else is
+        treated as raw UTF-8 bytes. Only the template's own bytes (up to
+        feature_length) are mean-centred and normalized; the rest of the
+        vector stays zero, so padding never contributes to a score. The
+        values are the template bytes themselves, not extracted fingerprint
+        features, so scores measure byte similarity.
+
+        Args:
+            template: Raw fingerprint template from device
+
+        Returns:
+            float32 vector of length feature_length
+
+        Raises:
+            ValueError: If the template is shorter than min_template_bytes
+        """
+        compact = "".join(template.split())
+        try:
+            raw = base64.b64decode(compact, validate=True)
+        except (binascii.Error, ValueError):
+            raw = compact.encode('utf-8')
+
+        if len(raw) < self.min_template_bytes:
+            raise ValueError(
+                f"Template has {len(raw)} bytes; similarity matching needs at least {self.min_template_bytes}"
+            )
+
+        vector = np.zeros(self.feature_length, dtype=np.float32)
+        data = np.frombuffer(raw[:self.feature_length], dtype=np.uint8).astype(np.float32)
+        data -= data.mean()
+
+        norm = np.linalg.norm(data)
+        if norm > 0:
+            vector[:len(data)] = data / norm
+        return vector
+
+    def add(self, label: str, template: str) -> None:
+        """
+        Add or replace the template stored under a label.
+        Templates too short to score are not stored (exact matches are
+        still found by the gallery's digest lookup).
+        """
+        try:
+            vector = self.encode(template)
+        except ValueError:
+            self.remove(label)
+            return
+        with self._lock:
+            row = self._rows.get(label)
+            if row is None:
+                row = len(self._labels)
+                if row >= self._matrix.shape[0]:
+                    self._grow(row + 1)
+                self._labels.append(label)
+                self._rows[label] = row
+            self._matrix[row] = vector
+            if self.index is not None:
+                self.index.add(label, vector)
+
+    def remove(self, label: str) -> None:
+        """Remove a label, moving the last row into its slot."""
+        with self._lock:
+            row = self._rows.pop(label, None)
+            if row is None:
+                return
+            if self.index is not None:
+                self.index.remove(label)
+            self._version += 1
+            last = len(self._labels) - 1
+            if row != last:
+                moved = self._labels[last]
+                self._matrix[row] = self._matrix[last]
+                self._labels[row] = moved
+                self._rows[moved] = row
+            self._labels.pop()
+
+    def rename(self, old_label: str, new_label: str) -> None:
+        """Re-key a stored template without re-encoding it."""
+        with self._lock:
+            row = self._rows.pop(old_label, None)
+            if row is None:
+                return
+            if self.index is not None:
+                self.index.rename(old_label, new_label)
+            self._version += 1
+            self._labels[row] = new_label
+            self._rows[new_label] = row
+
+    def clear(self) -> None:
+        """Remove every stored template."""
+        with self._lock:
+            self._version += 1
+            self._labels.clear()
+            self._rows.clear()
+            if self.index is not None:
+                self.index.clear()
+
+    def search(
+        self,
+        template: str,
+        top_k: int = 1,
+        labels: Optional[Iterable[str]] = None
+    ) -> list[tuple[str, float]]:
+        """
+        Score a probe against the gallery and return the best candidates.
+
+        Args:
+            template: Probe template from device
+            top_k: Number of candidates to return
+            labels: Optional subset of labels to score instead of the gallery
+
+        Returns:
+            List of (label, score) sorted by descending score
+        """
+        try:
+            probe = self.encode(template)
+        except ValueError:
+            return []
+        with self._lock:
+            count = len(self._labels)
+            if count == 0:
+                return []
+
+            if labels is not None:
+                rows = np.fromiter(
+                    (self._rows[label] for label in labels if label in self._rows),
+                    dtype=np.int64
+                )
+            else:
+                rows = self._candidate_rows(probe, count)
+
+            if rows is None:
+                candidates = self._top_candidates(probe, count, min(top_k, count))
+            elif len(rows) == 0:
+                return []
+            else:
+                scores = self._matrix[rows] @ probe
+                candidates = [
+                    (int(rows[i]), score)
+                    for i, score in _top_k(scores, min(top_k, len(rows)))
+                ]
+            return [(self._labels[row], score) for row, score in candidates]
+
+    def identify(
+        self,
+        template: str,
+        labels: Optional[Iterable[str]] = None
+    ) -> Optional[tuple[str, float]]:
+        """
+        Find the best match above the configured threshold.
+
+        Args:
+            template: Probe template from device
+            labels: Optional subset of labels to score instead of the gallery
+
+        Returns:
+            (label, score) of the best match, or None if below threshold
+        """
+        candidates = self.search(template, top_k=1, labels=labels)
+        if candidates and candidates[0][1] >= self.threshold:
+            return candidates[0]
+        return None
+
+    def identify_many(self, templates: list[str]) -> list[Optional[tuple[str, float]]]:
+        """
+        Identify a batch of probes.
+
+        Without a candidate index the probes are scored in chunks with one
+        matrix-matrix product per chunk, sized to keep the score block
+        around 16 MB.
+
+        Args:
+            templates: Probe templates
+
+        Returns:
+            (label, score) or None for each probe, in input order
+        """
+        with self._lock:
+            count = len(self._labels)
+            if count == 0:
+                return [None] * len(templates)
+            if self.index is not None and count >= self.index_min_rows:
+                return [self.identify(template) for template in templates]
+
+            results: list[Optional[tuple[str, float]]] = [None] * len(templates)
+            # Probes too short to score stay None
+            encoded = []
+            for i, template in enumerate(templates):
+                try:
+                    encoded.append((i, self.encode(template)))
+                except ValueError:
+                    pass
+
+            chunk_size = max(1, min(256, 4_000_000 // count))
+            for start in range(0, len(encoded), chunk_size):
+                chunk = encoded[start:start + chunk_size]
+                probes = np.stack([vector for _, vector in chunk])
+                scores = self._matrix[:count] @ probes.T
+                best_rows = scores.argmax(axis=0)
+                best_scores = scores[best_rows, np.arange(len(best_rows))]
+                for (i, _), row, score in zip(chunk, best_rows.tolist(), best_scores.tolist()):
+                    if score >= self.threshold:
+                        results[i] = (self._labels[row], score)
+            return results
+
+    async def identify_async(
+        self,
+        template: str,
+        labels: Optional[Iterable[str]] = None
+    ) -> Optional[tuple[str, float]]:
+        """
+        Awaitable identify(), for request handlers.
+        The in-process engine scores inline; see ParallelMatcher.
+        """
+        return self.identify(template, labels=labels)
+
+    async def identify_many_async(self, templates: list[str]) -> list[Optional[tuple[str, float]]]:
+        """Awaitable identify_many(), for request handlers."""
+        return self.identify_many(templates)
+
+    def start(self) -> None:
+        """Acquire engine resources. No-op for the in-process engine."""
+
+    def close(self) -> None:
+        """Release engine resources. No-op for the in-process engine."""
+
+    def _candidate_rows(self, probe: np.ndarray, count: int) -> Optional[np.ndarray]:
+        """
+        Narrow the gallery to the rows the index considers candidates.
+        Returns None when the whole gallery should be scored.
+        """
+        if self.index is None or count < self.index_min_rows:
+            return None
+        labels = self.index.candidates(probe)
+        if not labels:
+            return None if self.full_scan_on_empty else np.empty(0, dtype=np.int64)
+        return np.fromiter((self._rows[label] for label in labels), dtype=np.int64, count=len(labels))
+
+    def _top_candidates(self, probe: np.ndarray, count: int, k: int) -> list[tuple[int, float]]:
+        """Return the k best (row, score) pairs among the first `count` rows."""
+        return _top_k(self._matrix[:count] @ probe, k)
+
+    def _allocate(self, capacity: int) -> np.ndarray:
+        """Allocate backing storage for `capacity` rows."""
+        return np.zeros((capacity, self.feature_length), dtype=np.float32)
+
+    def _grow(self, min_capacity: int) -> None:
+        """Double the matrix capacity until it holds `min_capacity` rows."""
+        capacity = self._matrix.shape[0]
+        while capacity < min_capacity:
+            capacity *= 2
+        matrix = self._allocate(capacity)
+        matrix[:len(self._labels)] = self._matrix[:len(self._labels)]
+        self._matrix = matrix
+
+
+class ParallelMatcher(VectorizedMatcher):
+    """
+    Matcher that shards the gallery across a process pool.
+
+    The template matrix lives in a shared memory block, so worker processes
+    attach to it by name instead of receiving pickled templates. A probe is
+    fanned out to every shard and the per-shard best candidates are merged.
+
+    Only the awaitable identify_async / identify_many_async use the pool:
+    the shards are awaited through the event loop with no lock held, so
+    the server keeps serving and other lookups score concurrently. The
+    winning row is then re-scored under the lock; if rows moved while the
+    shards ran, the probe is scored again in-process. Synchronous calls,
+    galleries smaller than min_parallel_rows, restricted or index-narrowed
+    searches, and a matcher that was never start()ed score in-process.
+    """
+
+    def __init__(
+        self,
+        feature_length: int = 256,
+        threshold: float = 0.9,
+        initial_capacity: int = 1024,
+        index: Optional[LSHIndex] = None,
+        index_min_rows: int = 0,
+        full_scan_on_empty: bool = True,
+        min_template_bytes: int = 128,
+        workers: int = 0,
+        min_parallel_rows: int = 20000
+    ):
+        """
+        Args:
+            feature_length: Number of features per template vector
+            threshold: Minimum byte (cosine) similarity accepted as a match
+            initial_capacity: Rows allocated up front (grows by doubling)
+            index: Optional candidate pre-filtering index
+            index_min_rows: Gallery size at which the index is used
+            full_scan_on_empty: Score everything when the index finds nothing
+            min_template_bytes: Shorter templates are never similarity-matched
+            workers: Worker processes (0 = one per CPU)
+            min_parallel_rows: Gallery size at which scoring is sharded
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.min_parallel_rows = min_parallel_rows
+        self._shm: Optional[SharedMemory] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        super().__init__(
+            feature_length, threshold, initial_capacity,
+            index, index_min_rows, full_scan_on_empty, min_template_bytes
+        )
+
+    def start(self) -> None:
+        """Start the worker pool (called from the application lifespan)."""
+        if self._executor is None and self.workers >= 2:
+            # Spawn, not fork: the server process is multi-threaded
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+
+    def close(self) -> None:
+        """Stop the worker pool and free the shared memory block."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    async def identify_async(
+        self,
+        template: str,
+        labels: Optional[Iterable[str]] = None
+    ) -> Optional[tuple[str, float]]:
+        if labels is not None:
+            return self.identify(template, labels=labels)
+        try:
+            probe = self.encode(template)
+        except ValueError:
+            return None
+
+        snapshot = self._shard_snapshot()
+        if snapshot is None:
+            return self.identify(template)
+        shm_name, shape, count, version = snapshot
+
+        try:
+            shards = await self._scatter(_score_shard, shm_name, shape, count, probe, 1)
+        except Exception:
+            # e.g. the matrix was reallocated while a worker attached to it
+            return self.identify(template)
+        best = max((candidate for shard in shards for candidate in shard), key=lambda c: c[1], default=None)
+
+        with self._lock:
+            moved = version != self._version
+            if best is not None and not moved:
+                # Re-score the winner so an in-place re-enrollment is seen
+                row = best[0]
+                best = (self._labels[row], float(self._matrix[row] @ probe))
+        if moved:
+            # Rows moved while the shards ran
+            return self.identify(template)
+        if best is None or best[1] < self.threshold:
+            return None
+        return best
+
+    async def identify_many_async(self, templates: list[str]) -> list[Optional[tuple[str, float]]]:
+        snapshot = self._shard_snapshot()
+        if snapshot is None:
+            return self.identify_many(templates)
+        shm_name, shape, count, version = snapshot
+
+        encoded = []
+        for i, template in enumerate(templates):
+            try:
+                encoded.append((i, self.encode(template)))
+            except ValueError:
+                pass
+        results: list[Optional[tuple[str, float]]] = [None] * len(templates)
+        if not encoded:
+            return results
+
+        probes = np.stack([vector for _, vector in encoded])
+        try:
+            shards = await self._scatter(_score_shard_many, shm_name, shape, count, probes)
+        except Exception:
+            return self.identify_many(templates)
+
+        shard_rows = np.stack([rows for rows, _ in shards])
+        shard_scores = np.stack([scores for _, scores in shards])
+        winner = shard_scores.argmax(axis=0)
+        best_rows = shard_rows[winner, np.arange(len(encoded))]
+
+        with self._lock:
+            if version != self._version:
+                return self.identify_many(templates)
+            scores = np.einsum("ij,ij->i", self._matrix[best_rows], probes)
+            labels = [self._labels[row] for row in best_rows.tolist()]
+        for (i, _), label, score in zip(encoded, labels, scores.tolist()):
+            if score >= self.threshold:
+                results[i] = (label, score)
+        return results
+
+    def _shard_snapshot(self) -> Optional[tuple[str, tuple[int, int], int, int]]:
+        """
+        Shared memory name, matrix shape, row count and layout version for
+        a sharded search, or None when the search should run in-process.
+        """
+        with self._lock:
+            count = len(self._labels)
+            if (
+                self._executor is None
+                or count < self.min_parallel_rows
+                or (self.index is not None and count >= self.index_min_rows)
+            ):
+                return None
+            return self._shm.name, self._matrix.shape, count, self._version
+
+    async def _scatter(self, fn, shm_name: str, shape: tuple[int, int], count: int, *args) -> list:
+        """Run fn over every shard of the first `count` rows on the pool."""
+        loop = asyncio.get_running_loop()
+        shard_size = -(-count // self.workers)  # ceiling division
+        return await asyncio.gather(*(
+            loop.run_in_executor(
+                self._executor, fn, shm_name, shape, start, min(start + shard_size, count), *args
+            )
+            for start in range(0, count, shard_size)
+        ))
+
+    def _allocate(self, capacity: int) -> np.ndarray:
+        shm = SharedMemory(create=True, size=capacity * self.feature_length * 4)
+        matrix = np.ndarray((capacity, self.feature_length), dtype=np.float32, buffer=shm.buf)
+        matrix[:] = 0
+        self._shm = shm
+        return matrix
+
+    def _grow(self, min_capacity: int) -> None:
+        old_shm = self._shm
+        super()._grow(min_capacity)
+        if old_shm is not None:
+            old_shm.close()
+            old_shm.unlink()
+
+
+def _top_k(scores: np.ndarray, k: int, offset: int = 0) -> list[tuple[int, float]]:
+    """Return the k highest (row, score) pairs, best first."""
+    best = np.argpartition(scores, -k)[-k:]
+    best = best[np.argsort(scores[best])[::-1]]
+    return [(offset + int(i), float(scores[i])) for i in best]
+
+
+# Shared memory blocks attached by this worker process, keyed by name
+_attached_blocks: dict[str, SharedMemory] = {}
+
+
+def _attach_matrix(shm_name: str, shape: tuple[int, int]) -> np.ndarray:
+    """Map the shared template matrix in a worker process."""
+    shm = _attached_blocks.get(shm_name)
+    if shm is None:
+        # The matrix was reallocated; drop blocks from older generations
+        for stale in _attached_blocks.values():
+            stale.close()
+        _attached_blocks.clear()
+        # Workers share the parent's resource tracker, so attaching does not
+        # take ownership; the parent unlinks the block in close()/_grow()
+        shm = SharedMemory(name=shm_name)
+        _attached_blocks[shm_name] = shm
+    return np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+
+
+def _score_shard(
+    shm_name: str,
+    shape: tuple[int, int],
+    start: int,
+    end: int,
+    probe: np.ndarray,
+    k: int
+) -> list[tuple[int, float]]:
+    """Score one shard of the shared template matrix (runs in a worker)."""
+    matrix = _attach_matrix(shm_name, shape)
+    return _top_k(matrix[start:end] @ probe, min(k, end - start), offset=start)
+
+
+def _score_shard_many(
+    shm_name: str,
+    shape: tuple[int, int],
+    start: int,
+    end: int,
+    probes: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Best (row, score) per probe within one shard (runs in a worker)."""
+    matrix = _attach_matrix(shm_name, shape)
+    scores = matrix[start:end] @ probes.T
+    best = scores.argmax(axis=0)
+    return best + start, scores[best, np.arange(len(best))]
+
+
+class ExactMatcher(VectorizedMatcher):
+    """
+    Matcher that scores nothing, so identification relies on the gallery's
+    exact digest lookup alone (the default MATCHER_MODE). Keeps the matcher
+    interface so the gallery does not special-case it.
+    """
+
+    def __init__(self, **options):
+        options["initial_capacity"] = 1  # Nothing is ever stored
+        super().__init__(**options)
+
+    def encode(self, template: str) -> np.ndarray:
+        """
+        Refuse every template: similarity matching is disabled.
+
+        Raises:
+            ValueError: Always
+        """
+        raise ValueError("Similarity matching is disabled (MATCHER_MODE=exact)")
+
+
+# Available matcher engines, selected by settings.MATCHER_MODE
+MATCHER_ENGINES = {
+    "exact": ExactMatcher,
+    "vectorized": VectorizedMatcher,
+    "parallel": ParallelMatcher,
+}
+
+
+def create_matcher() -> VectorizedMatcher:
+    """
+    Create the matcher engine configured in settings.
+
+    Raises:
+        ValueError: If MATCHER_MODE or MATCHER_INDEX is not recognised
+    """
+    engine = MATCHER_ENGINES.get(settings.MATCHER_MODE)
+    if engine is None:
+        raise ValueError(
+            f"Unknown MATCHER_MODE '{settings.MATCHER_MODE}'. "
+            f"Choose one of: {', '.join(MATCHER_ENGINES)}"
+        )
+
+    if settings.MATCHER_INDEX == "lsh":
+        index = LSHIndex(
+            settings.MATCHER_FEATURE_LENGTH,
+            num_tables=settings.LSH_TABLES,
+            hash_bits=settings.LSH_HASH_BITS,
+            multiprobe=settings.LSH_MULTIPROBE
+        )
+    elif settings.MATCHER_INDEX == "none":
+        index = None
+    else:
+        raise ValueError(
+            f"Unknown MATCHER_INDEX '{settings.MATCHER_INDEX}'. Choose one of: none, lsh"
+        )
+
+    options = {
+        "feature_length": settings.MATCHER_FEATURE_LENGTH,
+        "threshold": settings.MATCH_THRESHOLD,
+        "index": index,
+        "index_min_rows": settings.LSH_MIN_GALLERY_SIZE,
+        "full_scan_on_empty": settings.LSH_FULL_SCAN_ON_EMPTY,
+        "min_template_bytes": settings.MATCHER_MIN_TEMPLATE_BYTES,
+    }
+    if engine is ParallelMatcher:
+        options["workers"] = settings.MATCHER_WORKERS
+        options["min_parallel_rows"] = settings.MATCHER_PARALLEL_MIN_ROWS
+    return engine(**options)
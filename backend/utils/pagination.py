@@ -0,0 +1,55 @@
+"""
+Keyset (cursor) pagination utilities.
+
+A cursor holds the sort key of the last row of a page, encoded as opaque
+URL-safe base64 JSON. The next page starts with a WHERE on that key, which
+the database answers from an index, instead of an OFFSET that reads and
+discards every earlier row.
+"""
+import base64
+import json
+from datetime import date, time
+
+
+def encode_cursor(*values) -> str:
+    """
+    Encode a row's sort key as an opaque cursor.
+
+    Args:
+        values: Sort key values (str, int, date, time or None)
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = [value.isoformat() if isinstance(value, (date, time)) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types) -> tuple:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string from a previous page
+        types: Expected type of each key value (str, int, date or time)
+
+    Returns:
+        Tuple of key values (None values are kept)
+
+    Raises:
+        ValueError: If the cursor is malformed or does not match `types`
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError
+        return tuple(
+            None if value is None
+            else value_type.fromisoformat(value) if value_type in (date, time)
+            else value_type(value)
+            for value, value_type in zip(payload, types)
+        )
+    except (ValueError, TypeError):
+        raise ValueError("Invalid pagination cursor")
@@ -1,7 +1,8 @@
 """
 Shift configuration and utilities.
-Defines work hours for each shift type.
+Defines work hours and on-time thresholds for each shift type.
 """
+from datetime import time
 
 # Shift hours (in hours)
 SHIFT_HOURS = {
@@ -16,6 +17,18 @@ SHIFT_HOURS = {
 DEFAULT_SHIFT = 'G'
 DEFAULT_SHIFT_HOURS = 8
 
+# Latest arrival (time_in) that still counts as on time, per shift
+SHIFT_ON_TIME_THRESHOLDS = {
+    'D': time(9, 0),   # Day shift
+    'A': time(6, 0),   # Shift A - morning
+    'B': time(14, 0),  # Shift B - afternoon
+    'C': time(22, 0),  # Shift C - night
+    'G': time(9, 0),   # General shift
+}
+
+# On-time threshold if the shift is not specified
+DEFAULT_ON_TIME_THRESHOLD = time(9, 0)
+
 
 def get_shift_hours(shift: str | None) -> int:
     """
@@ -32,6 +45,21 @@ def get_shift_hours(shift: str | None) -> int:
     return SHIFT_HOURS[shift.upper()]
 
 
+def get_on_time_threshold(shift: str | None) -> time:
+    """
+    Get the latest on-time arrival for a given shift.
+    
+    Args:
+        shift: Shift code (D, A, B, C, G)
+        
+    Returns:
+        Latest time_in that counts as on time
+    """
+    if not shift or shift not in SHIFT_ON_TIME_THRESHOLDS:
+        return DEFAULT_ON_TIME_THRESHOLD
+    return SHIFT_ON_TIME_THRESHOLDS[shift]
+
+
 def calculate_overtime(total_minutes: int, shift: str | None) -> tuple[bool, int]:
     """
     Calculate if overtime occurred and how many minutes.
@@ -2,6 +2,7 @@ import api from './axios';
 import {
   AttendanceListResponse,
   DailyAttendanceSummary,
+  MonthlyAttendanceReport,
   AttendanceFilters,
 } from '../types';
 
@@ -49,6 +50,43 @@ export const attendanceApi = {
     return response.data;
   },
 
+  /**
+   * Get per-day attendance counts for a month
+   */
+  getMonthlyReport: async (
+    year: number,
+    month: number,
+    department?: string
+  ): Promise<MonthlyAttendanceReport> => {
+    const params = new URLSearchParams();
+    params.append('year', year.toString());
+    params.append('month', month.toString());
+    if (department) params.append('department', department);
+
+    const response = await api.get<MonthlyAttendanceReport>(
+      `/admin/attendance/report/monthly?${params.toString()}`
+    );
+    return response.data;
+  },
+
+  /**
+   * Download attendance records as CSV (streamed by the server, no row cap)
+   */
+  exportAttendance: async (filters?: AttendanceFilters): Promise<Blob> => {
+    const params = new URLSearchParams();
+    params.append('format', 'csv');
+    if (filters?.start_date) params.append('start_date', filters.start_date);
+    if (filters?.end_date) params.append('end_date', filters.end_date);
+    if (filters?.department) params.append('department', filters.department);
+    if (filters?.employee_no) params.append('employee_no', filters.employee_no);
+
+    const response = await api.get<Blob>(
+      `/admin/attendance/export?${params.toString()}`,
+      { responseType: 'blob', timeout: 0 }
+    );
+    return response.data;
+  },
+
   /**
    * Get attendance by specific date
    */
@@ -20,7 +20,7 @@ const departments = [
 
 export function AttendancePage() {
   const [attendance, setAttendance] = useState<Attendance[]>([]);
-  const [total, setTotal] = useState(0);
+  const [total, setTotal] = useState<number | null>(0);
   const [loading, setLoading] = useState(true);
   const [filters, setFilters] = useState<AttendanceFilters>({
     start_date: format(subDays(new Date(), 7), 'yyyy-MM-dd'),
@@ -142,7 +142,7 @@ export function AttendancePage() {
         <div>
           <h2 className="text-2xl font-bold text-gray-900">Attendance</h2>
           <p className="text-gray-500 mt-1">
-            View attendance records ({total} records)
+            View attendance records ({total ?? attendance.length} records)
           </p>
         </div>
         <div className="flex gap-2">
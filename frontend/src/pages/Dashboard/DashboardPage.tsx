@@ -39,7 +39,7 @@ export function DashboardPage() {
 
       setSummary(summaryData);
       setTodayAttendance(attendanceData.records);
-      setTotalEmployees(employeesData.total);
+      setTotalEmployees(employeesData.total ?? summaryData.total_employees);
     } catch (error) {
       toast.error('Failed to load dashboard data');
       console.error(error);
@@ -17,7 +17,7 @@ import toast from 'react-hot-toast';
 
 export function EmployeesPage() {
   const [employees, setEmployees] = useState<Employee[]>([]);
-  const [total, setTotal] = useState(0);
+  const [total, setTotal] = useState<number | null>(0);
   const [loading, setLoading] = useState(true);
   const [filters, setFilters] = useState<EmployeeFilters>({});
   const [searchTerm, setSearchTerm] = useState('');
@@ -178,7 +178,7 @@ export function EmployeesPage() {
         <div>
           <h2 className="text-2xl font-bold text-gray-900">Employees</h2>
           <p className="text-gray-500 mt-1">
-            Manage employee records ({total} total)
+            Manage employee records ({total ?? employees.length} total)
           </p>
         </div>
         <Button icon={<Plus className="h-4 w-4" />} onClick={handleAddEmployee}>
@@ -1,10 +1,5 @@
 import { useState, useEffect, useCallback } from 'react';
-import {
-  format,
-  startOfMonth,
-  endOfMonth,
-  eachDayOfInterval,
-} from 'date-fns';
+import { format, startOfMonth, endOfMonth } from 'date-fns';
 import { Download, Calendar, FileText } from 'lucide-react';
 import {
   Button,
@@ -15,8 +10,13 @@ import {
   Table,
   Badge,
 } from '../../components/ui';
-import { attendanceApi, employeeApi } from '../../api';
-import { Attendance, DailyAttendanceSummary } from '../../types';
+import { attendanceApi } from '../../api';
+import {
+  Attendance,
+  DailyAttendanceSummary,
+  MonthlyAttendanceReport,
+  MonthlyReportDay,
+} from '../../types';
 import toast from 'react-hot-toast';
 
 type ReportType = 'daily' | 'monthly';
@@ -48,12 +48,11 @@ export function ReportsPage() {
   const [dailySummary, setDailySummary] = useState<DailyAttendanceSummary | null>(null);
   const [dailyRecords, setDailyRecords] = useState<Attendance[]>([]);
 
-  // Monthly report data
-  const [monthlyData, setMonthlyData] = useState<
-    { date: string; present: number; absent: number }[]
-  >([]);
-  const [monthlyRecords, setMonthlyRecords] = useState<Attendance[]>([]);
-  const [totalEmployees, setTotalEmployees] = useState(0);
+  // Monthly report data (per-day counts aggregated by the server)
+  const [monthlyReport, setMonthlyReport] =
+    useState<MonthlyAttendanceReport | null>(null);
+  const monthlyData = monthlyReport?.days ?? [];
+  const totalEmployees = monthlyReport?.total_employees ?? 0;
 
   const fetchDailyReport = useCallback(async () => {
     try {
@@ -80,36 +79,12 @@ export function ReportsPage() {
     try {
       setLoading(true);
       const [year, month] = selectedMonth.split('-').map(Number);
-      const startDate = startOfMonth(new Date(year, month - 1));
-      const endDate = endOfMonth(new Date(year, month - 1));
-
-      const [employeesData, attendanceData] = await Promise.all([
-        employeeApi.getAll(0, 1),
-        attendanceApi.getAll(0, 1000, {
-          start_date: format(startDate, 'yyyy-MM-dd'),
-          end_date: format(endDate, 'yyyy-MM-dd'),
-          department: department || undefined,
-        }),
-      ]);
-
-      setTotalEmployees(employeesData.total);
-      setMonthlyRecords(attendanceData.records);
-
-      // Calculate daily stats for the month
-      const days = eachDayOfInterval({ start: startDate, end: endDate });
-      const dailyStats = days.map((day) => {
-        const dateStr = format(day, 'yyyy-MM-dd');
-        const dayRecords = attendanceData.records.filter(
-          (r) => r.attendance_date === dateStr
-        );
-        return {
-          date: dateStr,
-          present: dayRecords.length,
-          absent: employeesData.total - dayRecords.length,
-        };
-      });
-
-      setMonthlyData(dailyStats);
+      const report = await attendanceApi.getMonthlyReport(
+        year,
+        month,
+        department || undefined
+      );
+      setMonthlyReport(report);
     } catch (error) {
       toast.error('Failed to load monthly report');
       console.error(error);
@@ -126,51 +101,47 @@ export function ReportsPage() {
     }
   }, [reportType, fetchDailyReport, fetchMonthlyReport]);
 
-  const exportToCSV = () => {
-    const records = reportType === 'daily' ? dailyRecords : monthlyRecords;
+  const exportToCSV = async () => {
+    const hasData =
+      reportType === 'daily'
+        ? dailyRecords.length > 0
+        : (monthlyReport?.total_records ?? 0) > 0;
 
-    if (records.length === 0) {
+    if (!hasData) {
       toast.error('No data to export');
       return;
     }
 
-    const headers = [
-      'Date',
-      'Employee No',
-      'Name',
-      'Department',
-      'Time In',
-      'Time Out',
-      'Total Hours',
-      'Overtime',
-    ];
+    const [year, month] = selectedMonth.split('-').map(Number);
+    const range =
+      reportType === 'daily'
+        ? { start_date: selectedDate, end_date: selectedDate }
+        : {
+            start_date: format(startOfMonth(new Date(year, month - 1)), 'yyyy-MM-dd'),
+            end_date: format(endOfMonth(new Date(year, month - 1)), 'yyyy-MM-dd'),
+          };
 
-    const rows = records.map((r) => [
-      r.attendance_date,
-      r.employee_no,
-      r.employee_name,
-      r.department || '',
-      r.time_in || '',
-      r.time_out || '',
-      r.total_work_minutes
-        ? `${Math.floor(r.total_work_minutes / 60)}h ${r.total_work_minutes % 60}m`
-        : '',
-      r.overtime ? `${r.overtime_minutes} mins` : 'No',
-    ]);
-
-    const csv = [headers.join(','), ...rows.map((r) => r.join(','))].join('\n');
+    try {
+      // The server streams every matching record, so there is no row cap
+      const blob = await attendanceApi.exportAttendance({
+        ...range,
+        department: department || undefined,
+      });
 
-    const blob = new Blob([csv], { type: 'text/csv' });
-    const url = URL.createObjectURL(blob);
-    const a = document.createElement('a');
-    a.href = url;
-    a.download = `attendance-report-${reportType}-${
-      reportType === 'daily' ? selectedDate : selectedMonth
-    }.csv`;
-    a.click();
-    URL.revokeObjectURL(url);
+      const url = URL.createObjectURL(blob);
+      const a = document.createElement('a');
+      a.href = url;
+      a.download = `attendance-report-${reportType}-${
+        reportType === 'daily' ? selectedDate : selectedMonth
+      }.csv`;
+      a.click();
+      URL.revokeObjectURL(url);
 
-    toast.success('Report exported successfully');
+      toast.success('Report exported successfully');
+    } catch (error) {
+      toast.error('Failed to export report');
+      console.error(error);
+    }
   };
 
   const formatTime = (time: string | null) => {
@@ -221,6 +192,28 @@ export function ReportsPage() {
     },
   ];
 
+  const monthlyColumns = [
+    {
+      key: 'date',
+      header: 'Date',
+      render: (item: MonthlyReportDay) =>
+        format(new Date(item.date), 'EEE, MMM d'),
+    },
+    { key: 'present', header: 'Present' },
+    { key: 'absent', header: 'Absent' },
+    { key: 'on_time', header: 'On Time' },
+    { key: 'late', header: 'Late' },
+    {
+      key: 'overtime_count',
+      header: 'Overtime',
+      render: (item: MonthlyReportDay) => (
+        <Badge variant={item.overtime_count > 0 ? 'success' : 'default'}>
+          {item.overtime_count}
+        </Badge>
+      ),
+    },
+  ];
+
   return (
     <div className="space-y-6 fade-in">
       {/* Header */}
@@ -311,11 +304,11 @@ export function ReportsPage() {
       )}
 
       {/* Summary Cards - Monthly */}
-      {reportType === 'monthly' && monthlyRecords.length > 0 && (
+      {reportType === 'monthly' && monthlyReport && monthlyReport.total_records > 0 && (
         <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-6">
           <StatCard
             title="Total Records"
-            value={monthlyRecords.length}
+            value={monthlyReport.total_records}
             icon={<FileText className="h-6 w-6" />}
             color="blue"
           />
@@ -340,7 +333,7 @@ export function ReportsPage() {
           />
           <StatCard
             title="Overtime Records"
-            value={monthlyRecords.filter((r) => r.overtime).length}
+            value={monthlyReport.overtime_records}
             icon={<FileText className="h-6 w-6" />}
             color="purple"
           />
@@ -393,16 +386,26 @@ export function ReportsPage() {
       <Card padding="none">
         <div className="px-6 py-4 border-b">
           <h3 className="text-lg font-semibold text-gray-900">
-            {reportType === 'daily' ? 'Daily Records' : 'Monthly Records'}
+            {reportType === 'daily' ? 'Daily Records' : 'Monthly Summary'}
           </h3>
         </div>
-        <Table
-          columns={columns}
-          data={reportType === 'daily' ? dailyRecords : monthlyRecords}
-          keyExtractor={(item) => item.id}
-          loading={loading}
-          emptyMessage="No records found"
-        />
+        {reportType === 'daily' ? (
+          <Table
+            columns={columns}
+            data={dailyRecords}
+            keyExtractor={(item) => item.id}
+            loading={loading}
+            emptyMessage="No records found"
+          />
+        ) : (
+          <Table
+            columns={monthlyColumns}
+            data={monthlyData}
+            keyExtractor={(item) => item.date}
+            loading={loading}
+            emptyMessage="No records found"
+          />
+        )}
       </Card>
     </div>
   );
@@ -46,8 +46,9 @@ export interface EmployeeCreate {
 export interface EmployeeUpdate extends Partial<EmployeeCreate> {}
 
 export interface EmployeeListResponse {
-  total: number;
+  total: number | null; // null when requested with include_total=false
   employees: Employee[];
+  next_cursor?: string | null;
 }
 
 export interface FingerprintEnroll {
@@ -72,8 +73,9 @@ export interface Attendance {
 }
 
 export interface AttendanceListResponse {
-  total: number;
+  total: number | null; // null when requested with include_total=false
   records: Attendance[];
+  next_cursor?: string | null;
 }
 
 export interface DailyAttendanceSummary {
@@ -86,6 +88,36 @@ export interface DailyAttendanceSummary {
   overtime_count: number;
 }
 
+export interface DepartmentAttendanceCounts {
+  department: string | null;
+  total_employees: number;
+  present: number;
+  absent: number;
+  on_time: number;
+  late: number;
+  overtime_count: number;
+}
+
+export interface MonthlyReportDay {
+  date: string;
+  present: number;
+  absent: number;
+  on_time: number;
+  late: number;
+  overtime_count: number;
+  departments: DepartmentAttendanceCounts[];
+}
+
+export interface MonthlyAttendanceReport {
+  year: number;
+  month: number;
+  department: string | null;
+  total_employees: number;
+  total_records: number;
+  overtime_records: number;
+  days: MonthlyReportDay[];
+}
+
 // Auth Types
 export interface LoginRequest {
   username: string;
@@ -139,6 +171,6 @@ export interface UserResponse {
 }
 
 export interface UserListResponse {
-  total: number;
+  total: number | null; // null when requested with include_total=false
   users: UserResponse[];
 }